@@ -2,21 +2,31 @@ import os
 import csv
 import re
 import json
-import requests
 import hashlib
 import time
 import random
 import base64
-from flask import Flask, render_template, request, Response, jsonify, session, redirect, url_for, flash, render_template_string, make_response
+import gc
+from flask import Flask, render_template, request, Response, jsonify, session, redirect, url_for, flash, render_template_string, make_response, g
+from markupsafe import Markup
 from functools import wraps
-from bs4 import BeautifulSoup
-from urllib.parse import quote_plus, urlparse, unquote, parse_qsl, urlencode, urlunparse
+from urllib.parse import quote_plus, urlparse, unquote, parse_qsl, urlencode, urlunparse, urljoin
 from urllib import parse
-import trafilatura
 from io import StringIO
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as ConcurrentTimeoutError
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, TimeoutError as ConcurrentTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque, OrderedDict, ChainMap
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
 import threading
+import sqlite3
+import heapq
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines - single process, no cross-worker locking needed
+    fcntl = None
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SESSION_SECRET', 'fallback_secret_key')
@@ -37,49 +47,1565 @@ def cleanup_scraper(error):
         scraper_instance = None
 
 # Server-side lead storage (replaces problematic session storage)
-def get_leads_storage():
-    """Get leads for current user from server-side storage"""
-    if 'username' not in session:
+USER_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'user_data')
+
+def _leads_file(username):
+    return os.path.join(USER_DATA_DIR, f'leads_{username}.json')
+
+LEADS_LOG_COMPACT_BYTES = 4 * 1024 * 1024  # Appended leads are folded into the lead array past this
+
+def _leads_meta_file(username):
+    return os.path.join(USER_DATA_DIR, f'meta_{username}.json')
+
+@contextmanager
+def user_store_lock(username):
+    """Serialize writers to one user's files across threads and gunicorn workers"""
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+    with open(os.path.join(USER_DATA_DIR, f'.lock_{username}'), 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _write_json_atomic(path, data):
+    """Write JSON to a temp file and rename it over the target so readers never see a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _leads_log_file(username):
+    return os.path.join(USER_DATA_DIR, f'leads_{username}.log')
+
+def _write_leads_file(username, leads):
+    """Write a user's full lead list atomically as a JSON array with one lead per line, folding in the append log
+    (call with user_store_lock held); returns the leads' stored form"""
+    path = _leads_file(username)
+    leads = register_businesses(leads)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write('[\n' + ',\n'.join('  ' + json.dumps(lead) for lead in leads) + '\n]' if leads else '[]')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    # A crash before this leaves the logged leads in both files; readers skip the repeats by id
+    try:
+        os.remove(_leads_log_file(username))
+    except FileNotFoundError:
+        pass
+    return leads
+
+def _read_leads_meta(username):
+    try:
+        with open(_leads_meta_file(username), 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def get_leads_version(username):
+    """Version token of a user's lead store - changes on every save"""
+    meta = _read_leads_meta(username)
+    return f"{meta.get('epoch', '0')}.{meta.get('version', 0)}"
+
+def _bump_leads_version(username):
+    """Increment the lead store version (call with user_store_lock held)"""
+    meta = _read_leads_meta(username)
+    # The epoch keeps versions unique if the meta file is ever lost and the counter restarts
+    meta.setdefault('epoch', hashlib.sha1(os.urandom(8)).hexdigest()[:8])
+    meta['version'] = meta.get('version', 0) + 1
+    meta['updated_at'] = datetime.now().isoformat()
+    _write_json_atomic(_leads_meta_file(username), meta)
+    with _leads_changed:
+        _leads_changed.notify_all()
+    return f"{meta['epoch']}.{meta['version']}"
+
+def _read_leads_log(username):
+    """Stored leads in the user's append log, without a torn last line (an append that never completed)"""
+    try:
+        with open(_leads_log_file(username), 'rb') as f:
+            data = f.read()
+    except OSError:
         return []
+    leads = []
+    for line in data[:data.rfind(b'\n') + 1].splitlines():
+        try:
+            leads.append(json.loads(line))
+        except ValueError:
+            print(f"⚠️ Skipping an unreadable line in {username}'s lead log")
+    return leads
+
+def _open_leads_snapshot(username):
+    """(open handle on the lead array or None, stored leads in the append log) as of one moment. The array is only
+    ever replaced whole, so the handle keeps reading one version of it; if a rewrite replaced it while the log was
+    being read, the log may be missing leads that were folded in, so read both again."""
+    for _ in range(5):
+        try:
+            leads_file = open(_leads_file(username), 'r')
+        except OSError:
+            leads_file = None
+        log_leads = _read_leads_log(username)
+        try:
+            current = os.stat(_leads_file(username)).st_ino
+        except OSError:
+            current = None
+        if (os.fstat(leads_file.fileno()).st_ino if leads_file else None) == current:
+            return leads_file, log_leads
+        if leads_file:
+            leads_file.close()
+    with user_store_lock(username):  # Rewritten under us every time - read while writers wait
+        try:
+            leads_file = open(_leads_file(username), 'r')
+        except OSError:
+            leads_file = None
+        return leads_file, _read_leads_log(username)
+
+def _quarantine_leads_file(username):
+    """Move an unreadable lead array aside (call with user_store_lock held), so no later save can overwrite the leads in it"""
+    path = _leads_file(username)
+    quarantined = f"{path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    os.replace(path, quarantined)
+    print(f"⚠️ {username}'s lead file is unreadable - moved to {quarantined} for recovery")
+
+def _without_folded(log_leads, folded_ids):
+    return [lead for lead in log_leads if lead.get('id') not in folded_ids] if folded_ids else log_leads
+
+def load_user_leads(username, _locked=False):
+    """Load a user's leads from server-side storage (the lead array, then the append log)"""
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+    leads_file, log_leads = _open_leads_snapshot(username)
+    data = []
+    if leads_file is not None:
+        try:
+            with leads_file:
+                data = json.load(leads_file)
+            if not isinstance(data, list):
+                raise ValueError('Not a lead list')
+        except ValueError:
+            # Never a half-written file (it's replaced whole) - it was damaged; confirm under the lock, then set it aside
+            if not _locked:
+                with user_store_lock(username):
+                    return load_user_leads(username, _locked=True)
+            _quarantine_leads_file(username)
+            data = []
+        except Exception as e:
+            print(f"⚠️ Error reading leads for {username}: {e}")
+            return []
     
-    username = session['username']
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    leads_file = os.path.join(base_dir, 'user_data', f'leads_{username}.json')
-    
-    try:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(leads_file), exist_ok=True)
+    if log_leads:
+        log_ids = {lead.get('id') for lead in log_leads}
+        data += _without_folded(log_leads, {lead.get('id') for lead in data if isinstance(lead, dict) and lead.get('id') in log_ids})
+    records = _business_records()
+    return [hydrate_lead(lead, records) for lead in data]
+
+def _iter_leads_array(leads_file, chunk_size):
+    """Stored leads from an open JSON array file, decoded a chunk at a time"""
+    decoder = json.JSONDecoder()
+    buffer, position, started = '', 0, False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != '[':
+                    return  # Not a lead list
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                lead, position = decoder.raw_decode(buffer, position)
+                yield lead
+                continue
+            except ValueError:
+                pass  # Lead continues in the next chunk
         
-        # Read existing leads
-        if os.path.exists(leads_file):
-            with open(leads_file, 'r') as f:
-                data = json.load(f)
-                return data
-        else:
-            pass  # No leads file found, will return empty list
+        chunk = leads_file.read(chunk_size)
+        if not chunk:
+            return
+        buffer, position = buffer[position:] + chunk, 0
+
+def take_lead_view_snapshot(username):
+    """(lead view version, snapshot) for iter_user_leads(snapshot=...), the version naming exactly the leads the snapshot
+    reads unless a write is still between writing its data and bumping the version (then it names older content)"""
+    for _ in range(5):
+        version = lead_view_version(username)
+        leads_file, log_leads = _open_leads_snapshot(username)
+        records = _business_records()
+        if lead_view_version(username) == version:
+            break
+        if leads_file:
+            leads_file.close()
+    else:
+        with user_store_lock(username):  # Written under us every time - read while writers wait
+            version = lead_view_version(username)
+            leads_file, log_leads = _open_leads_snapshot(username)
+            records = _business_records()
+    return version, (leads_file, log_leads, records)
+
+def iter_user_leads(username, chunk_size=65536, snapshot=None):
+    """Yield a user's leads one at a time, streaming the lead array in chunks and then the append log
+    (from a take_lead_view_snapshot() snapshot if given)"""
+    if snapshot is None:
+        leads_file, log_leads = _open_leads_snapshot(username)
+        records = _business_records()
+    else:
+        leads_file, log_leads, records = snapshot
+    log_ids = {lead.get('id') for lead in log_leads}
+    folded = set()
+    if leads_file is not None:
+        with leads_file:  # Saves replace the array whole (appends go to the log), so this handle reads one version of it
+            for lead in _iter_leads_array(leads_file, chunk_size):
+                if log_ids and isinstance(lead, dict) and lead.get('id') in log_ids:
+                    folded.add(lead['id'])
+                yield hydrate_lead(lead, records)
+    for lead in _without_folded(log_leads, folded):
+        yield hydrate_lead(lead, records)
+
+def save_user_leads(username, leads):
+    """Save a user's leads to server-side storage and bump the store version"""
+    try:
+        for lead in leads:
+            if isinstance(lead, dict) and not lead.get('id'):
+                lead['id'] = lead_id(lead)
+        with user_store_lock(username):
+            stored, registry = rehydrate_stored(_write_leads_file(username, leads))
+            # Bump after the data is in place so a version never names older content
+            version = _bump_leads_version(username)
+            _write_lead_index(username, [lead for lead in stored if isinstance(lead, dict)], version, registry)
     except Exception as e:
-        pass  # Error reading leads, will return empty list
+        pass  # Error saving leads, operation will silently fail
+
+def _append_leads_file(username, leads):
+    """Append leads to the user's append log, one JSON line each, durable before this returns (call with user_store_lock
+    held); returns their stored form. The lead array itself is never modified in place, so a crash can at worst lose
+    the line being written."""
+    log_file = _leads_log_file(username)
+    refs = register_businesses(leads)
+    encoded = ''.join(json.dumps(lead) + '\n' for lead in refs).encode('utf-8')
+    with open(log_file, 'a+b') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                # An earlier append died mid-line - cut the partial line off so ours starts on a line of its own
+                f.seek(0)
+                f.truncate(f.read().rfind(b'\n') + 1)
+        f.write(encoded)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    if size > LEADS_LOG_COMPACT_BYTES:
+        _write_leads_file(username, load_user_leads(username, _locked=True))
+    return refs
+
+def format_phone_number(phone_text):
+    """Format phone number consistently"""
+    if not phone_text:
+        return ''
+    
+    # Extract digits only
+    digits = NON_DIGIT_PATTERN.sub('', phone_text)
+    
+    # Format as US phone number if 10 digits
+    if len(digits) == 10:
+        return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    elif len(digits) == 11 and digits[0] == '1':
+        return f"({digits[1:4]}) {digits[4:7]}-{digits[7:]}"
+    
+    return phone_text
+
+def extract_domain(url):
+    """Extract domain from URL"""
+    try:
+        parsed = urlparse(url)
+        return parsed.netloc.lower()
+    except:
+        return ''
+
+# Social networks, directories and site builders host many businesses under one registrable domain,
+# so their domains never identify a lead
+SHARED_PLATFORM_DOMAINS = frozenset({
+    'facebook.com', 'instagram.com', 'linkedin.com', 'twitter.com', 'x.com', 'youtube.com', 'tiktok.com',
+    'yelp.com', 'yellowpages.com', 'google.com', 'bing.com', 'linktr.ee', 'wix.com', 'wixsite.com',
+    'squarespace.com', 'wordpress.com', 'blogspot.com', 'weebly.com', 'godaddysites.com', 'business.site',
+    'square.site', 'carrd.co', 'webflow.io', 'shopify.com', 'myshopify.com'
+})
+
+def normalize_phone(phone_text):
+    """E.164 form of a phone number (+16177423050), or '' when it can't be normalized"""
+    phone_text = str(phone_text or '').strip()
+    digits = NON_DIGIT_PATTERN.sub('', phone_text)
+    # Same NANP rules as format_phone_number: 10 digits, or 11 with the leading country code 1
+    if len(digits) == 10:
+        return f"+1{digits}"
+    if len(digits) == 11 and digits[0] == '1':
+        return f"+{digits}"
+    if phone_text.startswith('+') and 8 <= len(digits) <= 15:
+        return f"+{digits}"
+    return ''
+
+def _registrable_domain(host):
+    """Registrable domain of a host via the tld package's public suffix list (memoized - hosts repeat across leads)"""
+    if host.count('.') == 1:
+        return host  # example.com - two labels are always the registrable domain itself
+    domain = _registrable_domain_cache.get(host)
+    if domain is None:
+        from tld import get_fld
+        domain = get_fld(host, fix_protocol=True, fail_silently=True) or host
+        if len(_registrable_domain_cache) >= 50000:
+            _registrable_domain_cache.clear()
+        _registrable_domain_cache[host] = domain
+    return domain
+
+_registrable_domain_cache = {}
+
+def normalize_domain(url_or_domain):
+    """Registrable domain (x.com for http://www.x.com/ or shop.x.co.uk -> x.co.uk), or '' for shared platforms"""
+    value = str(url_or_domain or '').strip().lower()
+    # Plain string splitting - this runs for every lead on every index rebuild
+    host = value.split('://', 1)[-1].split('/', 1)[0].split('?', 1)[0].split('#', 1)[0]
+    host = host.rsplit('@', 1)[-1].split(':', 1)[0].rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if not host or '.' not in host:
+        return ''
+    domain = _registrable_domain(host)
+    return '' if domain in SHARED_PLATFORM_DOMAINS else domain
+
+def normalize_email(email):
+    """Lowercased email address, or '' when it doesn't look like one"""
+    email = str(email or '').strip().lower()
+    if email.startswith('mailto:'):
+        email = email[7:]
+    return email if email.count('@') == 1 and '.' in email.split('@')[1] else ''
+
+def lead_signature(lead):
+    """Dedup signature: business name plus phone, or plus website when there is no phone (both normalized)"""
+    name = ' '.join(str(lead.get('name') or '').lower().split())
+    if not name:
+        return None
+    phone = str(lead.get('phone') or '').strip()
+    website = str(lead.get('website') or '').strip()
+    if phone:
+        return f"{name}|{normalize_phone(phone) or phone}"
+    if website:
+        return f"{name}|{normalize_domain(website) or website.lower().rstrip('/')}"
+    return name
+
+def lead_index_keys(lead):
+    """Every index key for a lead: its dedup signature and its normalized phone, domain and email"""
+    keys = []
+    signature = lead_signature(lead)
+    if signature:
+        keys.append(f"sig:{signature}")
+    phone = normalize_phone(lead.get('phone'))
+    if phone:
+        keys.append(f"phone:{phone}")
+    domain = normalize_domain(lead.get('website') or lead.get('domain'))
+    if domain:
+        keys.append(f"domain:{domain}")
+    email = normalize_email(lead.get('email'))
+    if email:
+        keys.append(f"email:{email}")
+    return keys
+
+# Business registry - one shared record per business (user_data/businesses.db) keyed by normalized phone and domain.
+# User lead files hold a business_id plus their own fields and any values that differ from the shared record;
+# reads merge the record back in, so a business crawled for one user is enriched for everyone who finds it.
+BUSINESS_REGISTRY_FILE = os.path.join(USER_DATA_DIR, 'businesses.db')
+BUSINESS_FIELDS = ('name', 'phone', 'website', 'domain', 'address', 'email', 'industry', 'description', 'hours',
+                   'rating', 'facebook', 'linkedin', 'twitter', 'instagram', 'youtube', 'tiktok', 'pinterest',
+                   'snapchat', 'whatsapp', 'telegram', 'enriched_at', 'extracted_at', 'crawl_validators')
+# Filled once, then kept; every other business field is replaced by a newer crawl (a later enriched_at)
+BUSINESS_IDENTITY_FIELDS = ('name', 'phone', 'website', 'domain', 'address')
+BUSINESS_ENRICHMENT_TTL = int(os.environ.get('BUSINESS_ENRICHMENT_TTL', 14 * 24 * 3600))
+
+_business_registry = {'epoch': None, 'seq': 0, 'records': {}, 'keys': {}}
+_business_registry_lock = threading.RLock()
+
+def _open_business_registry():
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+    connection = sqlite3.connect(BUSINESS_REGISTRY_FILE, timeout=30, isolation_level=None)
+    connection.execute("CREATE TABLE IF NOT EXISTS businesses (business_id TEXT PRIMARY KEY, record TEXT, seq INTEGER)")
+    connection.execute("CREATE INDEX IF NOT EXISTS businesses_seq ON businesses (seq)")
+    # The epoch tells a recreated registry (seq restarting from 1) apart from the one a process has loaded
+    connection.execute("CREATE TABLE IF NOT EXISTS registry_epoch (id INTEGER PRIMARY KEY CHECK (id = 1), epoch TEXT)")
+    if connection.execute("SELECT 1 FROM registry_epoch").fetchone() is None:
+        connection.execute("INSERT OR IGNORE INTO registry_epoch VALUES (1, ?)", (hashlib.sha1(os.urandom(8)).hexdigest()[:8],))
+    return connection
+
+def business_keys(lead):
+    """Registry keys for a lead: its normalized phone and domain (either may be missing)"""
+    keys = []
+    phone = normalize_phone(lead.get('phone'))
+    if phone:
+        keys.append(f"phone:{phone}")
+    domain = normalize_domain(lead.get('website') or lead.get('domain'))
+    if domain:
+        keys.append(f"domain:{domain}")
+    return keys
+
+def _index_business(keys_map, business_id, record):
+    for key in business_keys(record):
+        ids = keys_map.get(key, ())
+        if business_id not in ids:
+            # A key can be shared, e.g. by a chain's locations; tuples keep the live map unchanged under an overlay
+            keys_map[key] = ids + (business_id,)
+
+def _sync_business_registry(connection):
+    """Pull records other threads and workers wrote since the last sync into this process (call with the registry lock held)"""
+    epoch = connection.execute("SELECT epoch FROM registry_epoch").fetchone()[0]
+    if epoch != _business_registry['epoch']:
+        _business_registry['records'].clear()
+        _business_registry['keys'].clear()
+        _business_registry.update(epoch=epoch, seq=0)
+    rows = connection.execute("SELECT business_id, record, seq FROM businesses WHERE seq > ? ORDER BY seq",
+                              (_business_registry['seq'],)).fetchall()
+    for business_id, record, seq in rows:
+        record = json.loads(record)
+        _business_registry['records'][business_id] = record
+        _index_business(_business_registry['keys'], business_id, record)
+        _business_registry['seq'] = seq
+
+def _match_business(lead, records, keys_map):
+    """(business_id, record) the lead belongs to, or (None, None): a record sharing its phone or domain, with a
+    compatible name and no conflicting phone (a chain's other locations share the website but not the number)"""
+    name = normalize_name(lead.get('name'))
+    if not name:
+        return None, None
+    phone = normalize_phone(lead.get('phone'))
+    for key in business_keys(lead):
+        for business_id in keys_map.get(key, ()):
+            record = records[business_id]
+            other_name = normalize_name(record.get('name'))
+            other_phone = normalize_phone(record.get('phone'))
+            names_agree = other_name and (f' {name} ' in f' {other_name} ' or f' {other_name} ' in f' {name} ')
+            if names_agree and not (phone and other_phone and phone != other_phone):
+                return business_id, record
+    return None, None
+
+def _merge_business(record, lead):
+    """Record with the lead's business fields folded in - the same dict when nothing changed"""
+    newer = str(lead.get('enriched_at') or '') > str(record.get('enriched_at') or '')
+    merged = None
+    for field in BUSINESS_FIELDS:
+        if field not in lead:
+            continue
+        value = lead[field]
+        current = record.get(field)
+        if field in record and (current == value or not value):
+            continue
+        if field not in record or not current or (newer and field not in BUSINESS_IDENTITY_FIELDS):
+            merged = merged if merged is not None else dict(record)
+            merged[field] = value
+    return merged if merged is not None else record
+
+class HydratedLead(dict):
+    """A stored lead merged over its shared business record, remembering the record and the lead's own business
+    values as loaded so that saving it stores only what changed"""
+    __slots__ = ('record', 'overrides')
+
+def _business_ref(lead, record):
+    """Stored form of a lead registered to a record: its own fields plus the business values it overrides, with ''
+    as a tombstone for a shared value the user cleared. Values a HydratedLead got from the record are left out."""
+    loaded = getattr(lead, 'record', None)
+    ref = {}
+    for field, value in lead.items():
+        if field not in BUSINESS_FIELDS:
+            ref[field] = value
+        elif (value or None) == (record.get(field) or None):
+            continue  # Same as the shared record
+        elif loaded is None:
+            if value:
+                ref[field] = value  # A new or rebuilt lead - an empty value means unknown, not cleared
+        elif field in lead.overrides or value != loaded.get(field):
+            ref[field] = value  # The user's own value, or changed since it was loaded
+    if loaded is not None:
+        for field in loaded:
+            if field not in lead and record.get(field):
+                ref[field] = ''
+    return ref
+
+def register_businesses(leads):
+    """Fold leads into the registry and return their stored form: business_id, user fields and overriding values"""
+    try:
+        with _business_registry_lock:
+            connection = _open_business_registry()
+            try:
+                connection.execute("BEGIN IMMEDIATE")  # Serializes registry writers across workers
+                _sync_business_registry(connection)
+                records, keys_map = _business_registry['records'], _business_registry['keys']
+                changed, refs = {}, []
+                # Batch-local overlays over the live maps until the transaction commits
+                pending_records, pending_keys = ChainMap({}, records), ChainMap({}, keys_map)
+                for lead in leads:
+                    if not isinstance(lead, dict):
+                        refs.append(lead)
+                        continue
+                    business_id = lead.get('business_id')
+                    record = pending_records.get(business_id) if business_id else None
+                    if record is None:
+                        business_id, record = _match_business(lead, pending_records, pending_keys)
+                    if record is None:
+                        if not business_keys(lead):
+                            refs.append(lead)  # Nothing identifies it across users - keep the lead whole
+                            continue
+                        business_id, record = hashlib.sha1(os.urandom(8)).hexdigest()[:16], {}
+                    merged = _merge_business(record, lead)
+                    if merged is not record or business_id not in pending_records:
+                        pending_records[business_id] = changed[business_id] = merged
+                        _index_business(pending_keys, business_id, merged)
+                    if not lead.get('id'):
+                        lead['id'] = lead_id(lead)
+                    lead['business_id'] = business_id
+                    refs.append(_business_ref(lead, merged))
+                if changed:
+                    seq = connection.execute("SELECT coalesce(max(seq), 0) FROM businesses").fetchone()[0] + 1
+                    connection.executemany("INSERT OR REPLACE INTO businesses VALUES (?, ?, ?)",
+                                           [(business_id, json.dumps(record), seq) for business_id, record in changed.items()])
+                connection.execute("COMMIT")
+                if changed:
+                    records.update(pending_records.maps[0])
+                    keys_map.update(pending_keys.maps[0])
+                    _business_registry['seq'] = seq
+                return refs
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            finally:
+                connection.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Business registry unavailable, storing leads whole: {e}")
+        return leads
+
+def _business_records():
+    """The registry's records, synced with other workers' writes"""
+    with _business_registry_lock:
+        if os.path.exists(BUSINESS_REGISTRY_FILE):
+            try:
+                connection = _open_business_registry()
+                try:
+                    _sync_business_registry(connection)
+                finally:
+                    connection.close()
+            except sqlite3.Error as e:
+                print(f"⚠️ Business registry sync failed: {e}")
+        return _business_registry['records']
+
+def business_registry_version():
+    """Version token of the shared registry - hydrated leads change with it as well as with the user's own store"""
+    with _business_registry_lock:
+        _business_records()
+        return f"{_business_registry['epoch'] or '0'}.{_business_registry['seq']}"
+
+def business_registry_changes(since):
+    """(registry version now, ids of the businesses changed after version `since`) - the ids are None when `since` is
+    from another registry epoch, or unknown, so anything may have changed"""
+    version = business_registry_version()
+    epoch, seq = version.split('.')
+    since_epoch, _, since_seq = str(since or '').partition('.')
+    if since_epoch != epoch or not since_seq.isdigit() or int(since_seq) > int(seq):
+        return version, None
+    if int(since_seq) == int(seq):
+        return version, set()
+    try:
+        connection = _open_business_registry()
+        try:
+            rows = connection.execute("SELECT business_id FROM businesses WHERE seq > ? AND seq <= ?",
+                                      (int(since_seq), int(seq))).fetchall()
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Business registry changes unavailable: {e}")
+        return version, None
+    return version, {row[0] for row in rows}
+
+def rehydrate_stored(refs):
+    """(leads as they read back after a write, registry version they were hydrated at): stored refs merged with the
+    records this process holds - a write has just synced them"""
+    with _business_registry_lock:
+        records = _business_registry['records']
+        return ([hydrate_lead(ref, records) for ref in refs],
+                f"{_business_registry['epoch'] or '0'}.{_business_registry['seq']}")
+
+def hydrate_lead(stored, records):
+    """A stored lead with its shared business record merged underneath it (an explicitly empty value stays empty)"""
+    record = records.get(stored.get('business_id')) if isinstance(stored, dict) else None
+    if not record:
+        return stored
+    lead = HydratedLead(record)
+    lead.update(stored)
+    lead.record = record
+    lead.overrides = {field for field in stored if field in BUSINESS_FIELDS}
+    return lead
+
+def lookup_businesses(leads):
+    """Copy of the shared record for each lead's business (with its business_id), or None where nobody has stored it"""
+    records = _business_records()
+    found = []
+    with _business_registry_lock:
+        for lead in leads:
+            business_id, record = _match_business(lead, records, _business_registry['keys'])
+            found.append(dict(record, business_id=business_id) if record else None)
+    return found
+
+def is_recently_enriched(record):
+    """True when a business was crawled for contact info within BUSINESS_ENRICHMENT_TTL"""
+    try:
+        return time.time() - datetime.fromisoformat(record['enriched_at']).timestamp() < BUSINESS_ENRICHMENT_TTL
+    except (KeyError, TypeError, ValueError):
+        return False
+
+# Lead freshness - when each contact field was last extracted, and a re-crawl planner that spends fetches on the
+# stalest, highest-priority leads first
+CONTACT_INFO_FIELDS = ('email', 'facebook', 'linkedin', 'twitter', 'instagram', 'youtube', 'tiktok', 'pinterest',
+                       'snapchat', 'whatsapp', 'telegram')
+RECRAWL_MIN_AGE_DAYS = int(os.environ.get('RECRAWL_MIN_AGE_DAYS', 30))
+RECRAWL_NEVER_CRAWLED_AGE_DAYS = 365  # Leads that were never crawled rank as if a year stale
+RECRAWL_BATCH_SIZE = 25
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def lead_crawl_age_days(lead, now=None):
+    """Days since the lead's site was last crawled (its oldest extracted field if the crawl time is missing), or None if never"""
+    crawled = _timestamp(lead.get('enriched_at'))
+    if crawled is None:
+        extracted = [_timestamp(value) for value in (lead.get('extracted_at') or {}).values()]
+        crawled = min((value for value in extracted if value is not None), default=None)
+    return None if crawled is None else ((now or time.time()) - crawled) / 86400
+
+def plan_recrawl(leads, limit=RECRAWL_BATCH_SIZE, min_age_days=RECRAWL_MIN_AGE_DAYS):
+    """(leads to crawl next, number eligible): leads with a website not crawled for min_age_days, stalest and
+    highest-priority first (age in days weighted by 1 + priority_score / 4)"""
+    now = time.time()
+    scored = []
+    for position, lead in enumerate(leads):
+        if not isinstance(lead, dict) or not lead.get('website'):
+            continue
+        age = lead_crawl_age_days(lead, now)
+        age = RECRAWL_NEVER_CRAWLED_AGE_DAYS if age is None else age
+        if age >= min_age_days:
+            scored.append((age * (1 + _numeric_sort_value(lead.get('priority_score')) / 4), -position))
+    return [leads[-position] for _, position in heapq.nlargest(limit, scored)], len(scored)
+
+def apply_contact_info(lead, info, crawled_at, overwrite=False):
+    """Fold one crawl's contact info into a lead, stamping extracted_at for every field it found; returns changed fields.
+    A guessed email (info['email_guessed'], e.g. info@domain when no page had one) only fills an empty email, and an
+    email the pages still list (info['emails']) is kept over the crawl's first pick."""
+    extracted = dict(lead.get('extracted_at') or {})
+    changed = []
+    for field in CONTACT_INFO_FIELDS:
+        value = info.get(field)
+        if not value:
+            continue
+        guessed = field == 'email' and info.get('email_guessed')
+        if field == 'email' and lead.get('email') in (info.get('emails') or ()):
+            value = lead['email']  # The site still lists the stored address - keep it rather than whichever came first
+        if value != lead.get(field) and ((overwrite and not guessed) or not lead.get(field)):
+            lead[field] = value
+            changed.append(field)
+        if lead.get(field) == value and not guessed:
+            extracted[field] = crawled_at
+    lead['extracted_at'] = extracted
+    lead['enriched_at'] = crawled_at
+    return changed
+
+def conditional_validators(validators):
+    """A crawl's per-page ETag/Last-Modified, or {} if any page had neither (a 304 could then hide a changed page)"""
+    return validators if validators and all(validators.values()) else {}
+
+def confirm_contact_info(lead, crawled_at):
+    """The site answered 304 Not Modified: every field it gave before is current as of crawled_at"""
+    extracted = dict(lead.get('extracted_at') or {})
+    for field in CONTACT_INFO_FIELDS:
+        if lead.get(field):
+            extracted[field] = crawled_at
+    lead['extracted_at'] = extracted
+    lead['enriched_at'] = crawled_at
+
+# Lead index - an append-only log per user (user_data/index_<username>.jsonl) mapping dedup signatures and
+# normalized phone/domain/email keys to lead ids. Each committed batch ends with the store version it belongs to
+# and the registry version its leads were hydrated at, and every process replays only the tail it hasn't seen.
+LEAD_INDEX_FORMAT = 2
+LEAD_INDEX_CACHE_SIZE = 16
+_lead_indexes = OrderedDict()
+_lead_indexes_lock = threading.Lock()
+
+def _lead_index_file(username):
+    return os.path.join(USER_DATA_DIR, f'index_{username}.jsonl')
+
+def _lead_index_entries(leads):
+    entries = []
+    for lead in leads:
+        keys = lead_index_keys(lead)
+        if keys:
+            entries.append({'add': keys, 'id': lead.get('id') or lead_id(lead)})
+    return entries
+
+def _lead_index_marker(version, registry):
+    return json.dumps({'version': version, 'format': LEAD_INDEX_FORMAT, 'registry': registry})
+
+def _write_lead_index(username, leads, version, registry):
+    """Rebuild a user's lead index from a full lead list hydrated at a registry version (call with user_store_lock held)"""
+    lines = [json.dumps(entry) for entry in _lead_index_entries(leads)]
+    lines.append(_lead_index_marker(version, registry))
+    index_file = _lead_index_file(username)
+    tmp_path = f"{index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, index_file)
+
+def _append_lead_index(username, entries, version, registry=None):
+    """Log index changes for one committed batch (call with user_store_lock held); the registry version stays as it
+    was unless given - other leads' entries still date from then"""
+    if registry is None:
+        registry = (load_lead_index(username) or {}).get('registry')
+    lines = [json.dumps(entry) for entry in entries]
+    lines.append(_lead_index_marker(version, registry))
+    with open(_lead_index_file(username), 'a') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def _index_add(keys_map, key, lead_ref):
+    current = keys_map.get(key)
+    if current is None:
+        keys_map[key] = lead_ref
+    elif isinstance(current, list):
+        if lead_ref not in current:
+            current.append(lead_ref)
+    elif current != lead_ref:
+        keys_map[key] = [current, lead_ref]  # Several leads share this key (e.g. a chain's head-office phone)
+
+def _index_remove(keys_map, key, lead_ref):
+    current = keys_map.get(key)
+    if isinstance(current, list):
+        if lead_ref in current:
+            current.remove(lead_ref)
+        if len(current) == 1:
+            keys_map[key] = current[0]
+    elif current == lead_ref:
+        del keys_map[key]
+
+def load_lead_index(username):
+    """The user's lead index, caught up with entries other workers appended since the last call"""
+    try:
+        stat = os.stat(_lead_index_file(username))
+    except OSError:
+        return None
     
-    return []
+    with _lead_indexes_lock:
+        index = _lead_indexes.get(username)
+        if not index or index['inode'] != stat.st_ino or stat.st_size < index['offset']:
+            # First use in this process, or the index was rebuilt - replay it from the start
+            index = {'inode': stat.st_ino, 'offset': 0, 'version': None, 'format': None, 'registry': None, 'keys': {}}
+        _lead_indexes[username] = index
+        _lead_indexes.move_to_end(username)
+        while len(_lead_indexes) > LEAD_INDEX_CACHE_SIZE:
+            _lead_indexes.popitem(last=False)
+        
+        if stat.st_size > index['offset']:
+            with open(_lead_index_file(username), 'rb') as f:
+                f.seek(index['offset'])
+                data = f.read(stat.st_size - index['offset'])
+            complete = data[:data.rfind(b'\n') + 1]  # Leave a half-written last line for next time
+            keys_map = index['keys']
+            for line in complete.splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if 'add' in entry:
+                    for key in entry['add']:
+                        _index_add(keys_map, key, entry.get('id'))
+                elif 'del' in entry:
+                    for key in entry['del']:
+                        _index_remove(keys_map, key, entry.get('id'))
+                elif 'version' in entry:
+                    index['version'] = entry['version']
+                    index['format'] = entry.get('format')
+                    index['registry'] = entry.get('registry')
+            index['offset'] += len(complete)
+        return index
+
+def _is_current_lead_index(index, username):
+    return index is not None and index['format'] == LEAD_INDEX_FORMAT and index['version'] == get_leads_version(username)
+
+def _lead_index_removals(index, ids):
+    """'del' entries for every key the index holds for these lead ids - whatever hydration those keys came from"""
+    keys_by_id = {}
+    if ids:
+        for key, refs in index['keys'].items():
+            for lead_ref in (refs if isinstance(refs, list) else (refs,)):
+                if lead_ref in ids:
+                    keys_by_id.setdefault(lead_ref, []).append(key)
+    return [{'del': keys, 'id': lead_ref} for lead_ref, keys in keys_by_id.items()]
+
+def _leads_changed_in_registry(username, since, store_version, _locked=False):
+    """(registry version now, the user's leads whose shared record changed after registry version `since`), or None
+    when they can't be told apart and the index has to be rebuilt"""
+    registry, changed = business_registry_changes(since)
+    if changed is None:
+        return None
+    if not changed:
+        return registry, []
+    view = get_lead_view(username, _locked=_locked)
+    if view['store_version'] != store_version:
+        return None
+    return registry, [lead for lead in view['leads'] if lead.get('business_id') in changed]
+
+def _catch_up_lead_index(username, index):
+    """Re-index the leads whose shared record changed since the index was written; False if it needs a rebuild
+    (call with user_store_lock held)"""
+    caught_up = _leads_changed_in_registry(username, index['registry'], index['version'], _locked=True)
+    if caught_up is None:
+        return False
+    registry, leads = caught_up
+    entries = _lead_index_removals(index, {lead['id'] for lead in leads}) + _lead_index_entries(leads)
+    _append_lead_index(username, entries, index['version'], registry)
+    return True
+
+def _current_lead_index(username):
+    """Lead index matching the current store version, rebuilt from the store if it's missing or stale (call with
+    user_store_lock held) - enough for dedup and for dropping a lead's keys, which don't depend on shared records"""
+    index = load_lead_index(username)
+    if _is_current_lead_index(index, username):
+        return index
+    return _rebuild_lead_index(username)
+
+def _rebuild_lead_index(username):
+    print(f"🔁 Rebuilding lead index for {username}")
+    registry = business_registry_version()
+    _write_lead_index(username, [lead for lead in iter_user_leads(username) if isinstance(lead, dict)],
+                      get_leads_version(username), registry)
+    return load_lead_index(username)
+
+def get_lead_index(username):
+    """The user's lead index, current with the store and with the shared records its keys were hydrated from (taking
+    the store lock only if it needs a rebuild or a catch-up)"""
+    index = load_lead_index(username)
+    if _is_current_lead_index(index, username) and index['registry'] == business_registry_version():
+        return index
+    with user_store_lock(username):
+        index = _current_lead_index(username)
+        if index['registry'] != business_registry_version():
+            index = load_lead_index(username) if _catch_up_lead_index(username, index) else _rebuild_lead_index(username)
+    return index
+
+def is_known_lead(keys_map, lead):
+    """True when a lead's dedup signature or normalized phone is already in a user's lead index"""
+    signature = lead_signature(lead)
+    phone = normalize_phone(lead.get('phone'))
+    return bool((signature and f"sig:{signature}" in keys_map) or (phone and f"phone:{phone}" in keys_map))
+
+def find_lead_ids(username, phone=None, domain=None, email=None):
+    """Exact-match lookup of lead ids by normalized phone, website/domain and email - O(1) per key"""
+    index = get_lead_index(username)
+    matches = {}
+    for field, normalize, value in (('phone', normalize_phone, phone), ('domain', normalize_domain, domain),
+                                    ('email', normalize_email, email)):
+        key = normalize(value) if value else ''
+        if key:
+            found = index['keys'].get(f"{field}:{key}")
+            matches[field] = {'key': key, 'ids': list(found) if isinstance(found, list) else [found] if found else []}
+    return matches
+
+def deduplicate_leads(username, new_leads):
+    """New leads whose signature is not in the user's lead index (or earlier in the batch) - O(batch)"""
+    keys_map = _current_lead_index(username)['keys']
+    batch_signatures = set()
+    unique_new_leads = []
+    for lead in new_leads:
+        signature = lead_signature(lead)
+        if signature and f"sig:{signature}" not in keys_map and signature not in batch_signatures:
+            unique_new_leads.append(lead)
+            batch_signatures.add(signature)
+    
+    print(f"Filtered {len(new_leads) - len(unique_new_leads)} duplicate leads")
+    return unique_new_leads
+
+def store_new_leads(username, new_leads):
+    """Deduplicate a batch against the index and append the unique leads to the store; returns the appended leads"""
+    with user_store_lock(username):
+        unique_new_leads = deduplicate_leads(username, new_leads)
+        if unique_new_leads:
+            for lead in unique_new_leads:
+                if not lead.get('id'):
+                    lead['id'] = lead_id(lead)
+            previous_version = get_leads_version(username)
+            # Indexed as the leads read back, with whatever the shared records already knew about them
+            stored, _ = rehydrate_stored(_append_leads_file(username, unique_new_leads))
+            version = _bump_leads_version(username)
+            _append_lead_index(username, _lead_index_entries(stored), version)
+            _update_lead_name_index(username, previous_version, version, added=stored)
+            _update_lead_search_index(username, previous_version, version, added=stored)
+        
+        # Duplicates take the id of the stored lead they match, so callers can refer to the whole batch by id
+        keys_map = _current_lead_index(username)['keys']
+        for lead in new_leads:
+            if not lead.get('id'):
+                existing = keys_map.get(f"sig:{lead_signature(lead)}")
+                if existing:
+                    lead['id'] = existing[0] if isinstance(existing, list) else existing
+    return unique_new_leads
+
+def delete_user_leads(username, ids):
+    """Delete leads by id; returns how many were removed"""
+    ids = set(ids)
+    with user_store_lock(username):
+        leads = load_user_leads(username, _locked=True)
+        removed = [lead for lead in leads if isinstance(lead, dict) and (lead.get('id') or lead_id(lead)) in ids]
+        if removed:
+            index = _current_lead_index(username)  # Make sure the index is current before logging deletes against it
+            kept = [lead for lead in leads if not (isinstance(lead, dict) and (lead.get('id') or lead_id(lead)) in ids)]
+            previous_version = get_leads_version(username)
+            _write_leads_file(username, kept)
+            version = _bump_leads_version(username)
+            _append_lead_index(username, _lead_index_removals(index, {lead.get('id') or lead_id(lead) for lead in removed}), version)
+            _update_lead_name_index(username, previous_version, version, removed=removed)
+            _update_lead_search_index(username, previous_version, version, removed=removed)
+    return len(removed)
+
+def update_user_leads(username, ids, update):
+    """Call update(lead) on each stored lead in ids under the store lock and save them; returns how many were found"""
+    ids = set(ids)
+    with user_store_lock(username):
+        leads = load_user_leads(username, _locked=True)
+        before, after = [], []
+        for lead in leads:
+            if isinstance(lead, dict) and (lead.get('id') or lead_id(lead)) in ids:
+                before.append(dict(lead))
+                update(lead)
+                after.append(lead)
+        if after:
+            index = _current_lead_index(username)  # Make sure the index is current before logging changes against it
+            previous_version = get_leads_version(username)
+            after_ids = {lead.get('id') or lead_id(lead) for lead in after}
+            removals = _lead_index_removals(index, after_ids)
+            after, _ = rehydrate_stored([ref for ref in _write_leads_file(username, leads)
+                                         if isinstance(ref, dict) and (ref.get('id') or lead_id(ref)) in after_ids])
+            version = _bump_leads_version(username)
+            _append_lead_index(username, removals + _lead_index_entries(after), version)
+            _update_lead_name_index(username, previous_version, version, added=after, removed=before)
+            _update_lead_search_index(username, previous_version, version, added=after, removed=before)
+    return len(after)
+
+def get_leads_storage():
+    """Get leads for current user from server-side storage"""
+    if 'username' not in session:
+        return []
+    return load_user_leads(session['username'])
 
 def save_leads_storage(leads):
     """Save leads for current user to server-side storage"""
     if 'username' not in session:
         return
+    save_user_leads(session['username'], leads)
+
+# Lead queries - filters, sort keys and keyset cursors over a per-process view of the lead store
+LEAD_QUERY_FILTERS = ('lead_type', 'industry', 'location_tier', 'source')
+LEAD_SOCIAL_FIELDS = ('facebook', 'linkedin', 'twitter', 'instagram')
+LEAD_PROFILE_SOCIAL_FIELDS = ('linkedin', 'facebook', 'twitter', 'instagram', 'youtube', 'tiktok', 'pinterest')
+LEAD_PAGE_SIZE = 50
+LEAD_MAX_PAGE_SIZE = 500
+LEAD_VIEW_CACHE_SIZE = 16
+LEAD_SUGGEST_LIMIT = 8
+LEAD_SUGGEST_FIELDS = ('id', 'name', 'phone', 'website', 'address')
+
+def _numeric_sort_value(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+LEAD_SORT_FIELDS = {
+    'created_at': lambda lead: str(lead.get('created_at') or ''),
+    'priority_score': lambda lead: _numeric_sort_value(lead.get('priority_score')),
+    'name': lambda lead: str(lead.get('name') or '').lower(),
+    'industry': lambda lead: str(lead.get('industry') or '').lower(),
+}
+
+_lead_views = OrderedDict()
+_lead_views_lock = threading.Lock()
+
+def lead_id(lead):
+    """Stable id for a lead, derived from the fields that identify it"""
+    identity = '|'.join(str(lead.get(field) or '') for field in ('created_at', 'name', 'website', 'phone'))
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+
+def _lead_has_social(lead):
+    return any(lead.get(field) for field in LEAD_SOCIAL_FIELDS)
+
+def lead_view_version(username):
+    """Version token of a user's hydrated leads: their store version and the registry version"""
+    return f"{get_leads_version(username)}.{business_registry_version()}"
+
+def get_lead_view(username, _locked=False):
+    """Leads plus cached sort orders and counts for the current lead view version (shared by all requests in this process)"""
+    store_version, registry_version = get_leads_version(username), business_registry_version()
+    version = f"{store_version}.{registry_version}"
+    with _lead_views_lock:
+        view = _lead_views.get(username)
+        if view and view['version'] == version:
+            _lead_views.move_to_end(username)
+            return view
     
-    username = session['username']
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    leads_file = os.path.join(base_dir, 'user_data', f'leads_{username}.json')
+    leads = [lead for lead in load_user_leads(username, _locked=_locked) if isinstance(lead, dict)]
+    for lead in leads:
+        if not lead.get('id'):
+            lead['id'] = lead_id(lead)  # Leads saved before ids existed
+    by_type = {}
+    for lead in leads:
+        lead_type = lead.get('lead_type') or 'Unknown'
+        by_type[lead_type] = by_type.get(lead_type, 0) + 1
+    view = {
+        'version': version,
+        'store_version': store_version,
+        'registry_version': registry_version,
+        'leads': leads,
+        'by_id': {lead['id']: lead for lead in leads},
+        'orders': {},
+        'counts': {
+            'total': len(leads),
+            'by_type': by_type,
+            'social': sum(1 for lead in leads if _lead_has_social(lead)),
+            'with_email': sum(1 for lead in leads if lead.get('email'))
+        }
+    }
+    with _lead_views_lock:
+        _lead_views[username] = view
+        _lead_views.move_to_end(username)
+        while len(_lead_views) > LEAD_VIEW_CACHE_SIZE:
+            _lead_views.popitem(last=False)
+    return view
+
+def _lead_order(view, sort_field):
+    """Leads sorted ascending by (sort value, id), with the matching key list for bisecting"""
+    order = view['orders'].get(sort_field)
+    if order is None:
+        sort_value = LEAD_SORT_FIELDS[sort_field]
+        keyed = sorted((((sort_value(lead), lead['id']), lead) for lead in view['leads']), key=lambda item: item[0])
+        order = ([key for key, _ in keyed], [lead for _, lead in keyed])
+        view['orders'][sort_field] = order
+    return order
+
+def _encode_lead_cursor(sort, key):
+    return base64.urlsafe_b64encode(json.dumps([sort, *key]).encode()).decode().rstrip('=')
+
+def _decode_lead_cursor(cursor, sort):
+    """The (sort value, id) key a cursor resumes after; a cursor issued for another sort is rejected, its values
+    wouldn't compare with this sort's keys"""
+    try:
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort={cursor_sort}, not sort={sort}")
+    return (value, str(last_id))
+
+def _lead_matches(lead, filters):
+    for field, value in filters.items():
+        if field == 'has_email':
+            if bool(lead.get('email')) != value:
+                return False
+        elif field == 'lead_type' and value == 'social':
+            if not _lead_has_social(lead):
+                return False
+        elif (lead.get(field) or '') != value:
+            return False
+    return True
+
+def parse_lead_query(args):
+    """Turn request args into query_leads keyword arguments (raises ValueError on bad input)"""
+    filters = {}
+    for field in LEAD_QUERY_FILTERS:
+        value = args.get(field, '').strip()
+        if value and value != 'all':
+            filters[field] = value
+    has_email = args.get('has_email', '').strip().lower()
+    if has_email in ('1', 'true', 'yes'):
+        filters['has_email'] = True
+    elif has_email in ('0', 'false', 'no'):
+        filters['has_email'] = False
     
+    sort = args.get('sort', '-created_at').strip() or '-created_at'
     try:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(leads_file), exist_ok=True)
-        
-        # Save leads to file
-        with open(leads_file, 'w') as f:
-            json.dump(leads, f, indent=2)
-    except Exception as e:
-        pass  # Error saving leads, operation will silently fail
+        limit = int(args.get('limit', LEAD_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be a number')
+    return {'filters': filters, 'sort': sort, 'cursor': args.get('cursor') or None, 'limit': limit}
+
+def query_leads(username, filters=None, sort='-created_at', cursor=None, limit=LEAD_PAGE_SIZE):
+    """One page of a user's leads: filtered, sorted ('-' prefix for descending) and keyset-paginated"""
+    filters = filters or {}
+    descending = sort.startswith('-')
+    sort_field = sort.lstrip('-')
+    if sort_field not in LEAD_SORT_FIELDS:
+        raise ValueError(f"Unsupported sort: {sort_field}")
+    limit = max(1, min(limit, LEAD_MAX_PAGE_SIZE))
+    
+    view = get_lead_view(username)
+    keys, ordered = _lead_order(view, sort_field)
+    after = _decode_lead_cursor(cursor, sort) if cursor else None
+    if descending:
+        start = (bisect_left(keys, after) if after else len(keys)) - 1
+        positions = range(start, -1, -1)
+    else:
+        positions = range(bisect_right(keys, after) if after else 0, len(keys))
+    
+    page, last_position, has_more = [], None, False
+    for position in positions:
+        if not _lead_matches(ordered[position], filters):
+            continue
+        if len(page) == limit:
+            has_more = True
+            break
+        page.append(ordered[position])
+        last_position = position
+    
+    return {
+        'leads': page,
+        'next_cursor': _encode_lead_cursor(sort, keys[last_position]) if has_more else None,
+        'total': view['counts']['total'] if not filters else sum(1 for lead in view['leads'] if _lead_matches(lead, filters)),
+        'version': view['version']
+    }
+
+def encode_lead_columns(leads, fields=None):
+    """Column-array encoding of a page of leads: {field: [value per lead]}, field names sent once"""
+    if not fields:
+        fields = list(dict.fromkeys(field for lead in leads for field in lead))
+    return {field: [lead.get(field) for lead in leads] for field in fields}
+
+# Lead name index - name/word prefixes and trigram postings per user, kept current as leads are stored
+LEAD_NAME_INDEX_CACHE_SIZE = 8
+LEAD_NAME_MIN_SIMILARITY = 0.5
+LEAD_NAME_MAX_CANDIDATES = 2000
+NAME_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+_lead_name_indexes = OrderedDict()
+_lead_name_indexes_lock = threading.Lock()
+
+def normalize_name(name):
+    """Lowercase alphanumeric words of a business name ("Joe's Pizza, Inc." -> "joe s pizza inc")"""
+    return ' '.join(NAME_TOKEN_PATTERN.findall(str(name or '').lower()))
+
+def _name_trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _name_index_entries(key, lead_ref):
+    """Sorted-array rows for one name: the whole name, and the name from each later word on"""
+    words = key.split(' ')
+    return (key, lead_ref), [(' '.join(words[position:]), lead_ref) for position in range(1, len(words))]
+
+def _build_lead_name_index(view):
+    """Name index for a lead view, built in bulk (one sort per array), labelled with the view's store and registry versions"""
+    index = {'version': view['store_version'], 'registry': view['registry_version'], 'names': [], 'words': [], 'trigrams': {}, 'entries': {}}
+    for lead in view['leads']:
+        key = normalize_name(lead.get('name'))
+        if not key:
+            continue
+        index['entries'][lead['id']] = (key, {field: lead.get(field) for field in LEAD_SUGGEST_FIELDS})
+        name_row, word_rows = _name_index_entries(key, lead['id'])
+        index['names'].append(name_row)
+        index['words'].extend(word_rows)
+        for trigram in _name_trigrams(key):
+            index['trigrams'].setdefault(trigram, []).append(lead['id'])
+    index['names'].sort()
+    index['words'].sort()
+    return index
+
+def _name_index_add(index, lead):
+    key = normalize_name(lead.get('name'))
+    if not key or lead['id'] in index['entries']:
+        return
+    index['entries'][lead['id']] = (key, {field: lead.get(field) for field in LEAD_SUGGEST_FIELDS})
+    name_row, word_rows = _name_index_entries(key, lead['id'])
+    insort(index['names'], name_row)
+    for row in word_rows:
+        insort(index['words'], row)
+    for trigram in _name_trigrams(key):
+        index['trigrams'].setdefault(trigram, []).append(lead['id'])
+
+def _name_index_remove(index, lead_ref):
+    entry = index['entries'].pop(lead_ref, None)
+    if not entry:
+        return
+    name_row, word_rows = _name_index_entries(entry[0], lead_ref)
+    for rows, row in [(index['names'], name_row)] + [(index['words'], row) for row in word_rows]:
+        position = bisect_left(rows, row)
+        if position < len(rows) and rows[position] == row:
+            del rows[position]
+    for trigram in _name_trigrams(entry[0]):
+        posting = index['trigrams'].get(trigram)
+        if posting and lead_ref in posting:
+            posting.remove(lead_ref)
+
+def get_lead_name_index(username):
+    """The user's name index for the current store and registry versions - leads whose shared record changed are
+    re-indexed, anything else stale is rebuilt from the lead view"""
+    version, registry = get_leads_version(username), business_registry_version()
+    with _lead_name_indexes_lock:
+        index = _lead_name_indexes.get(username)
+        if index and index['version'] == version and index['registry'] == registry:
+            _lead_name_indexes.move_to_end(username)
+            return index
+    
+    caught_up = _leads_changed_in_registry(username, index['registry'], version) if index and index['version'] == version else None
+    if caught_up is not None:
+        with _lead_name_indexes_lock:
+            if _lead_name_indexes.get(username) is index and index['version'] == version:
+                for lead in caught_up[1]:
+                    _name_index_remove(index, lead['id'])
+                    _name_index_add(index, lead)
+                index['registry'] = caught_up[0]
+                return index
+    
+    index = _build_lead_name_index(get_lead_view(username))
+    with _lead_name_indexes_lock:
+        _lead_name_indexes[username] = index
+        _lead_name_indexes.move_to_end(username)
+        while len(_lead_name_indexes) > LEAD_NAME_INDEX_CACHE_SIZE:
+            _lead_name_indexes.popitem(last=False)
+    return index
+
+def _update_lead_name_index(username, previous_version, version, added=(), removed=()):
+    """Apply one committed batch to a cached name index that was current before it (call with user_store_lock held)"""
+    with _lead_name_indexes_lock:
+        index = _lead_name_indexes.get(username)
+        if not index:
+            return
+        if index['version'] != previous_version:
+            del _lead_name_indexes[username]  # Missed a change (e.g. a save in another worker), rebuild on next use
+            return
+        for lead in removed:
+            _name_index_remove(index, lead.get('id') or lead_id(lead))
+        for lead in added:
+            _name_index_add(index, lead)
+        index['version'] = version
+
+def _prefix_range(rows, prefix, skip, limit):
+    """Lead ids of sorted (key, id) rows whose key starts with a prefix - O(log n + limit)"""
+    found = []
+    position = bisect_left(rows, (prefix,))
+    while position < len(rows) and len(found) < limit and rows[position][0].startswith(prefix):
+        lead_ref = rows[position][1]
+        if lead_ref not in skip and lead_ref not in found:
+            found.append(lead_ref)
+        position += 1
+    return found
+
+def _trigram_matches(index, key, skip, limit):
+    """Lead ids of names sharing at least half of the query's trigrams (substrings and typos), best first"""
+    query_trigrams = _name_trigrams(key)
+    needed = max(1, int(len(query_trigrams) * LEAD_NAME_MIN_SIMILARITY + 0.5))
+    postings = sorted((index['trigrams'].get(trigram, ()) for trigram in query_trigrams), key=len)
+    # A name with `needed` shared trigrams must appear in one of the (len - needed + 1) rarest postings;
+    # very common trigrams carry little signal, so stop before they blow the candidate budget
+    candidates = set()
+    for posting in postings[:len(postings) - needed + 1]:
+        if len(candidates) + len(posting) > LEAD_NAME_MAX_CANDIDATES:
+            break
+        candidates.update(posting)
+    
+    scored = []
+    for lead_ref in candidates - skip:
+        name_key = index['entries'][lead_ref][0]
+        padded = f"  {name_key} "
+        shared = sum(1 for trigram in query_trigrams if trigram in padded)
+        if shared >= needed:
+            scored.append((-shared, len(name_key), name_key, lead_ref))
+    scored.sort()
+    return [lead_ref for *_, lead_ref in scored[:limit]]
+
+def suggest_leads(username, query, limit=LEAD_SUGGEST_LIMIT):
+    """Leads for a name query: names starting with it, then names with a word starting with it, then trigram matches"""
+    key = normalize_name(query)
+    if not key:
+        return []
+    index = get_lead_name_index(username)
+    with _lead_name_indexes_lock:
+        found = _prefix_range(index['names'], key, set(), limit)
+        if len(found) < limit:
+            found += _prefix_range(index['words'], key, set(found), limit - len(found))
+        if len(found) < limit and len(key) >= 3:
+            found += _trigram_matches(index, key, set(found), limit - len(found))
+        return [dict(index['entries'][lead_ref][1]) for lead_ref in found]
+
+# Lead full-text search - a per-user SQLite FTS5 index over the descriptive fields, kept in step with the store
+LEAD_SEARCH_TEXT_FIELDS = ('name', 'domain', 'industry', 'address', 'description', 'hours')
+LEAD_SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 2.0, 1.0, 0.5)  # bm25 weight per text field, same order
+LEAD_SEARCH_RESULT_FIELDS = ('phone', 'email', 'website', 'lead_type', 'source', 'location_tier', 'priority_score', 'created_at')
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def _lead_search_file(username):
+    return os.path.join(USER_DATA_DIR, f'search_{username}.db')
+
+def _open_lead_search_db(username):
+    """Connect to the user's search index, creating its tables (raises sqlite3.OperationalError without FTS5)"""
+    connection = sqlite3.connect(_lead_search_file(username), timeout=10)
+    columns = ', '.join(LEAD_SEARCH_TEXT_FIELDS + tuple(f"{field} UNINDEXED" for field in
+                        ('lead_id', 'has_email', 'has_social') + LEAD_SEARCH_RESULT_FIELDS))
+    connection.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5({columns}, "
+                       "tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+    connection.execute("CREATE TABLE IF NOT EXISTS search_meta (key TEXT PRIMARY KEY, value TEXT)")
+    return connection
+
+def _lead_search_version(connection):
+    row = connection.execute("SELECT value FROM search_meta WHERE key = 'version'").fetchone()
+    return row[0] if row else None
+
+def _set_lead_search_version(connection, version):
+    connection.execute("INSERT OR REPLACE INTO search_meta (key, value) VALUES ('version', ?)", (version,))
+
+def _lead_search_registry(connection):
+    """Registry version the indexed leads were hydrated at"""
+    row = connection.execute("SELECT value FROM search_meta WHERE key = 'registry'").fetchone()
+    return row[0] if row else None
+
+def _set_lead_search_registry(connection, registry):
+    connection.execute("INSERT OR REPLACE INTO search_meta (key, value) VALUES ('registry', ?)", (registry,))
+
+def _lead_search_rows(leads):
+    for lead in leads:
+        if not isinstance(lead, dict):
+            continue
+        text = [str(lead.get(field) or '') for field in LEAD_SEARCH_TEXT_FIELDS]
+        flags = [lead.get('id') or lead_id(lead), int(bool(lead.get('email'))), int(_lead_has_social(lead))]
+        yield tuple(text + flags + [lead.get(field) for field in LEAD_SEARCH_RESULT_FIELDS])
+
+def _insert_lead_search_rows(connection, leads):
+    placeholders = ', '.join('?' * (len(LEAD_SEARCH_TEXT_FIELDS) + 3 + len(LEAD_SEARCH_RESULT_FIELDS)))
+    connection.executemany(f"INSERT INTO leads_fts VALUES ({placeholders})", _lead_search_rows(leads))
+
+def _refresh_lead_search_index(username):
+    """Bring the index up to the current store and registry versions: re-index just the leads whose shared record
+    changed, or every stored lead. Each runs in one transaction; readers keep seeing the old rows until it commits."""
+    with user_store_lock(username):
+        connection = _open_lead_search_db(username)
+        try:
+            version = get_leads_version(username)
+            if _lead_search_version(connection) == version:
+                # Also a no-op when another request brought it up to date while we waited for the lock
+                caught_up = _leads_changed_in_registry(username, _lead_search_registry(connection), version, _locked=True)
+                if caught_up is not None:
+                    registry, leads = caught_up
+                    with connection:
+                        for lead in leads:
+                            connection.execute("DELETE FROM leads_fts WHERE lead_id = ?", (lead['id'],))
+                        _insert_lead_search_rows(connection, leads)
+                        _set_lead_search_registry(connection, registry)
+                    return
+            started = time.time()
+            registry = business_registry_version()
+            with connection:
+                connection.execute("DELETE FROM leads_fts")
+                _insert_lead_search_rows(connection, load_user_leads(username, _locked=True))
+                _set_lead_search_version(connection, version)
+                _set_lead_search_registry(connection, registry)
+            print(f"🔎 Rebuilt search index for {username} in {time.time() - started:.2f}s")
+        finally:
+            connection.close()
+
+def _update_lead_search_index(username, previous_version, version, added=(), removed=()):
+    """Apply one committed batch to the search index if it was current before it (call with user_store_lock held)"""
+    if not os.path.exists(_lead_search_file(username)):
+        return  # Built on first search
+    try:
+        connection = _open_lead_search_db(username)
+        try:
+            if _lead_search_version(connection) != previous_version:
+                return  # Already stale - the next search rebuilds it
+            with connection:
+                for lead in removed:
+                    connection.execute("DELETE FROM leads_fts WHERE lead_id = ?", (lead.get('id') or lead_id(lead),))
+                _insert_lead_search_rows(connection, added)
+                _set_lead_search_version(connection, version)
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Search index update failed for {username}: {e}")
+
+def _lead_search_match(query):
+    """FTS5 query for free text: every word must match, the last one as a prefix (as the user is still typing)"""
+    words = SEARCH_TOKEN_PATTERN.findall(query.lower())
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+
+def search_leads(username, query, filters=None, limit=LEAD_PAGE_SIZE, offset=0):
+    """Leads matching a text query across name, domain, industry, address, description and hours, best first
+    (every match is ranked, so total and the ordering cover the same set)"""
+    match = _lead_search_match(query)
+    if not match:
+        return {'leads': [], 'total': 0, 'version': get_leads_version(username)}
+
+    connection = _open_lead_search_db(username)
+    try:
+        if (_lead_search_version(connection) != get_leads_version(username)
+                or _lead_search_registry(connection) != business_registry_version()):
+            _refresh_lead_search_index(username)
+
+        weights = ', '.join(str(weight) for weight in LEAD_SEARCH_WEIGHTS)
+        where, params = ["leads_fts MATCH ?", "rank MATCH ?"], [match, f"bm25({weights})"]
+        for field, value in (filters or {}).items():
+            if field == 'has_email':
+                where.append("has_email = ?")
+                params.append(int(value))
+            elif field == 'lead_type' and value == 'social':
+                where.append("has_social = 1")
+            elif field in LEAD_QUERY_FILTERS:
+                where.append(f"{field} = ?")
+                params.append(value)
+        where_sql = ' AND '.join(where)
+
+        total = connection.execute(f"SELECT count(*) FROM leads_fts WHERE {where_sql}", params).fetchone()[0]
+        fields = ('id', 'name', 'domain', 'industry', 'address') + LEAD_SEARCH_RESULT_FIELDS
+        # FTS5 sorts by its rank column (bm25 with our weights, via "rank MATCH") keeping only the top offset + limit
+        rows = connection.execute(
+            f"SELECT lead_id, name, domain, industry, address, {', '.join(LEAD_SEARCH_RESULT_FIELDS)}, rank "
+            f"FROM leads_fts WHERE {where_sql} ORDER BY rank LIMIT ? OFFSET ?",
+            params + [limit, offset]).fetchall()
+        leads = []
+        for row in rows:
+            lead = dict(zip(fields, row))
+            lead['score'] = round(-row[-1], 3)  # bm25 is lower-is-better; flip it so higher means more relevant
+            leads.append(lead)
+        return {'leads': leads, 'total': total, 'version': _lead_search_version(connection)}
+    finally:
+        connection.close()
+
+# Lead stats - aggregates cached per store version, with deltas against recently served versions
+LEAD_STATS_HISTORY = 8
+LEAD_STATS_MAX_WAIT = 25
+LEAD_STATS_MAX_WAITERS = 2  # Long-polls hold a gthread worker thread, so keep most threads for pages
+LEAD_STATS_CHECK_INTERVAL = 1.0
+
+_lead_stats_history = OrderedDict()
+_lead_stats_lock = threading.Lock()
+_lead_stats_waiters = 0
+_leads_changed = threading.Condition()
+
+def compute_lead_stats(leads):
+    """Counts and breakdowns shown on the dashboard, analytics and reports pages, in one pass"""
+    stats = {
+        'total_leads': len(leads),
+        'by_type': {},
+        'by_contact_level': {},
+        'by_industry': {},
+        'by_location_tier': {},
+        'by_source': {},
+        'social_leads': 0,
+        'with_phone': 0,
+        'with_email': 0,
+        'with_website': 0,
+        'complete_profiles': 0,
+        'high_priority_leads': 0
+    }
+    priority_total = 0.0
+    for lead in leads:
+        for key, field, default in (('by_type', 'lead_type', 'Unknown'), ('by_contact_level', 'contact_level', 'Unknown'),
+                                    ('by_industry', 'industry', 'General'), ('by_location_tier', 'location_tier', 'Unknown'),
+                                    ('by_source', 'source', 'unknown')):
+            value = lead.get(field) or default
+            stats[key][value] = stats[key].get(value, 0) + 1
+        if _lead_has_social(lead):
+            stats['social_leads'] += 1
+        has_phone, has_email, has_website = bool(lead.get('phone')), bool(lead.get('email')), bool(lead.get('website'))
+        stats['with_phone'] += has_phone
+        stats['with_email'] += has_email
+        stats['with_website'] += has_website
+        stats['complete_profiles'] += has_phone and has_email and has_website
+        priority = _numeric_sort_value(lead.get('priority_score'))
+        priority_total += priority
+        stats['high_priority_leads'] += priority >= 5
+    stats['avg_priority_score'] = round(priority_total / max(len(leads), 1), 1)
+    
+    by_type, by_contact_level = stats['by_type'], stats['by_contact_level']
+    stats.update({
+        'sales_ready': by_type.get('Sales-Ready Lead', 0),
+        'premium_leads': by_type.get('Premium Lead', 0),
+        'prospects': by_type.get('Prospect Lead', 0),
+        'social_connected': by_type.get('Social-Connected Lead', 0),
+        'website_leads': by_type.get('Website Lead', 0),
+        'premium_contact': by_contact_level.get('Premium', 0),
+        'high_contact': by_contact_level.get('High', 0),
+        'medium_contact': by_contact_level.get('Medium', 0),
+        'basic_contact': by_contact_level.get('Basic', 0)
+    })
+    total = max(len(leads), 1)
+    stats['conversion_rate'] = round(stats['sales_ready'] / total * 100, 1)
+    stats['premium_conversion_rate'] = round((stats['premium_leads'] + stats['sales_ready']) / total * 100, 1)
+    stats['completion_rate'] = round(stats['complete_profiles'] / total * 100, 1)
+    return stats
+
+def get_lead_stats(username):
+    """Stats for the current lead store version, computed once per version and process"""
+    view = get_lead_view(username)
+    stats = view.get('stats')
+    if stats is None:
+        stats = view['stats'] = compute_lead_stats(view['leads'])
+    with _lead_stats_lock:
+        history = _lead_stats_history.get(username)
+        if history is None:
+            history = _lead_stats_history[username] = deque(maxlen=LEAD_STATS_HISTORY)
+        if not history or history[-1][0] != view['version']:
+            history.append((view['version'], stats))
+        _lead_stats_history.move_to_end(username)
+        while len(_lead_stats_history) > LEAD_VIEW_CACHE_SIZE:
+            _lead_stats_history.popitem(last=False)
+    return view['version'], stats
+
+def lead_stats_delta(username, since=None):
+    """Stats changed since a version a client already has, or everything if that version is unknown here"""
+    version, stats = get_lead_stats(username)
+    if since == version:
+        return {'version': version, 'changed': False}
+    previous = None
+    with _lead_stats_lock:
+        for old_version, old_stats in _lead_stats_history.get(username, ()):
+            if old_version == since:
+                previous = old_stats
+    if previous is None:
+        return {'version': version, 'changed': True, 'full': True, 'stats': stats}
+    changes = {key: value for key, value in stats.items() if previous.get(key) != value}
+    return {'version': version, 'changed': True, 'full': False, 'stats': changes}
+
+def wait_for_leads_change(username, version, timeout):
+    """Block until the lead view moves past a version (or the timeout passes); False if no wait slot is free"""
+    global _lead_stats_waiters
+    with _leads_changed:
+        if _lead_stats_waiters >= LEAD_STATS_MAX_WAITERS:
+            return False
+        _lead_stats_waiters += 1
+    try:
+        deadline = time.time() + timeout
+        while lead_view_version(username) == version:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            # Saves in this process notify at once; the version check catches saves in other workers and registry changes
+            with _leads_changed:
+                _leads_changed.wait(min(remaining, LEAD_STATS_CHECK_INTERVAL))
+        return True
+    finally:
+        with _leads_changed:
+            _lead_stats_waiters -= 1
 
 # User authentication system
 def get_users_storage():
@@ -123,6 +1649,71 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def _compute_build_id():
+    """Fingerprint of the code and templates, so cached pages are invalidated by a deploy"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    fingerprint = hashlib.sha1(str(os.stat(os.path.abspath(__file__)).st_mtime_ns).encode())
+    for root, dirs, files in os.walk(os.path.join(base_dir, 'templates')):
+        dirs.sort()
+        for name in sorted(files):
+            fingerprint.update(f"{name}:{os.stat(os.path.join(root, name)).st_mtime_ns}".encode())
+    return fingerprint.hexdigest()[:12]
+
+APP_BUILD_ID = _compute_build_id()
+
+def _lead_view_etag(username, version):
+    return hashlib.sha1(f"{APP_BUILD_ID}|{username}|{version}|{request.full_path}".encode()).hexdigest()[:24]
+
+def leads_etag(f):
+    """Decorator for lead-backed GET views: 304 when the user's hydrated leads haven't changed (use after login_required)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Pending flash messages are rendered (and consumed) by the page, so never short-circuit them
+        if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+            return f(*args, **kwargs)
+        
+        username = session['username']
+        g.lead_view_version = lead_view_version(username)
+        etag = _lead_view_etag(username, g.lead_view_version)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            # A view streaming from its own snapshot sets the version it read (take_lead_view_snapshot)
+            etag = _lead_view_etag(username, g.lead_view_version)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        return response
+    return decorated_function
+
+PAGE_FRAGMENT_BLOCKS = ('title', 'page_title', 'content')
+
+def render_page(template_name, **context):
+    """Render a page, or only its title and content blocks for base.html's ?ajax=1 navigation"""
+    if request.args.get('ajax') != '1':
+        return render_template(template_name, **context)
+
+    # The sidebar, header, styles and page scripts are already in the browser; the scripts block also
+    # holds the large tojson dumps, which AJAX navigation never executed anyway
+    template = app.jinja_env.get_template(template_name)
+    layout = app.jinja_env.get_template('base.html')
+    app.update_template_context(context)
+    render_context = template.new_context(context)
+    blocks = {}
+    for name in PAGE_FRAGMENT_BLOCKS:
+        block = template.blocks.get(name) or layout.blocks[name]
+        blocks[name] = Markup(''.join(block(render_context)))
+
+    response = make_response(render_template('fragment.html', **blocks))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    # Views without leads_etag still get revalidated by content hash (leads_etag replaces this tag)
+    response.add_etag()
+    return response.make_conditional(request)
+
 def get_current_user():
     """Get current logged in user info"""
     if 'username' in session:
@@ -136,32 +1727,337 @@ def get_current_user():
             }
     return None
 
+# Contact page discovery - path/anchor keywords ranked by how reliably they lead to contact details
+CONTACT_LINK_KEYWORDS = [
+    ('contact-us', 12), ('contactus', 12), ('contact_us', 12), ('contact', 10),
+    ('get-in-touch', 9), ('reach-us', 8), ('find-us', 7), ('locations', 6), ('location', 6),
+    ('directions', 5), ('visit', 4), ('about-us', 4), ('about', 3), ('team', 1)
+]
+NON_HTML_PATH_PATTERN = re.compile(r'\.(?:pdf|jpe?g|png|gif|svg|webp|zip|docx?|xlsx?|mp4|mp3|css|js|xml)$', re.IGNORECASE)
+SITEMAP_LOC_PATTERN = re.compile(r'<loc>\s*([^<]+?)\s*</loc>', re.IGNORECASE)
+SITEMAP_CACHE_TTL = 24 * 3600
+SITEMAP_CACHE_MAX_ENTRIES = 5000
+SITEMAP_MAX_BYTES = 500000  # Enough for the first few thousand <loc> entries
+SITEMAP_CONTENT_TYPES = ('application/xml', 'text/xml', 'text/plain')
+
+def _score_contact_path(path, anchor_text):
+    """Score a same-origin link by how likely it is to be the contact page"""
+    path_lower = path.lower()
+    text_lower = anchor_text.lower()[:60]
+    last_segment = path_lower.rsplit('/', 1)[-1]
+    
+    score = 0
+    for keyword, weight in CONTACT_LINK_KEYWORDS:
+        if keyword in last_segment:
+            score = max(score, weight + 2)
+        elif keyword in path_lower:
+            score = max(score, weight)
+        if keyword.replace('-', ' ') in text_lower:
+            score = max(score, weight + 1)
+    
+    # Prefer shallow pages over deep blog posts that merely mention "contact"
+    if score:
+        score -= max(0, path_lower.count('/') - 2)
+    return score
+
+# Immutable lookup tables and compiled patterns. They are built once at import so a preloading
+# gunicorn master shares them copy-on-write with every worker instead of rebuilding them per call.
+INDUSTRY_KEYWORDS = (
+    ('Healthcare', ('dental', 'medical', 'clinic', 'doctor', 'health', 'hospital', 'pharmacy', 'wellness', 'therapy', 'rehabilitation', 'optometry', 'chiropractic')),
+    ('Food & Beverage', ('restaurant', 'cafe', 'coffee', 'pizza', 'bakery', 'grill', 'bar', 'diner', 'bistro', 'kitchen', 'food', 'catering', 'tavern')),
+    ('Fitness & Wellness', ('gym', 'fitness', 'yoga', 'pilates', 'crossfit', 'martial arts', 'boxing', 'training', 'sports')),
+    ('Beauty & Personal Care', ('salon', 'spa', 'beauty', 'hair', 'nail', 'massage', 'skincare', 'barber', 'cosmetic')),
+    ('Legal Services', ('law', 'legal', 'attorney', 'lawyer', 'firm', 'court', 'litigation')),
+    ('Real Estate', ('real estate', 'realtor', 'property', 'realty', 'homes', 'mortgage', 'lending')),
+    ('Automotive', ('auto', 'car', 'automotive', 'tire', 'repair', 'garage', 'dealership', 'mechanic')),
+    ('Retail', ('store', 'shop', 'retail', 'boutique', 'market', 'outlet', 'plaza')),
+    ('Professional Services', ('consulting', 'accounting', 'insurance', 'financial', 'marketing', 'advertising', 'design')),
+    ('Technology', ('tech', 'software', 'computer', 'IT', 'digital', 'web', 'mobile', 'app')),
+)
+MAJOR_METRO_CITIES = ('new york', 'los angeles', 'chicago', 'houston', 'philadelphia', 'phoenix', 'san antonio', 'san diego', 'dallas', 'san jose', 'austin', 'jacksonville', 'fort worth', 'columbus', 'charlotte', 'san francisco', 'indianapolis', 'seattle', 'denver', 'washington', 'boston', 'el paso', 'detroit', 'nashville', 'portland', 'oklahoma city', 'las vegas', 'baltimore', 'milwaukee', 'albuquerque', 'tucson', 'fresno', 'sacramento', 'kansas city', 'mesa', 'atlanta', 'omaha', 'colorado springs', 'raleigh', 'miami', 'cleveland', 'tulsa', 'oakland', 'minneapolis', 'wichita', 'arlington')
+TIER2_CITIES = ('albany', 'annapolis', 'atlanta', 'augusta', 'austin', 'baton rouge', 'bismarck', 'boise', 'boston', 'cheyenne', 'columbia', 'columbus', 'concord', 'denver', 'des moines', 'dover', 'frankfort', 'harrisburg', 'hartford', 'helena', 'honolulu', 'indianapolis', 'jackson', 'jefferson city', 'juneau', 'lansing', 'lincoln', 'little rock', 'madison', 'montgomery', 'montpelier', 'nashville', 'oklahoma city', 'olympia', 'phoenix', 'pierre', 'providence', 'raleigh', 'richmond', 'sacramento', 'saint paul', 'salem', 'salt lake city', 'santa fe', 'springfield', 'tallahassee', 'topeka', 'trenton')
+SEARCH_RELEVANCE_KEYWORDS = {
+    'restaurant': ('food', 'dining', 'cuisine', 'menu', 'chef'),
+    'dentist': ('dental', 'teeth', 'oral', 'smile', 'cavity'),
+    'salon': ('hair', 'beauty', 'style', 'cut', 'color'),
+    'lawyer': ('legal', 'law', 'attorney', 'court', 'litigation'),
+    'doctor': ('medical', 'health', 'physician', 'clinic', 'treatment')
+}
+EXCLUDED_BUSINESS_DOMAIN_PATTERNS = (
+    'yellowpages.com', 'yelp.com', 'google.com', 'facebook.com', 'linkedin.com',
+    'instagram.com', 'twitter.com', 'wordpress.com', 'blogspot.com', 'medium.com',
+    'wix.com', 'squarespace.com', '.gov', '.edu', 'wikipedia.org', 'amazon.com',
+    'bostonmagazine.com', 'threebestrated.com', 'denscore.com', 'alloutboston.com',
+    'americandentistsociety.com', 'iabdm.org', 'mass.gov', 'webmd.com', 'healthgrades.com',
+    'magazine', 'directory', 'rated', 'society', 'association', 'blog', 'news'
+)
+INVALID_EMAIL_DOMAINS = frozenset({
+    'example.com', 'test.com', 'localhost', 'domain.com',
+    'email.com', 'sample.com', 'demo.com', 'your-email.com',
+    'yourdomain.com', 'yoursite.com', 'website.com'
+})
+
+RATING_NUMBER_PATTERN = re.compile(r'([0-9]\.[0-9]|[0-9])')
+RATING_STARS_PATTERN = re.compile(r'([0-9]\.[0-9]|[0-9])\s*(?:stars?|/5|★)', re.IGNORECASE)
+HOURS_PATTERNS = (
+    re.compile(r'(?:open|hours?)[:·]?\s*([0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM)\s*-\s*[0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM))', re.IGNORECASE),
+    re.compile(r'(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)[a-z]*[\s-]*([0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM)\s*-\s*[0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM))', re.IGNORECASE),
+    re.compile(r'([0-9]{1,2}:[0-9]{2}\s*(?:AM|PM)\s*-\s*[0-9]{1,2}:[0-9]{2}\s*(?:AM|PM))', re.IGNORECASE)
+)
+HOURS_STATUS_PATTERN = re.compile(r'(open now|closed now|opens at|closes at)', re.IGNORECASE)
+BING_PHONE_PATTERNS = (
+    re.compile(r'\(?([0-9]{3})\)?[-.\\ ]?([0-9]{3})[-.\\ ]?([0-9]{4})'),
+    re.compile(r'\+?1[-.\\ ]?\(?([0-9]{3})\)?[-.\\ ]?([0-9]{3})[-.\\ ]?([0-9]{4})'),
+    re.compile(r'([0-9]{3})[-.\\ ]([0-9]{3})[-.\\ ]([0-9]{4})')
+)
+PAGE_EMAIL_PATTERNS = (
+    # Standard email pattern with strict word boundaries  
+    re.compile(r'(?<!\S)([A-Za-z0-9](?:[A-Za-z0-9._%-]*[A-Za-z0-9])?@[A-Za-z0-9](?:[A-Za-z0-9.-]*[A-Za-z0-9])?\.[A-Za-z]{2,})(?!\S)', re.IGNORECASE),
+    # Contact/email prefixed patterns with capture groups
+    re.compile(r'(?i)(?:email|contact|info|support|sales|hello|inquiries)[:\s]*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})', re.IGNORECASE),
+    # Email addresses in common formats
+    re.compile(r'(?i)(?:mailto:)?([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})', re.IGNORECASE),
+)
+MAILTO_HREF_PATTERN = re.compile(r'^mailto:')
+MAILTO_PREFIX_PATTERN = re.compile(r'^mailto:', re.IGNORECASE)
+LEADING_SLASHES_PATTERN = re.compile(r'^/+')
+LEADING_NON_ALNUM_PATTERN = re.compile(r'^[^a-zA-Z0-9]*')
+EMAIL_TRAILING_WORD_PATTERN = re.compile(r'[^a-zA-Z0-9]*(Open|We|Contact|Information|Call|Phone|Visit|More).*$', re.IGNORECASE)
+EMAIL_PREFIX_MATCH_PATTERN = re.compile(r'^([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})')
+EMAIL_PLACEHOLDER_PATTERN = re.compile(r'email', re.I)
+AT_SIGN_PATTERN = re.compile(r'@')
+ELEMENT_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+CONTACT_FORM_PATTERN = re.compile(r'contact', re.I)
+EMAIL_LOCAL_INVALID_PATTERN = re.compile(r'[<>()\[\]\\,;:\s@"\']')
+EMAIL_TLD_PATTERN = re.compile(r'^[a-zA-Z]{2,6}$')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+# Minimum seconds between requests to one host from a worker; search engines and directories get a wider gap
+RATE_LIMITED_SEARCH_HOSTS = frozenset({'bing.com', 'yellowpages.com'})
+SEARCH_HOST_MIN_INTERVAL = float(os.environ.get('SEARCH_HOST_MIN_INTERVAL', 1.0))
+DEFAULT_HOST_MIN_INTERVAL = 0.1
+
+# Page fetches stream the body and stop at this many (decoded) bytes - contact details never need more
+MAX_PAGE_BYTES = 1500000
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+def _limit_response_body(response, max_bytes, content_types=HTML_CONTENT_TYPES):
+    """Read a streamed response body up to max_bytes; bodies of other content types are dropped without being read.
+
+    The capped body is stored on the response so callers keep using response.content as before.
+    Returns False when the body was skipped because of its content type.
+    """
+    import requests
+    
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type and not content_type.startswith(content_types):
+        response._content = b''
+        response._content_consumed = True
+        response.close()
+        return False
+    
+    chunks, total = [], 0
+    try:
+        for chunk in response.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= max_bytes:
+                break
+    except requests.exceptions.RequestException:
+        pass  # Keep whatever arrived before the connection stalled
+    finally:
+        response.close()
+    
+    body = b''.join(chunks)
+    response._content = body[:max_bytes]
+    response._content_consumed = True
+    return True
+
+def make_soup(markup):
+    """Parse HTML with BeautifulSoup + lxml (bs4 is imported on first use to keep worker boot fast)"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'lxml')
+
+# Contact mining works on plain page text - boilerplate removal would strip the footer we want
+CONTACT_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+CONTACT_PHONE_PATTERN = re.compile(r'(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})')
+NON_TEXT_ELEMENTS = ('script', 'style', 'noscript', 'template', 'svg', 'head')
+
+def extract_contact_text(html_content):
+    """Fast visible-text extraction for contact mining (no boilerplate removal)"""
+    from lxml import etree, html as lxml_html
+    
+    try:
+        tree = lxml_html.fromstring(html_content)
+        etree.strip_elements(tree, etree.Comment, *NON_TEXT_ELEMENTS, with_tail=False)
+        text = ' '.join(tree.itertext())
+    except (etree.ParserError, ValueError, TypeError):
+        text = ''
+    
+    if not text.strip():
+        # lxml couldn't make sense of the markup - trafilatura's loader copes with more broken documents
+        text = extract_main_content(html_content)
+    return text
+
+def extract_main_content(html_content):
+    """Main-content extraction via trafilatura, imported only when actually needed"""
+    try:
+        import trafilatura
+        return trafilatura.extract(html_content, include_comments=False) or ''
+    except Exception as e:
+        print(f"Main content extraction failed: {e}")
+        return ''
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter for the contact enrichment fan-out"""
+    def __init__(self, initial_limit=6, min_limit=2, max_limit=16, target_p95=4.0,
+                 target_error_rate=0.1, window_size=30, min_samples=8,
+                 decrease_factor=0.5, decrease_cooldown=2.0, history_size=200):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_p95 = target_p95
+        self.target_error_rate = target_error_rate
+        self.min_samples = min_samples
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window_size)
+        self._errors = deque(maxlen=window_size)
+        self._completed_since_adjust = 0
+        self._last_decrease = 0.0
+        self.totals = {'requests': 0, 'errors': 0, 'timeouts': 0, 'server_errors': 0, 'increases': 0, 'decreases': 0}
+
+        # Limit history is kept for the metrics endpoint
+        self.history = deque(maxlen=history_size)
+        self._record_limit('initial')
+
+    @contextmanager
+    def slot(self):
+        """Block until a concurrency slot is free, then hold it for the duration of the task"""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def record(self, latency, status_code=None, timed_out=False, failed=False):
+        """Record one fetch outcome and adjust the limit (additive increase, multiplicative decrease)"""
+        overloaded = timed_out or (status_code is not None and (status_code >= 500 or status_code == 429))
+        is_error = overloaded or failed
+
+        with self._condition:
+            self._latencies.append(latency)
+            self._errors.append(is_error)
+            self.totals['requests'] += 1
+            if is_error: self.totals['errors'] += 1
+            if timed_out: self.totals['timeouts'] += 1
+            if status_code is not None and status_code >= 500: self.totals['server_errors'] += 1
+
+            if overloaded:
+                self._decrease('timeout' if timed_out else f'http_{status_code}')
+                return
+
+            # Only grow once per "round" of completions at the current limit, and only while saturated
+            self._completed_since_adjust += 1
+            if self._completed_since_adjust < self.limit or len(self._latencies) < self.min_samples:
+                return
+            self._completed_since_adjust = 0
+
+            p95 = self._p95()
+            error_rate = self._error_rate()
+            if (p95 <= self.target_p95 and error_rate <= self.target_error_rate
+                    and self.limit < self.max_limit and self._in_flight >= self.limit - 1):
+                self.limit += 1
+                self.totals['increases'] += 1
+                self._record_limit('increase', p95, error_rate)
+                self._condition.notify_all()
+
+    def _decrease(self, reason):
+        # Several in-flight requests usually fail together - cut only once per cooldown window
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self._completed_since_adjust = 0
+
+        new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        if new_limit != self.limit:
+            self.limit = new_limit
+            self.totals['decreases'] += 1
+            self._record_limit(reason, self._p95(), self._error_rate())
+            print(f"⚠️ Enrichment concurrency reduced to {self.limit} ({reason})")
+
+    def _p95(self):
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _error_rate(self):
+        return (sum(self._errors) / len(self._errors)) if self._errors else 0.0
+
+    def _record_limit(self, reason, p95=None, error_rate=None):
+        self.history.append({
+            'timestamp': datetime.now().isoformat(),
+            'limit': self.limit,
+            'reason': reason,
+            'p95_latency': round(p95, 3) if p95 is not None else None,
+            'error_rate': round(error_rate, 3) if error_rate is not None else None
+        })
+
+    def snapshot(self):
+        """Current limiter state for the metrics endpoint"""
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'in_flight': self._in_flight,
+                'p95_latency': round(self._p95(), 3),
+                'error_rate': round(self._error_rate(), 3),
+                'target_p95': self.target_p95,
+                'target_error_rate': self.target_error_rate,
+                'totals': dict(self.totals),
+                'history': list(self.history)
+            }
+
 class LeadScraper:
     def __init__(self):
-        # Enhanced 2025 anti-bot detection setup
-        self.session = requests.Session()
-        self.last_request_time = {}  # Domain-based rate limiting
+        # Enhanced 2025 anti-bot detection setup - HTTP session and anti-bot libraries are created on first use
+        self._session = None
+        self.last_request_time = {}  # Domain-based rate limiting (next free slot per host)
+        self._rate_limit_lock = threading.Lock()
         self.driver = None
         self.fallback_mode = False
-        
-        # Initialize advanced anti-bot detection libraries
-        try:
-            import undetected_chromedriver as uc
-            from selenium_stealth import stealth
-            from fake_useragent import UserAgent
-            import cloudscraper
-            
-            self.uc = uc
-            self.stealth = stealth
-            self.ua = UserAgent(browsers=['chrome', 'firefox', 'safari', 'edge'])
-            self.cloudscraper = cloudscraper
-            self.advanced_libs_available = True
-            print("✅ Advanced anti-bot detection libraries loaded successfully")
-        except ImportError as e:
-            print(f"⚠️ Advanced libraries not available, using fallback mode: {e}")
-            self.advanced_libs_available = False
-            self.fallback_mode = True
-        
+        self._advanced_libs_available = None
+        self._lazy_init_lock = threading.Lock()
+        self.uc = None
+        self.stealth = None
+        self.ua = None
+        self.cloudscraper = None
+
+        # Byte cap for streamed page reads (None reads whole bodies, as before)
+        self.max_page_bytes = MAX_PAGE_BYTES
+
+        # Adaptive concurrency for the contact enrichment fan-out (shared by search and enhance)
+        self.enrichment_limiter = AdaptiveConcurrencyLimiter()
+
+        # Contact page discovery: per-origin sitemap lookups and fetch/hit counters
+        self._sitemap_cache = {}
+        self._contact_stats_lock = threading.Lock()
+        self.contact_page_stats = {
+            'leads': 0, 'pages_fetched': 0, 'emails_found': 0, 'homepage_only': 0,
+            'discovered_link': 0, 'sitemap': 0, 'guessed': 0, 'not_found': 0, 'not_modified': 0
+        }
+
         # Pool of current realistic user agents (updated January 2025)
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
@@ -186,6 +2082,47 @@ class LeadScraper:
             'en-CA,en;q=0.9,fr;q=0.8'
         ]
     
+    @property
+    def session(self):
+        """Shared requests session, created on first use"""
+        if self._session is None:
+            import requests
+            with self._lazy_init_lock:
+                if self._session is None:
+                    self._session = requests.Session()
+        return self._session
+    
+    @property
+    def advanced_libs_available(self):
+        """Whether the anti-bot libraries are usable - they are imported on the first request, not at boot"""
+        if self._advanced_libs_available is None:
+            with self._lazy_init_lock:
+                if self._advanced_libs_available is None:
+                    self._load_advanced_libs()
+        return self._advanced_libs_available
+    
+    def _load_advanced_libs(self):
+        """Initialize advanced anti-bot detection libraries"""
+        import importlib.util
+        try:
+            # The Chrome driver is disabled, so only check its packages are installed rather than importing them
+            for module_name in ('undetected_chromedriver', 'selenium_stealth'):
+                if importlib.util.find_spec(module_name) is None:
+                    raise ImportError(f"No module named '{module_name}'")
+            
+            from fake_useragent import UserAgent
+            import cloudscraper
+            
+            self.ua = UserAgent(browsers=['chrome', 'firefox', 'safari', 'edge'])
+            self.cloudscraper = cloudscraper
+            self.fallback_mode = False
+            self._advanced_libs_available = True
+            print("✅ Advanced anti-bot detection libraries loaded successfully")
+        except ImportError as e:
+            print(f"⚠️ Advanced libraries not available, using fallback mode: {e}")
+            self.fallback_mode = True
+            self._advanced_libs_available = False
+    
     def _get_undetected_driver(self):
         """Initialize undetected Chrome driver - DISABLED for performance optimization"""
         # PERFORMANCE FIX: ChromeDriver causes timeouts and binary location errors
@@ -275,17 +2212,25 @@ class LeadScraper:
         return headers
     
     def _respect_rate_limit(self, domain):
-        """Implement lightweight rate limiting for performance"""
-        if domain in self.last_request_time:
-            elapsed = time.time() - self.last_request_time[domain]
-            min_interval = 0.1  # Ultra-fast rate limiting for speed
-            if elapsed < min_interval:
-                time.sleep(min_interval - elapsed)
-        
-        self.last_request_time[domain] = time.time()
+        """Space requests to one host by its minimum interval, across every thread of this process"""
+        host = domain.lower().split(':', 1)[0]
+        host = host[4:] if host.startswith('www.') else host
+        min_interval = SEARCH_HOST_MIN_INTERVAL if host in RATE_LIMITED_SEARCH_HOSTS else DEFAULT_HOST_MIN_INTERVAL
+        with self._rate_limit_lock:
+            # Each caller reserves the next free slot, so concurrent batch searches queue up instead of bursting
+            now = time.time()
+            slot = max(now, self.last_request_time.get(host, 0) + min_interval)
+            self.last_request_time[host] = slot
+        if slot > now:
+            time.sleep(slot - now)
     
-    def _make_advanced_request(self, url, params=None, max_retries=2):
-        """Make HTTP request using advanced anti-bot detection (2025 techniques)"""
+    def _make_advanced_request(self, url, params=None, max_retries=2, max_bytes=None):
+        """Make HTTP request using advanced anti-bot detection (2025 techniques)
+
+        With max_bytes set the body is streamed, capped and skipped for non-HTML content types.
+        """
+        import requests
+        
         domain = urlparse(url).netloc
         self._respect_rate_limit(domain)
         
@@ -326,8 +2271,10 @@ class LeadScraper:
                             'X-Real-IP': f"{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}"
                         })
                         
-                        response = scraper.get(url, params=params, headers=headers, timeout=15)
+                        response = scraper.get(url, params=params, headers=headers, timeout=15, stream=bool(max_bytes))
                         self._last_url = url
+                        if max_bytes:
+                            _limit_response_body(response, max_bytes)
                         
                         if response.status_code == 200:
                             print(f"✅ Enhanced CloudScraper success: {response.status_code}")
@@ -379,8 +2326,10 @@ class LeadScraper:
                 # Remove empty headers
                 headers = {k: v for k, v in headers.items() if v}
                 
-                response = self._current_session.get(url, params=params, headers=headers, timeout=12)
+                response = self._current_session.get(url, params=params, headers=headers, timeout=12, stream=bool(max_bytes))
                 self._last_url = url
+                if max_bytes:
+                    _limit_response_body(response, max_bytes)
                 
                 if response.status_code == 200:
                     print(f"✅ Basic request success: {response.status_code}")
@@ -411,9 +2360,9 @@ class LeadScraper:
         print(f"❌ All methods exhausted for {url}")
         return None
     
-    def _make_request_with_retry(self, url, params=None, max_retries=2):
+    def _make_request_with_retry(self, url, params=None, max_retries=2, max_bytes=None):
         """Legacy method wrapper - routes to advanced request method"""
-        return self._make_advanced_request(url, params, max_retries)
+        return self._make_advanced_request(url, params, max_retries, max_bytes=max_bytes)
     
     def cleanup(self):
         """Clean up resources"""
@@ -425,14 +2374,17 @@ class LeadScraper:
                 pass
             self.driver = None
             
-        if self.session:
+        if self._session:
             try:
-                self.session.close()
+                self._session.close()
             except:
                 pass
         
-    def search_business_listings(self, business_type, location, num_results=20):
-        """Search multiple sources for structured business listings - Bing Primary, Yellow Pages Fallback"""
+    def search_business_listings(self, business_type, location, num_results=20, exclude=None):
+        """Search multiple sources for structured business listings - Bing Primary, Yellow Pages Fallback
+
+        exclude(lead) -> True drops a discovered listing before any enrichment (e.g. businesses a user already has).
+        """
         results = []
         
         try:
@@ -469,12 +2421,24 @@ class LeadScraper:
                 # Create demo results to avoid empty response
                 results = self._create_demo_results(business_type, location, min(5, num_results))
                 
-        # Deduplication is handled at the route level when saving leads
+        # Discovery returns bare listings - nothing has been fetched from the businesses' own sites yet, so
+        # callers that know their existing leads drop them here and they are never crawled (route-level
+        # deduplication still runs when saving)
+        if exclude:
+            results = [lead for lead in results if not exclude(lead)]
+        
+        # Businesses crawled recently for any user come from the shared registry instead of being fetched again
+        for lead, record in zip(results, lookup_businesses(results)):
+            if record and is_recently_enriched(record):
+                for key in BUSINESS_FIELDS:
+                    if record.get(key) and not lead.get(key):
+                        lead[key] = record[key]
+                lead['enriched_at'] = record['enriched_at']
         
         # Enhance leads with social links, emails, and classification
         for i, lead in enumerate(results):
             # For leads without websites, try to generate a plausible website URL to check
-            if not lead.get('website') and lead.get('name'):
+            if not lead.get('website') and lead.get('name') and not is_recently_enriched(lead):
                 # Generate potential website URL from business name
                 business_name_clean = re.sub(r'[^\w\s-]', '', lead['name']).strip()
                 domain_name = re.sub(r'\s+', '', business_name_clean.lower())
@@ -491,31 +2455,37 @@ class LeadScraper:
                     except:
                         pass
             
-        # Process social media extraction concurrently for performance improvement
-        leads_with_websites = [lead for i, lead in enumerate(results) if lead.get('website') and self._is_valid_business_website(lead['website']) and i < 10]  # Process up to 10 leads for production speed
+        # Crawl the remaining listings' sites concurrently - the only contact crawl a search makes
+        leads_with_websites = [lead for lead in results[:num_results] if lead.get('website')
+                               and self._is_valid_business_website(lead['website']) and not is_recently_enriched(lead)]
+        crawl_timeout = 8 * (1 + (len(leads_with_websites) - 1) // 10)  # 8s per 10 sites, as when at most 10 were crawled
         
         if leads_with_websites:
-            print(f"Processing {len(leads_with_websites)} leads concurrently for enhanced contact info...")
+            print(f"Processing {len(leads_with_websites)} leads concurrently for enhanced contact info (limit {self.enrichment_limiter.limit})...")
             try:
-                with ThreadPoolExecutor(max_workers=6) as executor:
+                # Threads are capped by the limiter's ceiling; the limiter itself gates how many fetch at once
+                with ThreadPoolExecutor(max_workers=min(self.enrichment_limiter.max_limit, len(leads_with_websites))) as executor:
                     # Submit tasks for concurrent processing
                     future_to_lead = {}
                     for lead in leads_with_websites:
-                        future = executor.submit(self._extract_enhanced_contact_info_fast, lead['website'])
-                        future_to_lead[future] = lead
+                        validators = {}
+                        future = executor.submit(self._extract_enhanced_contact_info_limited, lead['website'], validators)
+                        future_to_lead[future] = (lead, validators)
                     
                     # Collect results as they complete with reduced timeout for production
                     try:
-                        for future in as_completed(future_to_lead, timeout=8):
-                            lead = future_to_lead[future]
+                        for future in as_completed(future_to_lead, timeout=crawl_timeout):
+                            lead, validators = future_to_lead[future]
                             try:
                                 enhanced_contact = future.result()
-                                # Update fields that are empty or not populated (allow overwriting empty strings)
-                                for key, value in enhanced_contact.items():
-                                    if value and (not lead.get(key) or lead.get(key) == ''):
-                                        lead[key] = value
-                                        if key == 'email':
-                                            print(f"    ✅ Set email for {lead['name']}: {value}")
+                                # Fill fields that are empty and stamp when each one was extracted
+                                changed = apply_contact_info(lead, enhanced_contact, datetime.now().isoformat())
+                                if enhanced_contact.get('phone') and not lead.get('phone'):
+                                    lead['phone'] = enhanced_contact['phone']
+                                if conditional_validators(validators):
+                                    lead['crawl_validators'] = validators
+                                if 'email' in changed:
+                                    print(f"    ✅ Set email for {lead['name']}: {lead['email']}")
                                 
                                 # Log social media findings
                                 social_found = []
@@ -532,7 +2502,7 @@ class LeadScraper:
                             except Exception as e:
                                 print(f"Error enhancing {lead['name']}: {e}")
                     except ConcurrentTimeoutError:
-                        print("Concurrent processing timed out after 10s, cancelling remaining tasks")
+                        print(f"Concurrent processing timed out after {crawl_timeout}s, cancelling remaining tasks")
                         # Cancel remaining futures immediately
                         for future in future_to_lead:
                             future.cancel()
@@ -666,55 +2636,10 @@ class LeadScraper:
         
         name_lower = business_name.lower()
         
-        # Healthcare keywords
-        healthcare_keywords = ['dental', 'medical', 'clinic', 'doctor', 'health', 'hospital', 'pharmacy', 'wellness', 'therapy', 'rehabilitation', 'optometry', 'chiropractic']
-        if any(keyword in name_lower for keyword in healthcare_keywords):
-            return 'Healthcare'
-        
-        # Food & Restaurant keywords  
-        food_keywords = ['restaurant', 'cafe', 'coffee', 'pizza', 'bakery', 'grill', 'bar', 'diner', 'bistro', 'kitchen', 'food', 'catering', 'tavern']
-        if any(keyword in name_lower for keyword in food_keywords):
-            return 'Food & Beverage'
-        
-        # Fitness keywords
-        fitness_keywords = ['gym', 'fitness', 'yoga', 'pilates', 'crossfit', 'martial arts', 'boxing', 'training', 'sports']
-        if any(keyword in name_lower for keyword in fitness_keywords):
-            return 'Fitness & Wellness'
-        
-        # Beauty & Personal Care
-        beauty_keywords = ['salon', 'spa', 'beauty', 'hair', 'nail', 'massage', 'skincare', 'barber', 'cosmetic']
-        if any(keyword in name_lower for keyword in beauty_keywords):
-            return 'Beauty & Personal Care'
-        
-        # Legal keywords
-        legal_keywords = ['law', 'legal', 'attorney', 'lawyer', 'firm', 'court', 'litigation']
-        if any(keyword in name_lower for keyword in legal_keywords):
-            return 'Legal Services'
-        
-        # Real Estate keywords
-        realestate_keywords = ['real estate', 'realtor', 'property', 'realty', 'homes', 'mortgage', 'lending']
-        if any(keyword in name_lower for keyword in realestate_keywords):
-            return 'Real Estate'
-        
-        # Automotive keywords
-        automotive_keywords = ['auto', 'car', 'automotive', 'tire', 'repair', 'garage', 'dealership', 'mechanic']
-        if any(keyword in name_lower for keyword in automotive_keywords):
-            return 'Automotive'
-        
-        # Retail keywords
-        retail_keywords = ['store', 'shop', 'retail', 'boutique', 'market', 'outlet', 'plaza']
-        if any(keyword in name_lower for keyword in retail_keywords):
-            return 'Retail'
-        
-        # Professional Services
-        professional_keywords = ['consulting', 'accounting', 'insurance', 'financial', 'marketing', 'advertising', 'design']
-        if any(keyword in name_lower for keyword in professional_keywords):
-            return 'Professional Services'
-        
-        # Technology
-        tech_keywords = ['tech', 'software', 'computer', 'IT', 'digital', 'web', 'mobile', 'app']
-        if any(keyword in name_lower for keyword in tech_keywords):
-            return 'Technology'
+        # First industry with a keyword in the name wins (see INDUSTRY_KEYWORDS for the order)
+        for industry, keywords in INDUSTRY_KEYWORDS:
+            if any(keyword in name_lower for keyword in keywords):
+                return industry
         
         return 'General'
     
@@ -726,15 +2651,11 @@ class LeadScraper:
         address_lower = address.lower()
         
         # Major metropolitan areas
-        major_cities = ['new york', 'los angeles', 'chicago', 'houston', 'philadelphia', 'phoenix', 'san antonio', 'san diego', 'dallas', 'san jose', 'austin', 'jacksonville', 'fort worth', 'columbus', 'charlotte', 'san francisco', 'indianapolis', 'seattle', 'denver', 'washington', 'boston', 'el paso', 'detroit', 'nashville', 'portland', 'oklahoma city', 'las vegas', 'baltimore', 'milwaukee', 'albuquerque', 'tucson', 'fresno', 'sacramento', 'kansas city', 'mesa', 'atlanta', 'omaha', 'colorado springs', 'raleigh', 'miami', 'cleveland', 'tulsa', 'oakland', 'minneapolis', 'wichita', 'arlington']
-        
-        if any(city in address_lower for city in major_cities):
+        if any(city in address_lower for city in MAJOR_METRO_CITIES):
             return 'Tier 1 - Major Metro'
         
         # State capitals and mid-size cities
-        tier2_cities = ['albany', 'annapolis', 'atlanta', 'augusta', 'austin', 'baton rouge', 'bismarck', 'boise', 'boston', 'cheyenne', 'columbia', 'columbus', 'concord', 'denver', 'des moines', 'dover', 'frankfort', 'harrisburg', 'hartford', 'helena', 'honolulu', 'indianapolis', 'jackson', 'jefferson city', 'juneau', 'lansing', 'lincoln', 'little rock', 'madison', 'montgomery', 'montpelier', 'nashville', 'oklahoma city', 'olympia', 'phoenix', 'pierre', 'providence', 'raleigh', 'richmond', 'sacramento', 'saint paul', 'salem', 'salt lake city', 'santa fe', 'springfield', 'tallahassee', 'topeka', 'trenton']
-        
-        if any(city in address_lower for city in tier2_cities):
+        if any(city in address_lower for city in TIER2_CITIES):
             return 'Tier 2 - Mid-Size City'
         
         return 'Tier 3 - Small City/Town'
@@ -753,7 +2674,7 @@ class LeadScraper:
         businesses = []
         
         try:
-            soup = BeautifulSoup(html_content, 'lxml')
+            soup = make_soup(html_content)
             
             # Look for JSON-LD structured data first (most reliable)
             json_scripts = soup.find_all('script', type='application/ld+json')
@@ -943,7 +2864,7 @@ class LeadScraper:
                 
                 response = self._make_request_with_retry(search_url)
                 if response and response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'lxml')
+                    soup = make_soup(response.content)
                     
                     # Updated Bing result parsing with 2024 selectors
                     results = soup.select('li.b_algo')[:max_results - len(businesses)]
@@ -968,7 +2889,7 @@ class LeadScraper:
         return businesses[:max_results]
     
     def _extract_enhanced_bing_result(self, result_element, business_type, location):
-        """Extract enhanced data from Bing search result element"""
+        """A bare listing (name, website, snippet and what the result itself shows) from a Bing search result - no site fetches"""
         try:
             # Extract title and URL using updated 2024 selectors
             title_elem = result_element.select_one('h2 a')
@@ -1016,24 +2937,7 @@ class LeadScraper:
                 'search_relevance': self._calculate_search_relevance(title, description, business_type)
             }
             
-            # Extract contact info and social media from business website
-            try:
-                contact_info = self.extract_contact_info(resolved_url)
-                business['phone'] = business['phone'] or contact_info.get('phone', '')
-                business['email'] = contact_info.get('email', '')
-                
-                # Enhanced social media extraction
-                enhanced_contact = self._extract_enhanced_contact_info(resolved_url)
-                business.update(enhanced_contact)
-                
-            except Exception as e:
-                print(f"Contact extraction failed for {resolved_url}: {e}")
-            
-            # Apply classification and scoring
-            business['lead_type'] = self._classify_lead(business)
-            business['priority_score'] = self._calculate_priority_score(business)
-            business['created_at'] = datetime.now().isoformat()
-            
+            # A bare listing - search_business_listings crawls the site only if the caller still wants the business
             return business
             
         except Exception as e:
@@ -1065,9 +2969,10 @@ class LeadScraper:
                 search_terms = f'"{business_type}" "{location}" phone contact address'
                 search_url = f"https://www.bing.com/search?q={quote_plus(search_terms)}"
                 
+                self._respect_rate_limit('www.bing.com')
                 response = self.session.get(search_url, timeout=10)
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'lxml')
+                    soup = make_soup(response.content)
                     
                     # Extract business websites from search results
                     for i, result in enumerate(soup.select('.b_algo')[:max_results - len(businesses)]):
@@ -1098,22 +3003,7 @@ class LeadScraper:
                                         'search_relevance': 0.5
                                     }
                                     
-                                    # Try to get contact info from the website
-                                    try:
-                                        contact_info = self.extract_contact_info(resolved_url)
-                                        business['phone'] = contact_info.get('phone', '')
-                                        business['email'] = contact_info.get('email', '')
-                                    except:
-                                        pass
-                                    
-                                    # Apply same enhancement as main search - add social links and classification
-                                    enhanced_contact = self._extract_enhanced_contact_info(resolved_url)
-                                    business.update(enhanced_contact)
-                                    
-                                    business['lead_type'] = self._classify_lead(business)
-                                    business['priority_score'] = self._calculate_priority_score(business)
-                                    business['created_at'] = datetime.now().isoformat()
-                                        
+                                    # Bare listing, enriched by search_business_listings like the main search
                                     businesses.append(business)
                                 
                         except:
@@ -1134,13 +3024,13 @@ class LeadScraper:
                 if rating_elem:
                     rating_text = rating_elem.get_text(strip=True)
                     # Extract numeric rating (e.g., "4.5/5", "4.2 stars")
-                    rating_match = re.search(r'([0-9]\.[0-9]|[0-9])', rating_text)
+                    rating_match = RATING_NUMBER_PATTERN.search(rating_text)
                     if rating_match:
                         return rating_match.group(1)
             
             # Look for star patterns in text
             text_content = result_element.get_text()
-            star_match = re.search(r'([0-9]\.[0-9]|[0-9])\s*(?:stars?|/5|★)', text_content, re.IGNORECASE)
+            star_match = RATING_STARS_PATTERN.search(text_content)
             if star_match:
                 return star_match.group(1)
                 
@@ -1152,20 +3042,14 @@ class LeadScraper:
         """Extract business hours from Bing search result"""
         try:
             # Look for hours patterns
-            hours_patterns = [
-                r'(?:open|hours?)[:·]?\s*([0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM)\s*-\s*[0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM))',
-                r'(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)[a-z]*[\s-]*([0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM)\s*-\s*[0-9]{1,2}(?::[0-9]{2})?\s*(?:AM|PM))',
-                r'([0-9]{1,2}:[0-9]{2}\s*(?:AM|PM)\s*-\s*[0-9]{1,2}:[0-9]{2}\s*(?:AM|PM))'
-            ]
-            
             text_content = result_element.get_text()
-            for pattern in hours_patterns:
-                hours_match = re.search(pattern, text_content, re.IGNORECASE)
+            for pattern in HOURS_PATTERNS:
+                hours_match = pattern.search(text_content)
                 if hours_match:
                     return hours_match.group(1).strip()
             
             # Look for "Open now", "Closed now" indicators
-            status_match = re.search(r'(open now|closed now|opens at|closes at)', text_content, re.IGNORECASE)
+            status_match = HOURS_STATUS_PATTERN.search(text_content)
             if status_match:
                 return status_match.group(1)
                 
@@ -1178,14 +3062,8 @@ class LeadScraper:
         try:
             # Look for phone number patterns in the result
             text_content = result_element.get_text()
-            phone_patterns = [
-                r'\(?([0-9]{3})\)?[-.\\ ]?([0-9]{3})[-.\\ ]?([0-9]{4})',
-                r'\+?1[-.\\ ]?\(?([0-9]{3})\)?[-.\\ ]?([0-9]{3})[-.\\ ]?([0-9]{4})',
-                r'([0-9]{3})[-.\\ ]([0-9]{3})[-.\\ ]([0-9]{4})'
-            ]
-            
-            for pattern in phone_patterns:
-                phone_match = re.search(pattern, text_content)
+            for pattern in BING_PHONE_PATTERNS:
+                phone_match = pattern.search(text_content)
                 if phone_match:
                     if len(phone_match.groups()) == 3:
                         return f"({phone_match.group(1)}) {phone_match.group(2)}-{phone_match.group(3)}"
@@ -1245,15 +3123,7 @@ class LeadScraper:
                 relevance_score += (description_word_matches / len(business_words)) * 0.3
             
             # Industry-specific keywords boost
-            industry_keywords = {
-                'restaurant': ['food', 'dining', 'cuisine', 'menu', 'chef'],
-                'dentist': ['dental', 'teeth', 'oral', 'smile', 'cavity'],
-                'salon': ['hair', 'beauty', 'style', 'cut', 'color'],
-                'lawyer': ['legal', 'law', 'attorney', 'court', 'litigation'],
-                'doctor': ['medical', 'health', 'physician', 'clinic', 'treatment']
-            }
-            
-            for biz_type, keywords in industry_keywords.items():
+            for biz_type, keywords in SEARCH_RELEVANCE_KEYWORDS.items():
                 if biz_type in business_type_lower:
                     keyword_matches = sum(1 for keyword in keywords if keyword in (title_lower + ' ' + description_lower))
                     if keyword_matches > 0:
@@ -1409,11 +3279,12 @@ class LeadScraper:
         try:
             print(f"Extracting business website from Yellow Pages: {yellowpages_url}")
             
+            self._respect_rate_limit('www.yellowpages.com')
             response = self.session.get(yellowpages_url, timeout=8)
             if response.status_code != 200:
                 return ''
             
-            soup = BeautifulSoup(response.content, 'lxml')
+            soup = make_soup(response.content)
             
             # Updated Yellow Pages 2024 website selectors
             website_selectors = [
@@ -1559,12 +3430,7 @@ class LeadScraper:
     
     def extract_domain(self, url):
         """Extract domain from URL"""
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            return parsed.netloc.lower()
-        except:
-            return ''
+        return extract_domain(url)
     
     def extract_company_name(self, title):
         """Extract clean company name from title"""
@@ -1582,16 +3448,7 @@ class LeadScraper:
             domain = self.extract_domain(url).lower()
             
             # Ultra-aggressive domain filtering for maximum speed
-            excluded_patterns = [
-                'yellowpages.com', 'yelp.com', 'google.com', 'facebook.com', 'linkedin.com',
-                'instagram.com', 'twitter.com', 'wordpress.com', 'blogspot.com', 'medium.com',
-                'wix.com', 'squarespace.com', '.gov', '.edu', 'wikipedia.org', 'amazon.com',
-                'bostonmagazine.com', 'threebestrated.com', 'denscore.com', 'alloutboston.com',
-                'americandentistsociety.com', 'iabdm.org', 'mass.gov', 'webmd.com', 'healthgrades.com',
-                'magazine', 'directory', 'rated', 'society', 'association', 'blog', 'news'
-            ]
-            
-            return not any(pattern in domain for pattern in excluded_patterns)
+            return not any(pattern in domain for pattern in EXCLUDED_BUSINESS_DOMAIN_PATTERNS)
             
         except Exception:
             return False
@@ -1600,19 +3457,21 @@ class LeadScraper:
         """Extract contact information from website"""
         contact_info = {'email': '', 'phone': ''}
         try:
-            response = self.session.get(url, timeout=8)
-            if response.status_code == 200:
-                content = trafilatura.extract(response.content, include_comments=False)
+            response = self.session.get(url, timeout=8, stream=bool(self.max_page_bytes))
+            if self.max_page_bytes:
+                _limit_response_body(response, self.max_page_bytes)
+            if response.status_code == 200 and response.content:
+                # Plain visible text keeps headers and footers, which is where contact details usually sit
+                content = extract_contact_text(response.content)
+                response = None  # Release the raw body before the regex passes
                 if content:
                     # Extract emails
-                    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-                    emails = re.findall(email_pattern, content)
+                    emails = CONTACT_EMAIL_PATTERN.findall(content)
                     if emails:
                         contact_info['email'] = emails[0]
                     
                     # Extract phone numbers
-                    phone_pattern = r'(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})'
-                    phones = re.findall(phone_pattern, content)
+                    phones = CONTACT_PHONE_PATTERN.findall(content)
                     if phones:
                         contact_info['phone'] = f"({phones[0][0]}) {phones[0][1]}-{phones[0][2]}"
                         
@@ -1622,6 +3481,7 @@ class LeadScraper:
     
     def _extract_enhanced_contact_info(self, url):
         """Extract enhanced contact info including social links by visiting contact pages"""
+        import requests
         enhanced_info = {
             'email': '',
             'facebook': '',
@@ -1641,56 +3501,75 @@ class LeadScraper:
         
         print(f"Extracting contact info and social media from: {url}")
         
-        # Optimized for maximum speed - check only main page and one contact page
-        pages_to_check = [
-            url,  # Main page first - most likely to have contact info
-            f"{url.rstrip('/')}/contact"  # Only one contact page for speed
-        ]
-        
-        # Try each page until we find good contact info
-        for page_url in pages_to_check:
+        # Main page first - most likely to have contact info, and its links point at the real contact page
+        page_url = url
+        homepage_parsed = False
+        for page_number in range(2):  # Only one contact page for speed
+            if not page_url:
+                break
             try:
                 print(f"  Checking page: {page_url}")
-                response = self._make_request_with_retry(page_url)
+                response = self._make_request_with_retry(page_url, max_bytes=self.max_page_bytes)
+                self._count_contact_page_stat('pages_fetched')
                 
                 if response and response.status_code == 200 and response.content:
-                    soup = BeautifulSoup(response.content, 'lxml')
+                    final_url = response.url or url
+                    content = response.content
+                    response = None  # Only the raw bytes go to the parser
+                    
+                    # Parsing is CPU-bound, so it runs in the parse process pool like the fast path
+                    page = parse_contact_page(content, final_url, url, want_fallback=False)
+                    content = None
                     
                     # Extract emails from this page
-                    page_emails = self._extract_emails_from_page(soup)
+                    page_emails = page['emails']
                     if page_emails and not enhanced_info['email']:
                         enhanced_info['email'] = page_emails[0]
                         print(f"    Found email: {enhanced_info['email']}")
                     
-                    # Extract social media from this page  
-                    page_social = self._extract_social_media_from_page(soup)
-                    
                     # Update social media info if we found new ones
-                    for platform, social_url in page_social.items():
+                    for platform, social_url in page['social'].items():
                         if social_url and not enhanced_info.get(platform):
                             enhanced_info[platform] = social_url
                             print(f"    Found {platform}: {social_url}")
                     
                     # If we found email OR any social platform, we're done for speed
                     social_count = sum(1 for v in enhanced_info.values() if v and v != enhanced_info['email'])
-                    if enhanced_info['email'] or social_count >= 1:  # Exit early if we find anything
+                    found_contact = enhanced_info['email'] or social_count >= 1  # Exit early if we find anything
+                    if not found_contact and page_number == 0:
+                        homepage_parsed = True
+                        page_url = self._resolve_contact_page(final_url, page['contact_link'], page['same_origin_links'])
+                    
+                    if found_contact:
                         print(f"  Found contact info, stopping search for speed")
+                        if page_number == 0:
+                            self._count_contact_page_stat('homepage_only')
                         break
+                    continue
                         
             except requests.exceptions.Timeout:
                 print(f"    Timeout accessing {page_url}")
-                continue
             except requests.exceptions.RequestException as e:
                 print(f"    Request error for {page_url}: {str(e)[:50]}")
-                continue
             except Exception as e:
                 print(f"    Error processing {page_url}: {str(e)[:50]}")
-                continue
+            
+            # Homepage unreachable - nothing to discover from, so fall back to the conventional path
+            if page_number == 0 and not homepage_parsed:
+                page_url = self._discover_contact_page(url, None)
                 
+        self._count_contact_page_stat('leads')
+        if enhanced_info['email']:
+            self._count_contact_page_stat('emails_found')
         return enhanced_info
     
-    def _extract_enhanced_contact_info_fast(self, url):
-        """Enhanced contact info extraction with more pages and fallback strategies"""
+    def _extract_enhanced_contact_info_fast(self, url, validators=None, prefetched=None):
+        """Enhanced contact info extraction with more pages and fallback strategies
+
+        A validators dict collects each fetched page's ETag/Last-Modified for a later conditional re-crawl; prefetched
+        maps page URLs to responses already downloaded (by the re-crawl's conditional GETs), used instead of fetching.
+        """
+        import requests
         enhanced_info = {
             'email': '',
             'facebook': '',
@@ -1708,55 +3587,96 @@ class LeadScraper:
         if not url or not isinstance(url, str) or not url.startswith('http'):
             return enhanced_info
         
-        # Reduced pages for production speed  
-        pages_to_check = [
-            url,  # Main page first
-            f"{url.rstrip('/')}/contact"
-        ]
-        
         simple_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
         }
         
-        pages_checked = 0
-        max_pages = 2  # Aggressive limit for production speed
+        # Main page first, then at most one contact page discovered from its links
+        page_url = url
+        homepage_fetched = False
+        fallback_email = ''
+        found_emails = []
+        phone = ''
         
-        for page_url in pages_to_check:
-            if pages_checked >= max_pages:
+        for page_number in range(2):  # Aggressive limit for production speed
+            if not page_url:
                 break
                 
             try:
-                response = requests.get(page_url, headers=simple_headers, timeout=8)
-                
+                self._count_contact_page_stat('pages_fetched')
+                response = prefetched.pop(page_url, None) if prefetched else None
+                if response is None:
+                    # Report every fetch outcome to the adaptive limiter
+                    fetch_started = time.monotonic()
+                    try:
+                        response = requests.get(page_url, headers=simple_headers, timeout=8, stream=bool(self.max_page_bytes))
+                    except requests.exceptions.Timeout:
+                        self.enrichment_limiter.record(time.monotonic() - fetch_started, timed_out=True)
+                        response = None
+                    except requests.exceptions.RequestException:
+                        self.enrichment_limiter.record(time.monotonic() - fetch_started, failed=True)
+                        response = None
+                    else:
+                        self.enrichment_limiter.record(time.monotonic() - fetch_started, status_code=response.status_code)
+                        if self.max_page_bytes:
+                            _limit_response_body(response, self.max_page_bytes)
+
                 if response and response.status_code == 200 and response.content:
-                    pages_checked += 1
-                    soup = BeautifulSoup(response.content, 'lxml')
+                    final_url = response.url or url
+                    if validators is not None:
+                        validators[page_url] = {name: response.headers[header] for name, header in
+                                                (('etag', 'ETag'), ('last_modified', 'Last-Modified')) if response.headers.get(header)}
+                    content = response.content
+                    response = None  # Drop the response object; only the raw bytes go to the parser
+                    
+                    # Parsing and extraction are CPU-bound, so they run in the parse process pool
+                    page = parse_contact_page(content, final_url, url, want_fallback=not fallback_email)
+                    content = None
                     
                     # Extract emails from this page
-                    page_emails = self._extract_emails_from_page(soup)
+                    page_emails = page['emails']
+                    found_emails.extend(email for email in page_emails if email not in found_emails)
                     if page_emails and not enhanced_info['email']:
                         enhanced_info['email'] = page_emails[0]
                         print(f"    ✅ Found email for {url}: {page_emails[0]}")
                     
-                    # Extract social media from this page  
-                    page_social = self._extract_social_media_from_page(soup)
-                    
                     # Update social media info
-                    for platform, social_url in page_social.items():
+                    for platform, social_url in page['social'].items():
                         if social_url and not enhanced_info.get(platform):
                             enhanced_info[platform] = social_url
                     
-                    # Try fallback email strategies if no email found yet
-                    if not enhanced_info['email']:
-                        enhanced_info['email'] = self._generate_fallback_email(url, soup)
+                    # Remember a fallback email candidate in case no page has a real one
+                    if not enhanced_info['email'] and not fallback_email:
+                        fallback_email = page['fallback_email']
+                    phone = phone or page['phone']
                     
-                    # Early exit if we found good contact info
-                    social_count = sum(1 for v in enhanced_info.values() if v and v != enhanced_info['email'])
-                    if enhanced_info['email'] and social_count >= 2:
+                    # Homepage already gave email and socials - skip the second fetch entirely
+                    social_count = sum(1 for k, v in enhanced_info.items() if v and k != 'email')
+                    found_contact = enhanced_info['email'] and social_count >= 1
+                    if not found_contact and page_number == 0:
+                        homepage_fetched = True
+                        page_url = self._resolve_contact_page(final_url, page['contact_link'], page['same_origin_links'])
+                    
+                    if found_contact:
+                        if page_number == 0:
+                            self._count_contact_page_stat('homepage_only')
                         break
                         
             except Exception as e:
-                continue  # Skip failed pages
+                pass  # Skip failed pages
+            
+            # Homepage unreachable - nothing to discover from, so fall back to the conventional path
+            if page_number == 0 and not homepage_fetched and page_url == url:
+                page_url = self._discover_contact_page(url, None)
+        
+        if not enhanced_info['email']:
+            enhanced_info['email'] = fallback_email
+        if phone:
+            enhanced_info['phone'] = phone  # Only fills a listing without one; not a re-crawled field
+        
+        self._count_contact_page_stat('leads')
+        if enhanced_info['email'] and enhanced_info['email'] != fallback_email:
+            self._count_contact_page_stat('emails_found')
         
         # Log final results
         found_items = []
@@ -1766,38 +3686,227 @@ class LeadScraper:
         
         if found_items:
             print(f"    📧 Contact extraction for {url}: {', '.join(found_items)}")
+        
+        if fallback_email and enhanced_info['email'] == fallback_email:
+            enhanced_info['email_guessed'] = True  # No page had an address; apply_contact_info never lets this replace one
+        if found_emails:
+            enhanced_info['emails'] = found_emails  # Every address the pages listed, so a re-crawl can keep the stored one
                 
         return enhanced_info
+
+    def _discover_contact_page(self, base_url, soup):
+        """Pick the most likely contact page from same-origin homepage links, falling back to the sitemap"""
+        # Homepage unreachable or rendered entirely by JavaScript - guess the conventional path
+        if soup is None:
+            self._count_contact_page_stat('guessed')
+            return f"{base_url.rstrip('/')}/contact"
+        
+        best_url, same_origin_links = self._find_contact_link(base_url, soup)
+        return self._resolve_contact_page(base_url, best_url, same_origin_links)
+    
+    def _find_contact_link(self, base_url, soup):
+        """Best-scoring same-origin contact link on a parsed page, plus the number of same-origin links seen"""
+        parsed_base = urlparse(base_url)
+        origin_host = parsed_base.netloc.lower()
+        if origin_host.startswith('www.'):
+            origin_host = origin_host[4:]
+        base_path = parsed_base.path.rstrip('/')
+        
+        best_url, best_score, same_origin_links = '', 0, 0
+        for link in soup.find_all('a', href=True)[:400]:
+            href = link.get('href', '').strip()
+            if not href or href.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
+                continue
+            
+            candidate = urljoin(base_url, href).split('#')[0]
+            parsed = urlparse(candidate)
+            host = parsed.netloc.lower()
+            if host.startswith('www.'):
+                host = host[4:]
+            if parsed.scheme not in ('http', 'https') or host != origin_host:
+                continue
+            same_origin_links += 1
+            
+            path = parsed.path.rstrip('/')
+            if path == base_path or NON_HTML_PATH_PATTERN.search(path):
+                continue
+            
+            score = _score_contact_path(path, link.get_text(' ', strip=True))
+            if score > best_score:
+                best_url, best_score = candidate, score
+        
+        return best_url, same_origin_links
+    
+    def _resolve_contact_page(self, base_url, best_url, same_origin_links):
+        """Turn a homepage link scan into the contact page to fetch (sitemap and guessing need the network)"""
+        parsed_base = urlparse(base_url)
+        if best_url:
+            self._count_contact_page_stat('discovered_link')
+            return best_url
+        
+        sitemap_url = self._lookup_sitemap_contact_page(f"{parsed_base.scheme}://{parsed_base.netloc}")
+        if sitemap_url:
+            self._count_contact_page_stat('sitemap')
+            return sitemap_url
+        
+        if same_origin_links == 0:
+            self._count_contact_page_stat('guessed')
+            return f"{base_url.rstrip('/')}/contact"
+        
+        # The site links to other pages, none of which look like a contact page - don't waste a fetch
+        self._count_contact_page_stat('not_found')
+        return None
+    
+    def _lookup_sitemap_contact_page(self, origin):
+        """Find a contact page in the site's sitemap.xml (cached per origin)"""
+        import requests
+        cached = self._sitemap_cache.get(origin)
+        if cached and time.time() - cached[0] < SITEMAP_CACHE_TTL:
+            return cached[1]
+        
+        best_url, best_score = '', 0
+        try:
+            self._count_contact_page_stat('pages_fetched')
+            # Streamed and byte-capped like the pages themselves, and reported to the adaptive limiter
+            fetch_started = time.monotonic()
+            try:
+                response = requests.get(f"{origin}/sitemap.xml", timeout=5, stream=True, headers={
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+                })
+            except requests.exceptions.Timeout:
+                self.enrichment_limiter.record(time.monotonic() - fetch_started, timed_out=True)
+                raise
+            except requests.exceptions.RequestException:
+                self.enrichment_limiter.record(time.monotonic() - fetch_started, failed=True)
+                raise
+            self.enrichment_limiter.record(time.monotonic() - fetch_started, status_code=response.status_code)
+            if response.status_code != 200:
+                response.close()  # Closed unread, like an error page
+            elif _limit_response_body(response, SITEMAP_MAX_BYTES, SITEMAP_CONTENT_TYPES):
+                # Plain <loc> scan - no need for a full XML parse, and sitemap indexes are not followed
+                for loc in SITEMAP_LOC_PATTERN.findall(response.text)[:2000]:
+                    loc = loc.strip()
+                    parsed = urlparse(loc)
+                    if not parsed.netloc or NON_HTML_PATH_PATTERN.search(parsed.path):
+                        continue
+                    score = _score_contact_path(parsed.path.rstrip('/'), '')
+                    if score > best_score:
+                        best_url, best_score = loc, score
+        except Exception as e:
+            print(f"    Sitemap lookup failed for {origin}: {str(e)[:50]}")
+        
+        if len(self._sitemap_cache) >= SITEMAP_CACHE_MAX_ENTRIES:
+            self._sitemap_cache.clear()
+        self._sitemap_cache[origin] = (time.time(), best_url)
+        return best_url
+    
+    def _count_contact_page_stat(self, key):
+        with self._contact_stats_lock:
+            self.contact_page_stats[key] += 1
+    
+    def contact_page_metrics(self):
+        """Contact page fetch counters with per-lead ratios"""
+        with self._contact_stats_lock:
+            stats = dict(self.contact_page_stats)
+        leads = max(stats['leads'], 1)
+        stats['fetches_per_lead'] = round(stats['pages_fetched'] / leads, 2)
+        stats['email_hit_rate'] = round(stats['emails_found'] / leads, 3)
+        return stats
+    
+    def _extract_enhanced_contact_info_limited(self, url, validators=None):
+        """Run fast contact extraction inside an adaptive concurrency slot"""
+        with self.enrichment_limiter.slot():
+            return self._extract_enhanced_contact_info_fast(url, validators)
+
+    def _pages_unchanged(self, validators):
+        """(True, {}) when every page of the last crawl answers a conditional GET with 304 - no body is read or parsed.
+        Otherwise (False, {page_url: response}) holding the changed page's 200 response, body read, for the re-crawl to
+        parse instead of downloading it again ({} if it answered anything else)."""
+        import requests
+        for page_url, page_validators in validators.items():
+            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'}
+            if page_validators.get('etag'):
+                headers['If-None-Match'] = page_validators['etag']
+            if page_validators.get('last_modified'):
+                headers['If-Modified-Since'] = page_validators['last_modified']
+            fetch_started = time.monotonic()
+            try:
+                response = requests.get(page_url, headers=headers, timeout=8, stream=True)
+            except requests.exceptions.RequestException:
+                self.enrichment_limiter.record(time.monotonic() - fetch_started, failed=True)
+                return False, {}
+            self.enrichment_limiter.record(time.monotonic() - fetch_started, status_code=response.status_code)
+            if response.status_code == 304:
+                response.close()
+                continue
+            if response.status_code != 200:
+                response.close()  # Closed unread: an error page costs only its headers
+                return False, {}
+            if self.max_page_bytes:
+                _limit_response_body(response, self.max_page_bytes)
+            return False, {page_url: response}
+        return bool(validators), {}
+
+    def refresh_contact_info(self, url, validators=None):
+        """Re-crawl a lead's site inside a concurrency slot: (None, validators) when nothing changed since the last
+        crawl, else (contact info, new validators)"""
+        with self.enrichment_limiter.slot():
+            changed_pages = {}
+            if validators:
+                unchanged, changed_pages = self._pages_unchanged(validators)
+                if unchanged:
+                    self._count_contact_page_stat('not_modified')
+                    return None, validators
+            new_validators = {}
+            try:
+                info = self._extract_enhanced_contact_info_fast(url, new_validators, prefetched=changed_pages)
+            finally:
+                for response in changed_pages.values():
+                    response.close()
+            return info, conditional_validators(new_validators)
+
+    def _parse_contact_page(self, content, page_url, site_url, want_fallback=True):
+        """Parse raw page bytes into the small dict the enrichment loop needs (emails, socials, contact link)"""
+        soup = make_soup(content)
+        try:
+            best_url, same_origin_links = self._find_contact_link(page_url, soup)
+            return {
+                'emails': self._extract_emails_from_page(soup),
+                'social': {k: v for k, v in self._extract_social_media_from_page(soup).items() if v},
+                'fallback_email': self._generate_fallback_email(site_url, soup) if want_fallback else '',
+                'phone': self._extract_phone_from_page(soup),
+                'contact_link': best_url,
+                'same_origin_links': same_origin_links
+            }
+        finally:
+            # Release the parse tree now rather than waiting for the cycle collector
+            soup.decompose()
+    
+    def _extract_phone_from_page(self, soup):
+        """First phone number in a page's visible text, formatted like format_phone_number, or ''"""
+        phones = CONTACT_PHONE_PATTERN.findall(soup.get_text(' '))
+        return f"({phones[0][0]}) {phones[0][1]}-{phones[0][2]}" if phones else ''
     
     def _extract_emails_from_page(self, soup):
-        """Extract valid business emails from a webpage with enhanced patterns"""
-        emails = set()
+        """Extract valid business emails from a webpage with enhanced patterns, in the order they were found"""
+        emails = {}  # Insertion-ordered, so the first address is the same on every crawl of an unchanged page
         
         try:
             # 1. Email from mailto links
-            mailto_links = soup.find_all('a', href=re.compile(r'^mailto:'))
+            mailto_links = soup.find_all('a', href=MAILTO_HREF_PATTERN)
             for link in mailto_links:
                 href = link.get('href', '')
                 if href:
                     email = href.replace('mailto:', '').split('?')[0].strip()
                     if self._is_valid_business_email(email):
-                        emails.add(email.lower())
+                        emails.setdefault(email.lower(), None)
                         print(f"    Found email from mailto: {email}")
             
             # 2. Email from text content with improved patterns
             content = soup.get_text()
             # Enhanced email patterns with better word boundaries
-            email_patterns = [
-                # Standard email pattern with strict word boundaries  
-                r'(?<!\S)([A-Za-z0-9](?:[A-Za-z0-9._%-]*[A-Za-z0-9])?@[A-Za-z0-9](?:[A-Za-z0-9.-]*[A-Za-z0-9])?\.[A-Za-z]{2,})(?!\S)',
-                # Contact/email prefixed patterns with capture groups
-                r'(?i)(?:email|contact|info|support|sales|hello|inquiries)[:\s]*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})',
-                # Email addresses in common formats
-                r'(?i)(?:mailto:)?([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})',
-            ]
-            
-            for pattern in email_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
+            for pattern in PAGE_EMAIL_PATTERNS:
+                matches = pattern.findall(content)
                 for match in matches:
                     if isinstance(match, tuple):
                         email = match[0] if match[0] else match[1] if len(match) > 1 else ''
@@ -1806,30 +3915,30 @@ class LeadScraper:
                     
                     # Advanced email cleaning
                     email = email.strip().strip('.,;:!?()[]{}"\' ')
-                    email = re.sub(r'^mailto:', '', email, flags=re.IGNORECASE)
+                    email = MAILTO_PREFIX_PATTERN.sub('', email)
                     
                     # Remove common prefixes that get captured
-                    email = re.sub(r'^/+', '', email)  # Remove leading slashes
-                    email = re.sub(r'^[^a-zA-Z0-9]*', '', email)  # Remove non-alphanumeric prefixes
+                    email = LEADING_SLASHES_PATTERN.sub('', email)  # Remove leading slashes
+                    email = LEADING_NON_ALNUM_PATTERN.sub('', email)  # Remove non-alphanumeric prefixes
                     
                     # Remove common suffixes that get captured
-                    email = re.sub(r'[^a-zA-Z0-9]*(Open|We|Contact|Information|Call|Phone|Visit|More).*$', '', email, flags=re.IGNORECASE)
+                    email = EMAIL_TRAILING_WORD_PATTERN.sub('', email)
                     
                     # Final cleanup - ensure email ends properly 
-                    email_match = re.match(r'^([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})', email)
+                    email_match = EMAIL_PREFIX_MATCH_PATTERN.match(email)
                     if email_match:
                         email = email_match.group(1)
                     
                     if email and self._is_valid_business_email(email):
-                        emails.add(email.lower())
+                        emails.setdefault(email.lower(), None)
                         print(f"    Found email from text: {email}")
             
             # 3. Email from contact forms and input elements
-            email_inputs = soup.find_all(['input', 'label'], attrs={'placeholder': re.compile(r'email', re.I)})
+            email_inputs = soup.find_all(['input', 'label'], attrs={'placeholder': EMAIL_PLACEHOLDER_PATTERN})
             for input_elem in email_inputs:
                 placeholder = input_elem.get('placeholder', '')
                 if '@' in placeholder and self._is_valid_business_email(placeholder):
-                    emails.add(placeholder.lower())
+                    emails.setdefault(placeholder.lower(), None)
                     print(f"    Found email from placeholder: {placeholder}")
             
             # 4. Email from data attributes and hidden fields
@@ -1837,16 +3946,16 @@ class LeadScraper:
             for elem in data_email_elements:
                 email = elem.get('data-email', '').strip()
                 if self._is_valid_business_email(email):
-                    emails.add(email.lower())
+                    emails.setdefault(email.lower(), None)
                     print(f"    Found email from data attribute: {email}")
             
             # 5. Email from specific HTML elements (spans, divs with email content)
-            for element in soup.find_all(['span', 'div', 'p'], string=re.compile(r'@')):
+            for element in soup.find_all(['span', 'div', 'p'], string=AT_SIGN_PATTERN):
                 text = element.get_text().strip()
-                matches = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b', text)
+                matches = ELEMENT_EMAIL_PATTERN.findall(text)
                 for match in matches:
                     if self._is_valid_business_email(match):
-                        emails.add(match.lower())
+                        emails.setdefault(match.lower(), None)
                         print(f"    Found email from element text: {match}")
                     
         except Exception as e:
@@ -1871,8 +3980,8 @@ class LeadScraper:
                 domain = domain[4:]
             
             # Check for contact forms as a signal of business activity
-            contact_forms = soup.find_all(['form'], {'class': re.compile(r'contact', re.I)})
-            contact_forms.extend(soup.find_all(['form'], {'id': re.compile(r'contact', re.I)}))
+            contact_forms = soup.find_all(['form'], {'class': CONTACT_FORM_PATTERN})
+            contact_forms.extend(soup.find_all(['form'], {'id': CONTACT_FORM_PATTERN}))
             
             if contact_forms and domain and '.' in domain:
                 # Common business email patterns
@@ -2101,15 +4210,9 @@ class LeadScraper:
                 return False
             
             # Exclude obvious test/invalid domains
-            invalid_domains = {
-                'example.com', 'test.com', 'localhost', 'domain.com',
-                'email.com', 'sample.com', 'demo.com', 'your-email.com',
-                'yourdomain.com', 'yoursite.com', 'website.com'
-            }
-            
-            if (domain in invalid_domains or domain.startswith('www.') or 
+            if (domain in INVALID_EMAIL_DOMAINS or domain.startswith('www.') or 
                 domain.endswith('.local') or 'noreply' in local.lower() or 
-                re.search(r'[<>()\[\]\\,;:\s@"\']', local)):
+                EMAIL_LOCAL_INVALID_PATTERN.search(local)):
                 return False
             
             # Quick domain validation
@@ -2118,7 +4221,7 @@ class LeadScraper:
                 return False
             
             tld = domain_parts[-1]
-            if not re.match(r'^[a-zA-Z]{2,6}$', tld):
+            if not EMAIL_TLD_PATTERN.match(tld):
                 return False
                 
             return True
@@ -2128,258 +4231,1024 @@ class LeadScraper:
     
     def _format_phone_number(self, phone_text):
         """Format phone number consistently"""
-        if not phone_text:
-            return ''
+        return format_phone_number(phone_text)
+
+# The scraper is built on first use, not at import - gunicorn recycles workers often (--max-requests)
+_scraper = None
+_scraper_lock = threading.Lock()
+
+def get_scraper():
+    """Get the shared LeadScraper, constructing it on first use"""
+    global _scraper
+    if _scraper is None:
+        with _scraper_lock:
+            if _scraper is None:
+                _scraper = LeadScraper()
+    return _scraper
+
+# Contact page parsing (BeautifulSoup, get_text, the email/social regex passes) is CPU-bound, so the
+# enrichment threads only fetch and hand raw bytes to a process pool. 0 parses inline on the fetching thread.
+PARSE_PROCESSES = int(os.environ.get('PARSE_PROCESSES', max(min((os.cpu_count() or 1) - 1, 4), 0)))
+PARSE_TIMEOUT = 20
+PARSE_TASKS_PER_PROCESS = 500  # Recycle parse processes like gunicorn recycles workers
+EMPTY_CONTACT_PAGE = {'emails': [], 'social': {}, 'fallback_email': '', 'phone': '', 'contact_link': '', 'same_origin_links': 0}
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def _parse_contact_page_worker(content, page_url, site_url, want_fallback):
+    """Parse-process entry point: raw bytes in, small result dict out"""
+    return get_scraper()._parse_contact_page(content, page_url, site_url, want_fallback)
+
+def get_parse_pool():
+    """Get the process pool for HTML parsing, starting it on first use (None when disabled)"""
+    global _parse_pool
+    if PARSE_PROCESSES <= 0:
+        return None
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                import multiprocessing
+                # Never fork a threaded worker - start parse processes from a clean forkserver
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    if __name__ != '__main__':
+                        context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                _parse_pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES, mp_context=context,
+                                                  max_tasks_per_child=PARSE_TASKS_PER_PROCESS)
+                print(f"🧮 Started {PARSE_PROCESSES} HTML parse processes")
+    return _parse_pool
+
+def _retire_parse_pool(pool):
+    """Start a fresh pool on next use and kill the old one's processes once its other parses have had PARSE_TIMEOUT
+    to finish (a running task can't be cancelled, so a stuck parse would otherwise shrink the pool for good)"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not pool:
+            return  # Another thread already retired it
+        _parse_pool = None
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False)
+
+    def reap():
+        time.sleep(PARSE_TIMEOUT)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+        print("♻️ Replaced the parse process pool after a parse timeout")
+
+    threading.Thread(target=reap, name='parse-pool-reaper', daemon=True).start()
+
+def parse_contact_page(content, page_url, site_url, want_fallback=True):
+    """Parse a fetched page in the process pool, or inline when the pool is disabled or broken"""
+    global _parse_pool
+    pool = get_parse_pool()
+    if pool is not None:
+        future = None
+        try:
+            future = pool.submit(_parse_contact_page_worker, content, page_url, site_url, want_fallback)
+            return future.result(timeout=PARSE_TIMEOUT)
+        except ConcurrentTimeoutError:
+            # A pathological page - skip it rather than parse it again on this thread
+            print(f"⏰ Parsing {page_url} took over {PARSE_TIMEOUT}s, skipping the page")
+            if not future.cancel():
+                _retire_parse_pool(pool)  # Still running - it would hold a parse process until it finishes, if ever
+            return dict(EMPTY_CONTACT_PAGE)
+        except BrokenProcessPool:
+            print("⚠️ Parse process pool broke - restarting it on next use")
+            with _parse_pool_lock:
+                if _parse_pool is pool:
+                    _parse_pool = None
+    return get_scraper()._parse_contact_page(content, page_url, site_url, want_fallback)
+
+def _reset_after_fork():
+    """Drop per-process resources inherited from a preloading master (sessions, pools, locks). The in-memory caches
+    stay, but every lock guarding them is re-created - one held by a master thread at fork would never be released."""
+    global _scraper, _scraper_lock, _parse_pool, _parse_pool_lock
+    global _search_scheduler_thread, _search_scheduler_lock, _search_scheduler_wake
+    global _business_registry_lock, _lead_indexes_lock, _lead_views_lock, _lead_name_indexes_lock
+    global _lead_stats_lock, _leads_changed, _lead_stats_waiters
+    _business_registry_lock = threading.RLock()
+    _lead_indexes_lock = threading.Lock()
+    _lead_views_lock = threading.Lock()
+    _lead_name_indexes_lock = threading.Lock()
+    _lead_stats_lock = threading.Lock()
+    _leads_changed = threading.Condition()
+    _lead_stats_waiters = 0  # Long-polls waiting in the master don't exist here
+    _scraper = None
+    _scraper_lock = threading.Lock()
+    _parse_pool = None
+    _parse_pool_lock = threading.Lock()
+    _search_scheduler_thread = None
+    _search_scheduler_lock = threading.Lock()
+    _search_scheduler_wake = threading.Event()
+
+# gunicorn --preload imports the app once in the master; each worker rebuilds its sockets and locks lazily
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+# Authentication routes
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        password = request.form.get('password', '').strip()
         
-        # Extract digits only
-        digits = re.sub(r'\D', '', phone_text)
-        
-        # Format as US phone number if 10 digits
-        if len(digits) == 10:
-            return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
-        elif len(digits) == 11 and digits[0] == '1':
-            return f"({digits[1:4]}) {digits[4:7]}-{digits[7:]}"
-        
-        return phone_text
-
-# Lead deduplication function
-def deduplicate_leads(current_leads, new_leads):
-    """Remove duplicate leads based on business name and phone/website"""
-    existing_signatures = set()
-    
-    # Create signatures for existing leads
-    for lead in current_leads:
-        name = lead.get('name', '').lower().strip()
-        phone = lead.get('phone', '').strip()
-        website = lead.get('website', '').strip()
-        
-        # Create a unique signature for each lead
-        if name:
-            signature = name
-            if phone:
-                signature += f"|{phone}"
-            elif website:
-                signature += f"|{website}"
-            existing_signatures.add(signature)
-    
-    # Filter out duplicates from new leads
-    unique_new_leads = []
-    for lead in new_leads:
-        name = lead.get('name', '').lower().strip()
-        phone = lead.get('phone', '').strip()
-        website = lead.get('website', '').strip()
-        
-        if name:
-            signature = name
-            if phone:
-                signature += f"|{phone}"
-            elif website:
-                signature += f"|{website}"
-                
-            if signature not in existing_signatures:
-                unique_new_leads.append(lead)
-                existing_signatures.add(signature)
+        if not username or not password:
+            flash('Please enter both username and password.', 'error')
+            return render_template('login.html')
+        
+        if verify_user(username, password):
+            session['username'] = username
+            # Update last login time
+            users = get_users_storage()
+            if username in users:
+                users[username]['last_login'] = datetime.now().isoformat()
+                session['users'] = users
+                session.modified = True
+            
+            flash('Welcome to AI Sales Machine!', 'success')
+            return redirect(url_for('dashboard'))
+        else:
+            flash('Invalid credentials. Please try again.', 'error')
     
-    print(f"Filtered {len(new_leads) - len(unique_new_leads)} duplicate leads")
-    return current_leads + unique_new_leads
+    return render_template('login.html')
+
+@app.route('/logout')
+def logout():
+    username = session.get('username', 'User')
+    session.pop('username', None)
+    flash(f'Goodbye {username}! You have been logged out.', 'info')
+    return redirect(url_for('login'))
+
+# Protected routes
+@app.route('/')
+@login_required
+@leads_etag
+def dashboard():
+    """Main dashboard with enhanced stats and segmentation"""
+    username = session['username']
+    version, stats = get_lead_stats(username)
+    total_leads = stats['total_leads']
+    print(f"Dashboard accessed by user: {username}, {total_leads} leads")
+    
+    # Time-based metrics (simulated for current session)
+    stats = dict(stats, today_leads=max(1, total_leads // 5), this_week_leads=total_leads)
+    
+    # Get recent leads sorted by creation time (latest first)
+    recent_leads = query_leads(username, sort='-created_at', limit=5)['leads']
+    
+    return render_page('dashboard.html', stats=stats, recent_leads=recent_leads, stats_version=version)
+
+def crawl_leads(leads, timeout=20):
+    """Re-crawl leads' websites with conditional GETs: {position in leads: (contact info, or None when the site is
+    unchanged, validators, crawled_at)} for every crawl that finished within timeout"""
+    results = {}
+    if not leads:
+        return results
+    scraper = get_scraper()
+    limiter = scraper.enrichment_limiter
+    executor = ThreadPoolExecutor(max_workers=min(limiter.max_limit, len(leads)))
+    try:
+        future_to_position = {executor.submit(scraper.refresh_contact_info, lead['website'], lead.get('crawl_validators')): position
+                              for position, lead in enumerate(leads)}
+        for future in as_completed(future_to_position, timeout=timeout):
+            position = future_to_position[future]
+            try:
+                info, validators = future.result()
+                results[position] = (info, validators, datetime.now().isoformat())
+            except Exception as e:
+                print(f"Error enhancing {leads[position].get('name')}: {e}")
+    except ConcurrentTimeoutError:
+        print(f"⏰ Re-crawl timed out after {timeout}s, keeping {len(results)} finished leads")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def apply_crawl_result(lead, result, counts):
+    """Fold one crawl_leads result into a lead, counting it as processed and improved (new email), updated or unchanged"""
+    info, validators, crawled_at = result
+    counts['processed'] += 1
+    if info is None:
+        # 304 Not Modified: nothing was downloaded or parsed, the fields we hold are still current
+        confirm_contact_info(lead, crawled_at)
+        counts['unchanged'] += 1
+        return
+    had_email = bool(lead.get('email'))
+    changed = apply_contact_info(lead, info, crawled_at, overwrite=True)
+    if validators:
+        lead['crawl_validators'] = validators
+    else:
+        lead.pop('crawl_validators', None)
+    if changed:
+        counts['updated'] += 1
+    if 'email' in changed and not had_email:
+        counts['improved'] += 1
+        print(f"✅ Enhanced {lead.get('name')} with email: {lead['email']}")
+
+def recrawl_leads(leads, timeout=20):
+    """Re-crawl leads' websites and update them in place; returns counts of processed, improved, updated and unchanged"""
+    counts = {'processed': 0, 'improved': 0, 'updated': 0, 'unchanged': 0}
+    for position, result in crawl_leads(leads, timeout).items():
+        apply_crawl_result(leads[position], result, counts)
+    return counts
+
+@app.route('/enhance-existing-leads', methods=['POST'])
+@login_required  
+def enhance_existing_leads():
+    """Re-crawl the stalest, highest-priority existing leads, skipping sites that haven't changed"""
+    try:
+        username = session['username']
+        leads_storage = load_user_leads(username)
+        
+        if len(leads_storage) == 0:
+            return {'success': False, 'message': 'No leads to process'}
+        
+        # Limit to one batch per request to prevent timeout
+        leads_to_process, eligible = plan_recrawl(leads_storage)
+        
+        if not leads_to_process:
+            return {'success': False, 'message': f'Every lead with a website was checked within the last {RECRAWL_MIN_AGE_DAYS} days'}
+        
+        print(f"Re-crawling {len(leads_to_process)} of {eligible} stale leads...")
+        results = crawl_leads(leads_to_process)
+        
+        # Fold the results into the leads as they are now, under the store lock - the crawl ran without it, and
+        # anything saved meanwhile (new leads, deletes, other edits) must survive
+        counts = {'processed': 0, 'improved': 0, 'updated': 0, 'unchanged': 0}
+        by_id = {(leads_to_process[position].get('id') or lead_id(leads_to_process[position])): result
+                 for position, result in results.items()}
+        if by_id:
+            update_user_leads(username, by_id, lambda lead: apply_crawl_result(lead, by_id[lead.get('id') or lead_id(lead)], counts))
+        
+        return {
+            'success': True, 
+            **counts,
+            'remaining': max(0, eligible - counts['processed'])
+        }
+        
+    except Exception as e:
+        print(f"Enhancement error: {e}")
+        return {'success': False, 'message': str(e)}
+
+# Search query cache - discovered businesses per normalized (business_type, location), shared by all users and workers
+QUERY_CACHE_FILE = os.path.join(USER_DATA_DIR, 'query_cache.db')
+QUERY_CACHE_TTL = int(os.environ.get('QUERY_CACHE_TTL', 6 * 3600))  # Served as-is while younger than this
+QUERY_CACHE_MAX_AGE = int(os.environ.get('QUERY_CACHE_MAX_AGE', 7 * 24 * 3600))  # Served stale (and refreshed) until this
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', 2000))
+QUERY_CACHE_REFRESH_TIMEOUT = 300  # A refresh claim older than this is assumed dead and can be retaken
+
+def normalize_query_terms(text):
+    """Case, punctuation and spacing-insensitive form of a search term ("Boston, MA" -> "boston ma")"""
+    return ' '.join(SEARCH_TOKEN_PATTERN.findall(str(text or '').lower()))
+
+def _open_query_cache():
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+    connection = sqlite3.connect(QUERY_CACHE_FILE, timeout=10)
+    connection.execute("CREATE TABLE IF NOT EXISTS query_cache (business_type TEXT, location TEXT, "
+                       "num_results INTEGER, results TEXT, created_at REAL, accessed_at REAL, refreshing_at REAL, "
+                       "PRIMARY KEY (business_type, location))")
+    connection.execute("CREATE INDEX IF NOT EXISTS query_cache_accessed ON query_cache (accessed_at)")
+    return connection
+
+def get_cached_search(business_type, location, num_results):
+    """Cached results for a search as {'leads', 'num_results', 'created_at', 'stale'}, or None on a miss, a smaller or an expired entry"""
+    key = (normalize_query_terms(business_type), normalize_query_terms(location))
+    try:
+        connection = _open_query_cache()
+        try:
+            row = connection.execute("SELECT num_results, results, created_at FROM query_cache "
+                                     "WHERE business_type = ? AND location = ?", key).fetchone()
+            now = time.time()
+            if not row or row[0] < num_results or now - row[2] > QUERY_CACHE_MAX_AGE:
+                return None
+            with connection:
+                connection.execute("UPDATE query_cache SET accessed_at = ? WHERE business_type = ? AND location = ?",
+                                   (now,) + key)
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Query cache read failed: {e}")
+        return None
+    return {'leads': json.loads(row[1])[:num_results], 'num_results': row[0], 'created_at': row[2],
+            'stale': now - row[2] > QUERY_CACHE_TTL}
+
+def cache_search_results(business_type, location, num_results, leads):
+    """Store a search's results, evicting the least recently used entries beyond QUERY_CACHE_MAX_ENTRIES"""
+    if not leads or any(lead.get('source') == 'demo_data' for lead in leads):
+        return  # Never cache a failed search - the next request should try the sources again
+    key = (normalize_query_terms(business_type), normalize_query_terms(location))
+    now = time.time()
+    try:
+        connection = _open_query_cache()
+        try:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                                   key + (num_results, json.dumps(leads), now, now))
+                connection.execute("DELETE FROM query_cache WHERE rowid IN (SELECT rowid FROM query_cache "
+                                   "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (QUERY_CACHE_MAX_ENTRIES,))
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Query cache write failed: {e}")
+
+def _claim_search_refresh(business_type, location):
+    """Mark a cache entry as being refreshed; False if another thread or worker already is"""
+    key = (normalize_query_terms(business_type), normalize_query_terms(location))
+    now = time.time()
+    try:
+        connection = _open_query_cache()
+        try:
+            with connection:
+                cursor = connection.execute(
+                    "UPDATE query_cache SET refreshing_at = ? WHERE business_type = ? AND location = ? "
+                    "AND (refreshing_at IS NULL OR refreshing_at < ?)", (now,) + key + (now - QUERY_CACHE_REFRESH_TIMEOUT,))
+                return cursor.rowcount == 1
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Query cache refresh claim failed: {e}")
+        return False
+
+def run_cached_search(business_type, location, num_results):
+    """Search the listing sources and cache the results"""
+    leads = get_scraper().search_business_listings(business_type, location, num_results)
+    cache_search_results(business_type, location, num_results, leads)
+    return leads
+
+def refresh_search_in_background(business_type, location, num_results):
+    """Re-run a stale cached search on a daemon thread (stale-while-revalidate); one refresh per entry at a time"""
+    if not _claim_search_refresh(business_type, location):
+        return False
+
+    def refresh():
+        try:
+            leads = run_cached_search(business_type, location, num_results)
+            print(f"🔄 Refreshed cached search {business_type!r} in {location!r}: {len(leads)} businesses")
+        except Exception as e:
+            print(f"❌ Background search refresh failed: {e}")
+
+    threading.Thread(target=refresh, name='search-refresh', daemon=True).start()
+    return True
+
+def find_businesses(business_type, location, num_results, refresh=False):
+    """(leads, cached entry or None) for a search - from the query cache when possible, stale entries refreshed behind"""
+    cached = None if refresh else get_cached_search(business_type, location, num_results)
+    if not cached:
+        return run_cached_search(business_type, location, num_results), None
+    added_at = datetime.now().isoformat()
+    for lead in cached['leads']:
+        lead['created_at'] = added_at
+    if cached['stale']:
+        refresh_search_in_background(business_type, location, cached['num_results'])
+    return cached['leads'], cached
+
+# Batch searches - business types x locations run as one background job; progress lives in user_data/jobs.db so
+# any worker can report it
+JOBS_FILE = os.path.join(USER_DATA_DIR, 'jobs.db')
+BATCH_SEARCH_MAX_TASKS = 100
+BATCH_SEARCH_CONCURRENCY = int(os.environ.get('BATCH_SEARCH_CONCURRENCY', 3))
+BATCH_JOB_STALE_AFTER = 600  # A running job with no progress for this long lost its worker
+BATCH_JOB_HISTORY = 20
+
+def _open_jobs_db():
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+    connection = sqlite3.connect(JOBS_FILE, timeout=10)
+    connection.execute("CREATE TABLE IF NOT EXISTS batch_jobs (job_id TEXT PRIMARY KEY, username TEXT, status TEXT, "
+                       "spec TEXT, progress TEXT, cancel_requested INTEGER DEFAULT 0, created_at REAL, updated_at REAL)")
+    connection.execute("CREATE INDEX IF NOT EXISTS batch_jobs_user ON batch_jobs (username, created_at)")
+    return connection
+
+def parse_batch_terms(value):
+    """A list of search terms from a JSON list or newline-separated text (locations keep their commas)"""
+    items = value if isinstance(value, list) else str(value or '').splitlines()
+    terms, seen = [], set()
+    for item in items:
+        term = ' '.join(str(item).split())
+        key = normalize_query_terms(term)
+        if key and key not in seen:
+            terms.append(term)
+            seen.add(key)
+    return terms
+
+def _job_row_to_dict(row):
+    job_id, status, spec, progress, cancel_requested, created_at, updated_at = row
+    if status in ('queued', 'running') and time.time() - updated_at > BATCH_JOB_STALE_AFTER:
+        status = 'interrupted'
+    job = dict(json.loads(spec), **json.loads(progress))
+    job.update(id=job_id, status=status, cancel_requested=bool(cancel_requested),
+               created_at=datetime.fromtimestamp(created_at).isoformat(),
+               updated_at=datetime.fromtimestamp(updated_at).isoformat())
+    return job
+
+def get_batch_job(username, job_id):
+    connection = _open_jobs_db()
+    try:
+        row = connection.execute("SELECT job_id, status, spec, progress, cancel_requested, created_at, updated_at "
+                                 "FROM batch_jobs WHERE username = ? AND job_id = ?", (username, job_id)).fetchone()
+    finally:
+        connection.close()
+    return _job_row_to_dict(row) if row else None
+
+def list_batch_jobs(username, limit=BATCH_JOB_HISTORY):
+    connection = _open_jobs_db()
+    try:
+        rows = connection.execute("SELECT job_id, status, spec, progress, cancel_requested, created_at, updated_at "
+                                  "FROM batch_jobs WHERE username = ? ORDER BY created_at DESC LIMIT ?",
+                                  (username, limit)).fetchall()
+    finally:
+        connection.close()
+    return [_job_row_to_dict(row) for row in rows]
+
+def _save_batch_progress(job_id, status, progress):
+    connection = _open_jobs_db()
+    try:
+        with connection:
+            connection.execute("UPDATE batch_jobs SET status = ?, progress = ?, updated_at = ? WHERE job_id = ?",
+                               (status, json.dumps(progress), time.time(), job_id))
+    finally:
+        connection.close()
+
+def _batch_cancel_requested(job_id):
+    connection = _open_jobs_db()
+    try:
+        row = connection.execute("SELECT cancel_requested FROM batch_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    finally:
+        connection.close()
+    return bool(row and row[0])
+
+def cancel_batch_job(username, job_id):
+    """Ask a batch job to stop; sub-searches already running finish and keep their leads"""
+    connection = _open_jobs_db()
+    try:
+        with connection:
+            cursor = connection.execute("UPDATE batch_jobs SET cancel_requested = 1 WHERE username = ? AND job_id = ? "
+                                        "AND status IN ('queued', 'running')", (username, job_id))
+    finally:
+        connection.close()
+    return cursor.rowcount == 1
+
+def _run_batch_task(job_id, username, task, num_results):
+    """One sub-search of a batch: shared query cache, then an incremental, deduplicated write to the lead store"""
+    if _batch_cancel_requested(job_id):
+        return dict(task, status='cancelled')
+    try:
+        leads, cached = find_businesses(task['business_type'], task['location'], num_results)
+        stored = store_new_leads(username, leads) if leads else []
+        return dict(task, status='done', found=len(leads), new=len(stored), cached=bool(cached))
+    except Exception as e:
+        print(f"❌ Batch search {task['business_type']!r} in {task['location']!r} failed: {e}")
+        return dict(task, status='failed', error=str(e))
+
+def run_batch_search(job_id, username, tasks, num_results):
+    """Run a batch's sub-searches a few at a time, recording progress after each one"""
+    progress = {'completed': 0, 'failed': 0, 'cancelled': 0, 'found': 0, 'new_leads': 0, 'duplicates': 0,
+                'from_cache': 0, 'tasks': [dict(task, status='queued') for task in tasks]}
+    _save_batch_progress(job_id, 'running', progress)
+    started = time.time()
+    try:
+        # Sub-searches share the scraper, so the per-host rate limits and the enrichment limiter pace the whole batch
+        with ThreadPoolExecutor(max_workers=min(BATCH_SEARCH_CONCURRENCY, len(tasks)), thread_name_prefix='batch') as executor:
+            futures = {executor.submit(_run_batch_task, job_id, username, task, num_results): i
+                       for i, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                result = future.result()
+                progress['tasks'][futures[future]] = result
+                progress[{'done': 'completed', 'failed': 'failed', 'cancelled': 'cancelled'}[result['status']]] += 1
+                if result['status'] == 'done':
+                    progress['found'] += result['found']
+                    progress['new_leads'] += result['new']
+                    progress['duplicates'] += result['found'] - result['new']
+                    progress['from_cache'] += int(result['cached'])
+                _save_batch_progress(job_id, 'running', progress)
+        status = 'cancelled' if progress['cancelled'] else 'done'
+    except Exception as e:
+        print(f"❌ Batch search {job_id} failed: {e}")
+        progress['error'] = str(e)
+        status = 'failed'
+    progress['elapsed_seconds'] = round(time.time() - started, 1)
+    _save_batch_progress(job_id, status, progress)
+    print(f"📦 Batch search {job_id} {status}: {progress['new_leads']} new leads from {len(tasks)} searches")
+
+def start_batch_search(username, business_types, locations, num_results):
+    """Queue a batch job for every business type x location pair and start it on a background thread"""
+    tasks = [{'business_type': business_type, 'location': location}
+             for business_type in business_types for location in locations]
+    if not tasks:
+        raise ValueError('Enter at least one business type and one location')
+    if len(tasks) > BATCH_SEARCH_MAX_TASKS:
+        raise ValueError(f'A batch can run at most {BATCH_SEARCH_MAX_TASKS} searches ({len(tasks)} requested)')
+
+    job_id = hashlib.sha1(os.urandom(8)).hexdigest()[:12]
+    spec = {'business_types': business_types, 'locations': locations, 'num_results': num_results, 'total': len(tasks)}
+    now = time.time()
+    connection = _open_jobs_db()
+    try:
+        with connection:
+            connection.execute("INSERT INTO batch_jobs (job_id, username, status, spec, progress, created_at, updated_at) "
+                               "VALUES (?, ?, 'queued', ?, '{}', ?, ?)", (job_id, username, json.dumps(spec), now, now))
+    finally:
+        connection.close()
+    threading.Thread(target=run_batch_search, args=(job_id, username, tasks, num_results),
+                     name=f'batch-{job_id}', daemon=True).start()
+    return job_id
+
+# Saved searches - re-run on a schedule by a scheduler thread in each worker; a run claims its search in
+# jobs.db first with a lease its worker renews, so one worker runs it, and listings already in the user's lead index
+# are dropped before enrichment. The next run is scheduled only when a run finishes, so a run whose worker died
+# (its lease lapsed) is marked interrupted and the search is picked up again on the next poll.
+SAVED_SEARCH_DEFAULT_INTERVAL_HOURS = 168
+SAVED_SEARCH_MIN_INTERVAL_HOURS = 1
+SAVED_SEARCH_RUN_HISTORY = 20
+SEARCH_SCHEDULER_ENABLED = os.environ.get('SEARCH_SCHEDULER', '1') != '0'
+SEARCH_SCHEDULER_POLL_SECONDS = 60
+SAVED_SEARCH_RUN_LEASE_SECONDS = 120  # Renewed every quarter lease while the run is alive
+SAVED_SEARCH_COLUMNS = "search_id, business_type, location, num_results, interval_hours, next_run_at, last_run_at, created_at"
+SEARCH_RUN_COLUMNS = "run_id, status, started_at, finished_at, candidates, known, new_leads, error, lease_until"
+
+_search_scheduler_thread = None
+_search_scheduler_lock = threading.Lock()
+_search_scheduler_wake = threading.Event()
+
+def _open_saved_searches_db():
+    connection = _open_jobs_db()
+    connection.execute("CREATE TABLE IF NOT EXISTS saved_searches (search_id TEXT PRIMARY KEY, username TEXT, "
+                       "business_type TEXT, location TEXT, num_results INTEGER, interval_hours REAL, "
+                       "next_run_at REAL, last_run_at REAL, created_at REAL)")
+    connection.execute("CREATE TABLE IF NOT EXISTS search_runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                       "search_id TEXT, status TEXT, started_at REAL, finished_at REAL, candidates INTEGER, "
+                       "known INTEGER, new_leads INTEGER, error TEXT, owner TEXT, lease_until REAL DEFAULT 0)")
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(search_runs)")}
+    for column, kind in (('owner', 'TEXT'), ('lease_until', 'REAL DEFAULT 0')):
+        if column not in columns:  # Tables created before runs held a lease
+            connection.execute(f"ALTER TABLE search_runs ADD COLUMN {column} {kind}")
+    connection.execute("CREATE INDEX IF NOT EXISTS search_runs_search ON search_runs (search_id, run_id)")
+    return connection
+
+def _saved_search_to_dict(row, last_run=None):
+    search_id, business_type, location, num_results, interval_hours, next_run_at, last_run_at, created_at = row
+    return {
+        'id': search_id, 'business_type': business_type, 'location': location, 'num_results': num_results,
+        'interval_hours': interval_hours, 'next_run_at': datetime.fromtimestamp(next_run_at).isoformat(),
+        'last_run_at': datetime.fromtimestamp(last_run_at).isoformat() if last_run_at else None,
+        'created_at': datetime.fromtimestamp(created_at).isoformat(), 'last_run': last_run
+    }
+
+def _search_run_to_dict(row):
+    run_id, status, started_at, finished_at, candidates, known, new_leads, error, lease_until = row
+    if status == 'running' and (lease_until or 0) < time.time():
+        status = 'interrupted'  # Its worker died; the search is still due, so a scheduler runs it again
+    return {
+        'id': run_id, 'status': status, 'started_at': datetime.fromtimestamp(started_at).isoformat(),
+        'seconds': round(finished_at - started_at, 1) if finished_at else None,
+        'candidates': candidates, 'known': known, 'new_leads': new_leads, 'error': error
+    }
+
+def list_saved_searches(username):
+    """A user's saved searches, each with its latest run"""
+    connection = _open_saved_searches_db()
+    try:
+        searches = []
+        for row in connection.execute(f"SELECT {SAVED_SEARCH_COLUMNS} FROM saved_searches WHERE username = ? "
+                                      "ORDER BY created_at", (username,)).fetchall():
+            last_run = connection.execute(f"SELECT {SEARCH_RUN_COLUMNS} FROM search_runs WHERE search_id = ? "
+                                          "ORDER BY run_id DESC LIMIT 1", (row[0],)).fetchone()
+            searches.append(_saved_search_to_dict(row, _search_run_to_dict(last_run) if last_run else None))
+        return searches
+    finally:
+        connection.close()
+
+def list_search_runs(username, search_id, limit=SAVED_SEARCH_RUN_HISTORY):
+    """Recent runs of one saved search, newest first, or None if the user has no such search"""
+    connection = _open_saved_searches_db()
+    try:
+        if not connection.execute("SELECT 1 FROM saved_searches WHERE username = ? AND search_id = ?",
+                                  (username, search_id)).fetchone():
+            return None
+        rows = connection.execute(f"SELECT {SEARCH_RUN_COLUMNS} FROM search_runs WHERE search_id = ? "
+                                  "ORDER BY run_id DESC LIMIT ?", (search_id, limit)).fetchall()
+        return [_search_run_to_dict(row) for row in rows]
+    finally:
+        connection.close()
+
+def create_saved_search(username, business_type, location, num_results, interval_hours):
+    """Save a search to re-run every interval_hours; the first run is due right away"""
+    if not normalize_query_terms(business_type) or not normalize_query_terms(location):
+        raise ValueError('Enter both business type and location')
+    if interval_hours < SAVED_SEARCH_MIN_INTERVAL_HOURS:
+        raise ValueError(f'Searches can repeat at most every {SAVED_SEARCH_MIN_INTERVAL_HOURS} hour(s)')
+    search_id = hashlib.sha1(os.urandom(8)).hexdigest()[:12]
+    now = time.time()
+    connection = _open_saved_searches_db()
+    try:
+        with connection:
+            connection.execute(f"INSERT INTO saved_searches ({SAVED_SEARCH_COLUMNS}, username) VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?)",
+                               (search_id, business_type, location, num_results, interval_hours, now, now, username))
+    finally:
+        connection.close()
+    _search_scheduler_wake.set()
+    return search_id
+
+def delete_saved_search(username, search_id):
+    connection = _open_saved_searches_db()
+    try:
+        with connection:
+            cursor = connection.execute("DELETE FROM saved_searches WHERE username = ? AND search_id = ?", (username, search_id))
+            if cursor.rowcount:
+                connection.execute("DELETE FROM search_runs WHERE search_id = ?", (search_id,))
+    finally:
+        connection.close()
+    return cursor.rowcount == 1
+
+def run_saved_search_now(username, search_id):
+    """Make a saved search due immediately and wake this worker's scheduler"""
+    connection = _open_saved_searches_db()
+    try:
+        with connection:
+            cursor = connection.execute("UPDATE saved_searches SET next_run_at = ? WHERE username = ? AND search_id = ?",
+                                        (time.time(), username, search_id))
+    finally:
+        connection.close()
+    _search_scheduler_wake.set()
+    return cursor.rowcount == 1
+
+def _claim_due_searches():
+    """Saved searches that are due and have no live run, each claimed by starting a leased run - a search another
+    worker claimed first is skipped, and a run whose lease lapsed is marked interrupted"""
+    now = time.time()
+    owner = f"{os.getpid()}-{hashlib.sha1(os.urandom(8)).hexdigest()[:8]}"
+    connection = _open_saved_searches_db()
+    try:
+        claimed = []
+        due = connection.execute("SELECT search_id, username, business_type, location, num_results, interval_hours, "
+                                 "next_run_at FROM saved_searches WHERE next_run_at <= ? ORDER BY next_run_at",
+                                 (now,)).fetchall()
+        for search_id, username, business_type, location, num_results, interval_hours, next_run_at in due:
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                if connection.execute("SELECT 1 FROM search_runs WHERE search_id = ? AND status = 'running' "
+                                      "AND lease_until >= ?", (search_id, now)).fetchone():
+                    continue
+                connection.execute("UPDATE search_runs SET status = 'interrupted', owner = NULL, finished_at = ? "
+                                   "WHERE search_id = ? AND status = 'running'", (now, search_id))
+                run_id = connection.execute("INSERT INTO search_runs (search_id, status, started_at, owner, lease_until) "
+                                            "VALUES (?, 'running', ?, ?, ?)",
+                                            (search_id, now, owner, now + SAVED_SEARCH_RUN_LEASE_SECONDS)).lastrowid
+            claimed.append((run_id, owner, next_run_at, interval_hours, search_id, username, business_type, location, num_results))
+        return claimed
+    finally:
+        connection.close()
+
+def _renew_search_run_lease(run_id, owner, stop):
+    """Heartbeat for a saved-search run: extend its lease until the run finishes"""
+    while not stop.wait(SAVED_SEARCH_RUN_LEASE_SECONDS / 4):
+        try:
+            connection = _open_saved_searches_db()
+            try:
+                with connection:
+                    connection.execute("UPDATE search_runs SET lease_until = ? WHERE run_id = ? AND owner = ?",
+                                       (time.time() + SAVED_SEARCH_RUN_LEASE_SECONDS, run_id, owner))
+            finally:
+                connection.close()
+        except Exception as e:
+            print(f"⚠️ Could not renew saved search run {run_id}: {e}")
+
+def run_saved_search(run_id, owner, next_run_at, interval_hours, search_id, username, business_type, location, num_results):
+    """One claimed run: discover listings, drop the ones already in the lead index, enrich and store the rest,
+    then schedule the next run"""
+    started = time.time()
+    stop_heartbeat = threading.Event()
+    threading.Thread(target=_renew_search_run_lease, args=(run_id, owner, stop_heartbeat),
+                     name=f'search-lease-{run_id}', daemon=True).start()
+
+    counts = {'candidates': 0, 'known': 0}
+    status, error, stored = 'done', None, []
+    try:
+        keys_map = get_lead_index(username)['keys']
+
+        def exclude_known(lead):
+            counts['candidates'] += 1
+            if is_known_lead(keys_map, lead):
+                counts['known'] += 1
+                return True
+            return False
+
+        # Runs go straight to the sources: the query cache holds full result lists, not one user's new businesses
+        leads = get_scraper().search_business_listings(business_type, location, num_results, exclude=exclude_known)
+        if any(lead.get('source') == 'demo_data' for lead in leads):
+            status, error = 'failed', 'No listings found - every source failed'
+        elif leads:
+            stored = store_new_leads(username, leads)
+    except Exception as e:
+        status, error = 'failed', str(e)
+        print(f"❌ Saved search {business_type!r} in {location!r} failed: {e}")
+    finally:
+        stop_heartbeat.set()
+
+    connection = _open_saved_searches_db()
+    try:
+        with connection:
+            cursor = connection.execute("UPDATE search_runs SET status = ?, finished_at = ?, candidates = ?, known = ?, "
+                                        "new_leads = ?, error = ?, owner = NULL, lease_until = 0 WHERE run_id = ? AND owner = ?",
+                                        (status, time.time(), counts['candidates'], counts['known'], len(stored), error,
+                                         run_id, owner))
+            if cursor.rowcount == 1:
+                # Unless "run now" moved it meanwhile, the next run is due an interval after this one started
+                connection.execute("UPDATE saved_searches SET next_run_at = ? WHERE search_id = ? AND next_run_at = ?",
+                                   (started + interval_hours * 3600, search_id, next_run_at))
+                connection.execute("UPDATE saved_searches SET last_run_at = ? WHERE search_id = ?", (started, search_id))
+            connection.execute("DELETE FROM search_runs WHERE search_id = ? AND run_id NOT IN (SELECT run_id FROM "
+                               "search_runs WHERE search_id = ? ORDER BY run_id DESC LIMIT ?)",
+                               (search_id, search_id, SAVED_SEARCH_RUN_HISTORY))
+    finally:
+        connection.close()
+    print(f"🗓️ Saved search {business_type!r} in {location!r}: {counts['candidates']} listings, "
+          f"{counts['known']} already known, {len(stored)} new")
+
+def _search_scheduler_loop():
+    while True:
+        try:
+            if SEARCH_SCHEDULER_ENABLED:
+                for search in _claim_due_searches():
+                    run_saved_search(*search)
+            for run_id, owner in _claim_orphaned_enrichment_runs():
+                print(f"🔁 Resuming enrichment run {run_id} left by another worker")
+                _launch_enrichment_run(run_id, owner)
+        except Exception as e:
+            print(f"❌ Search scheduler error: {e}")
+        _search_scheduler_wake.wait(SEARCH_SCHEDULER_POLL_SECONDS)
+        _search_scheduler_wake.clear()
+
+def start_search_scheduler():
+    """Start this worker's scheduler thread once (threads don't survive fork, so it starts on first request). It always
+    resumes orphaned enrichment runs; SEARCH_SCHEDULER=0 only stops it running saved searches."""
+    global _search_scheduler_thread
+    if _search_scheduler_thread is not None:
+        return
+    with _search_scheduler_lock:
+        if _search_scheduler_thread is None:
+            _search_scheduler_thread = threading.Thread(target=_search_scheduler_loop, name='search-scheduler', daemon=True)
+            _search_scheduler_thread.start()
+
+@app.before_request
+def _ensure_search_scheduler():
+    start_search_scheduler()
+
+# Bulk enrichment runs - re-crawl every stale lead of a user in priority order. The plan is fixed when the run
+# starts (user_data/jobs.db), the cursor and counts are checkpointed after each batch, and the worker running it
+# holds a lease it renews per batch; a run whose lease lapses (its worker died) is picked up by any scheduler
+ENRICHMENT_RUN_BATCH_SIZE = int(os.environ.get('ENRICHMENT_RUN_BATCH_SIZE', RECRAWL_BATCH_SIZE))
+ENRICHMENT_BATCH_TIMEOUT = 60
+ENRICHMENT_RUN_LEASE_SECONDS = 300  # Longer than a batch can take (crawl timeout plus the store write)
+ENRICHMENT_RUN_HISTORY = 10
+ENRICHMENT_RUN_COLUMNS = "run_id, status, total, cursor, progress, pause_requested, lease_until, created_at, updated_at, finished_at"
+
+def _open_enrichment_db():
+    connection = _open_jobs_db()
+    connection.execute("CREATE TABLE IF NOT EXISTS enrichment_runs (run_id TEXT PRIMARY KEY, username TEXT, status TEXT, "
+                       "total INTEGER, cursor INTEGER DEFAULT 0, progress TEXT, pause_requested INTEGER DEFAULT 0, "
+                       "owner TEXT, lease_until REAL DEFAULT 0, created_at REAL, updated_at REAL, finished_at REAL)")
+    connection.execute("CREATE INDEX IF NOT EXISTS enrichment_runs_user ON enrichment_runs (username, created_at)")
+    connection.execute("CREATE TABLE IF NOT EXISTS enrichment_plan (run_id TEXT, position INTEGER, lead_id TEXT, "
+                       "name TEXT, website TEXT, validators TEXT, PRIMARY KEY (run_id, position))")
+    return connection
+
+def _enrichment_run_to_dict(row):
+    run_id, status, total, cursor, progress, pause_requested, lease_until, created_at, updated_at, finished_at = row
+    if status == 'running' and lease_until < time.time():
+        status = 'interrupted'  # Its worker died; a scheduler resumes it from the cursor
+    run = {'processed': 0, 'improved': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'missing': 0,
+           'batches': 0, 'active_seconds': 0.0, **json.loads(progress or '{}')}
+    # Throughput over time spent crawling, so pauses and restarts don't drag it down
+    rate = run['processed'] / run['active_seconds'] * 60 if run['active_seconds'] else 0
+    run.update(id=run_id, status=status, total=total, cursor=cursor, remaining=total - cursor,
+               pause_requested=bool(pause_requested), leads_per_minute=round(rate, 1),
+               eta_minutes=round((total - cursor) / rate, 1) if rate and status in ('running', 'interrupted') else None,
+               created_at=datetime.fromtimestamp(created_at).isoformat(),
+               updated_at=datetime.fromtimestamp(updated_at).isoformat(),
+               finished_at=datetime.fromtimestamp(finished_at).isoformat() if finished_at else None)
+    return run
+
+def get_enrichment_run(username, run_id=None):
+    """One of a user's enrichment runs, or their latest if run_id is None"""
+    connection = _open_enrichment_db()
+    try:
+        if run_id is None:
+            row = connection.execute(f"SELECT {ENRICHMENT_RUN_COLUMNS} FROM enrichment_runs WHERE username = ? "
+                                     "ORDER BY created_at DESC LIMIT 1", (username,)).fetchone()
+        else:
+            row = connection.execute(f"SELECT {ENRICHMENT_RUN_COLUMNS} FROM enrichment_runs WHERE username = ? "
+                                     "AND run_id = ?", (username, run_id)).fetchone()
+    finally:
+        connection.close()
+    return _enrichment_run_to_dict(row) if row else None
+
+def list_enrichment_runs(username, limit=ENRICHMENT_RUN_HISTORY):
+    connection = _open_enrichment_db()
+    try:
+        rows = connection.execute(f"SELECT {ENRICHMENT_RUN_COLUMNS} FROM enrichment_runs WHERE username = ? "
+                                  "ORDER BY created_at DESC LIMIT ?", (username, limit)).fetchall()
+    finally:
+        connection.close()
+    return [_enrichment_run_to_dict(row) for row in rows]
+
+def _enrichment_run_owner():
+    return f"{os.getpid()}-{hashlib.sha1(os.urandom(8)).hexdigest()[:8]}"
+
+def _claim_enrichment_run(connection, run_id):
+    """Take the lease on a running run nobody holds; returns the owner token, or None if another worker has it"""
+    owner = _enrichment_run_owner()
+    now = time.time()
+    with connection:
+        cursor = connection.execute("UPDATE enrichment_runs SET owner = ?, lease_until = ?, updated_at = ? "
+                                    "WHERE run_id = ? AND status = 'running' AND lease_until < ?",
+                                    (owner, now + ENRICHMENT_RUN_LEASE_SECONDS, now, run_id, now))
+    return owner if cursor.rowcount == 1 else None
+
+def _launch_enrichment_run(run_id, owner):
+    threading.Thread(target=run_enrichment, args=(run_id, owner), name=f'enrich-{run_id}', daemon=True).start()
 
-# Initialize the scraper
-scraper = LeadScraper()
+def start_enrichment_run(username):
+    """Plan a run over every stale lead (stalest, highest-priority first) and start it on a background thread.
+    A paused run is replaced by the new one and an interrupted one (its worker died) is resumed in this worker instead;
+    raises ValueError if a run is in progress or nothing needs a re-crawl."""
+    connection = _open_enrichment_db()
+    try:
+        interrupted = connection.execute("SELECT run_id FROM enrichment_runs WHERE username = ? AND status = 'running' "
+                                         "AND pause_requested = 0 AND lease_until < ?", (username, time.time())).fetchone()
+        owner = _claim_enrichment_run(connection, interrupted[0]) if interrupted else None
+    finally:
+        connection.close()
+    if owner:
+        print(f"🔁 Resuming interrupted enrichment run {interrupted[0]} for {username}")
+        _launch_enrichment_run(interrupted[0], owner)
+        return interrupted[0]
 
-# Authentication routes
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        username = request.form.get('username', '').strip()
-        password = request.form.get('password', '').strip()
-        
-        if not username or not password:
-            flash('Please enter both username and password.', 'error')
-            return render_template('login.html')
-        
-        if verify_user(username, password):
-            session['username'] = username
-            # Update last login time
-            users = get_users_storage()
-            if username in users:
-                users[username]['last_login'] = datetime.now().isoformat()
-                session['users'] = users
-                session.modified = True
-            
-            flash('Welcome to AI Sales Machine!', 'success')
-            return redirect(url_for('dashboard'))
-        else:
-            flash('Invalid credentials. Please try again.', 'error')
-    
-    return render_template('login.html')
+    leads = load_user_leads(username)
+    plan, eligible = plan_recrawl(leads, limit=len(leads))
+    if not plan:
+        raise ValueError(f'Every lead with a website was checked within the last {RECRAWL_MIN_AGE_DAYS} days')
 
-@app.route('/logout')
-def logout():
-    username = session.get('username', 'User')
-    session.pop('username', None)
-    flash(f'Goodbye {username}! You have been logged out.', 'info')
-    return redirect(url_for('login'))
+    run_id = hashlib.sha1(os.urandom(8)).hexdigest()[:12]
+    owner = _enrichment_run_owner()
+    now = time.time()
+    connection = _open_enrichment_db()
+    try:
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("SELECT 1 FROM enrichment_runs WHERE username = ? AND status = 'running' "
+                                  "AND pause_requested = 0 AND lease_until >= ?", (username, now)).fetchone():
+                raise ValueError('An enrichment run is already in progress')
+            superseded = [row[0] for row in connection.execute(
+                "SELECT run_id FROM enrichment_runs WHERE username = ? AND status IN ('running', 'paused')", (username,))]
+            for old_run_id in superseded:
+                connection.execute("UPDATE enrichment_runs SET status = 'cancelled', owner = NULL, lease_until = 0, "
+                                   "updated_at = ?, finished_at = ? WHERE run_id = ?", (now, now, old_run_id))
+                connection.execute("DELETE FROM enrichment_plan WHERE run_id = ?", (old_run_id,))
+            # Created already leased to this worker, so a concurrent start never takes it for an interrupted run
+            connection.execute("INSERT INTO enrichment_runs (run_id, username, status, total, progress, owner, lease_until, "
+                               "created_at, updated_at) VALUES (?, ?, 'running', ?, '{}', ?, ?, ?, ?)",
+                               (run_id, username, len(plan), owner, now + ENRICHMENT_RUN_LEASE_SECONDS, now, now))
+            connection.executemany("INSERT INTO enrichment_plan (run_id, position, lead_id, name, website, validators) "
+                                   "VALUES (?, ?, ?, ?, ?, ?)",
+                                   ((run_id, position, lead.get('id') or lead_id(lead), lead.get('name'), lead['website'],
+                                     json.dumps(lead.get('crawl_validators') or {})) for position, lead in enumerate(plan)))
+            connection.execute("DELETE FROM enrichment_runs WHERE username = ? AND status IN ('done', 'failed', 'cancelled') "
+                               "AND run_id NOT IN (SELECT run_id FROM enrichment_runs WHERE username = ? "
+                               "ORDER BY created_at DESC LIMIT ?)", (username, username, ENRICHMENT_RUN_HISTORY))
+    finally:
+        connection.close()
+    print(f"🪄 Enrichment run {run_id} for {username}: {len(plan)} stale leads planned")
+    _launch_enrichment_run(run_id, owner)
+    return run_id
 
-# Protected routes
-@app.route('/')
-@login_required
-def dashboard():
-    """Main dashboard with enhanced stats and segmentation"""
-    # Get comprehensive stats from stored leads
-    leads_storage = get_leads_storage()
-    total_leads = len(leads_storage)
-    
-    # Debug information for troubleshooting
-    current_user = session.get('username', 'Unknown')
-    print(f"Dashboard accessed by user: {current_user}, loaded {total_leads} leads")
-    
-    # Enhanced lead type statistics
-    sales_ready = sum(1 for lead in leads_storage if lead.get('lead_type') == 'Sales-Ready Lead')
-    premium_leads = sum(1 for lead in leads_storage if lead.get('lead_type') == 'Premium Lead')
-    prospects = sum(1 for lead in leads_storage if lead.get('lead_type') == 'Prospect Lead')
-    social_connected = sum(1 for lead in leads_storage if lead.get('lead_type') == 'Social-Connected Lead')
-    website_leads = sum(1 for lead in leads_storage if lead.get('lead_type') == 'Website Lead')
-    social_leads = sum(1 for lead in leads_storage if any([lead.get('facebook'), lead.get('linkedin'), lead.get('twitter'), lead.get('instagram')]))
-    
-    # Contact completeness metrics
-    with_phone = sum(1 for lead in leads_storage if lead.get('phone'))
-    with_email = sum(1 for lead in leads_storage if lead.get('email'))
-    with_website = sum(1 for lead in leads_storage if lead.get('website'))
-    complete_profiles = sum(1 for lead in leads_storage if lead.get('phone') and lead.get('email') and lead.get('website'))
-    
-    # Contact level distribution
-    premium_contact = sum(1 for lead in leads_storage if lead.get('contact_level') == 'Premium')
-    high_contact = sum(1 for lead in leads_storage if lead.get('contact_level') == 'High')
-    medium_contact = sum(1 for lead in leads_storage if lead.get('contact_level') == 'Medium')
-    basic_contact = sum(1 for lead in leads_storage if lead.get('contact_level') == 'Basic')
-    
-    # Industry segmentation
-    industry_breakdown = {}
-    for lead in leads_storage:
-        industry = lead.get('industry', 'General')
-        industry_breakdown[industry] = industry_breakdown.get(industry, 0) + 1
-    
-    # Geographic segmentation
-    location_breakdown = {}
-    for lead in leads_storage:
-        location_tier = lead.get('location_tier', 'Unknown')
-        location_breakdown[location_tier] = location_breakdown.get(location_tier, 0) + 1
-    
-    # Lead quality metrics
-    avg_priority_score = sum(lead.get('priority_score', 0) for lead in leads_storage) / max(total_leads, 1)
-    high_priority_leads = sum(1 for lead in leads_storage if lead.get('priority_score', 0) >= 5)
-    
-    # Time-based metrics (simulated for current session)
-    today_leads = max(1, total_leads // 5)  # Simulate today's activity
-    this_week_leads = total_leads
-    
-    # Enhanced conversion rates
-    premium_conversion_rate = ((premium_leads + sales_ready) / total_leads * 100) if total_leads > 0 else 0
-    overall_conversion_rate = (sales_ready / total_leads * 100) if total_leads > 0 else 0
-    completion_rate = (complete_profiles / total_leads * 100) if total_leads > 0 else 0
-    
-    stats = {
-        'total_leads': total_leads,
-        'sales_ready': sales_ready,
-        'premium_leads': premium_leads,
-        'prospects': prospects,
-        'social_connected': social_connected,
-        'website_leads': website_leads,
-        'social_leads': social_leads,
-        'with_phone': with_phone,
-        'with_email': with_email,
-        'with_website': with_website,
-        'complete_profiles': complete_profiles,
-        'premium_contact': premium_contact,
-        'high_contact': high_contact,
-        'medium_contact': medium_contact,
-        'basic_contact': basic_contact,
-        'industry_breakdown': industry_breakdown,
-        'location_breakdown': location_breakdown,
-        'avg_priority_score': round(avg_priority_score, 1),
-        'high_priority_leads': high_priority_leads,
-        'today_leads': today_leads,
-        'this_week_leads': this_week_leads,
-        'premium_conversion_rate': round(premium_conversion_rate, 1),
-        'conversion_rate': round(overall_conversion_rate, 1),
-        'completion_rate': round(completion_rate, 1)
-    }
-    
-    # Get recent leads sorted by creation time (latest first)
-    recent_leads = sorted(leads_storage, key=lambda x: x.get('created_at', ''), reverse=True)[:5]
-    
-    return render_template('dashboard.html', stats=stats, recent_leads=recent_leads)
+def pause_enrichment_run(username, run_id):
+    """Ask a run to stop after its current batch (a run with no live worker pauses right away)"""
+    now = time.time()
+    connection = _open_enrichment_db()
+    try:
+        with connection:
+            cursor = connection.execute("UPDATE enrichment_runs SET pause_requested = 1, updated_at = ? "
+                                        "WHERE username = ? AND run_id = ? AND status = 'running'", (now, username, run_id))
+            connection.execute("UPDATE enrichment_runs SET status = 'paused', pause_requested = 0, owner = NULL "
+                               "WHERE run_id = ? AND status = 'running' AND lease_until < ?", (run_id, now))
+    finally:
+        connection.close()
+    return cursor.rowcount == 1
 
-@app.route('/enhance-existing-leads', methods=['POST'])
-@login_required  
-def enhance_existing_leads():
-    """Re-process existing leads with enhanced contact extraction"""
+def resume_enrichment_run(username, run_id):
+    """Continue a paused run from its cursor in this worker (or withdraw a pause that hasn't taken effect yet)"""
+    connection = _open_enrichment_db()
     try:
-        leads_storage = get_leads_storage()
-        total_leads = len(leads_storage)
-        
-        if total_leads == 0:
-            return {'success': False, 'message': 'No leads to process'}
-        
-        # Process leads with websites only to improve efficiency
-        leads_with_websites = [lead for lead in leads_storage if lead.get('website') and not lead.get('email')]
-        
-        if len(leads_with_websites) == 0:
-            return {'success': False, 'message': 'No leads with websites found that need email enhancement'}
-            
-        # Limit to 25 leads per request to prevent timeout
-        batch_size = min(25, len(leads_with_websites))
-        leads_to_process = leads_with_websites[:batch_size]
-        
-        print(f"Enhancing contact info for {batch_size} existing leads...")
-        
-        improved_count = 0
-        
-        # Process leads concurrently with enhanced extraction
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_to_lead = {}
-            for lead in leads_to_process:
-                future = executor.submit(scraper._extract_enhanced_contact_info_fast, lead['website'])
-                future_to_lead[future] = lead
-            
-            # Collect results with timeout  
-            for future in as_completed(future_to_lead, timeout=20):
-                lead = future_to_lead[future]
-                try:
-                    enhanced_contact = future.result()
-                    
-                    # Update fields that are empty
-                    original_email = lead.get('email', '')
-                    for key, value in enhanced_contact.items():
-                        if value and (not lead.get(key) or lead.get(key) == ''):
-                            lead[key] = value
-                            if key == 'email' and not original_email:
-                                improved_count += 1
-                                print(f"✅ Enhanced {lead['name']} with email: {value}")
-                        
-                except Exception as e:
-                    print(f"Error enhancing {lead['name']}: {e}")
-        
-        # Save updated leads
-        save_leads_storage(leads_storage)
-        
-        return {
-            'success': True, 
-            'processed': batch_size,
-            'improved': improved_count,
-            'remaining': max(0, len(leads_with_websites) - batch_size)
-        }
-        
+        with connection:
+            cursor = connection.execute("UPDATE enrichment_runs SET status = 'running', pause_requested = 0, updated_at = ? "
+                                        "WHERE username = ? AND run_id = ? AND status IN ('paused', 'running')",
+                                        (time.time(), username, run_id))
+        owner = _claim_enrichment_run(connection, run_id) if cursor.rowcount else None
+    finally:
+        connection.close()
+    if owner:
+        _launch_enrichment_run(run_id, owner)
+    return cursor.rowcount == 1
+
+def _claim_orphaned_enrichment_runs():
+    """Runs left 'running' by a worker that died or restarted, each claimed by this worker"""
+    connection = _open_enrichment_db()
+    try:
+        orphaned = connection.execute("SELECT run_id FROM enrichment_runs WHERE status = 'running' AND lease_until < ?",
+                                      (time.time(),)).fetchall()
+        claimed = []
+        for (run_id,) in orphaned:
+            owner = _claim_enrichment_run(connection, run_id)
+            if owner:
+                claimed.append((run_id, owner))
+        return claimed
+    finally:
+        connection.close()
+
+def _run_enrichment_batch(username, plan_rows, counts):
+    """Crawl one batch outside the store lock, then fold the results into the leads as they are now"""
+    leads = [{'name': name, 'website': website, 'crawl_validators': json.loads(validators or '{}')}
+             for _, name, website, validators in plan_rows]
+    results = crawl_leads(leads, timeout=ENRICHMENT_BATCH_TIMEOUT)
+    by_id = {plan_rows[position][0]: result for position, result in results.items()}
+    counts['skipped'] += len(plan_rows) - len(results)  # Timed out or failed; still stale, so the next run retries them
+    if by_id:
+        found = update_user_leads(username, by_id, lambda lead: apply_crawl_result(lead, by_id[lead.get('id') or lead_id(lead)], counts))
+        counts['missing'] += len(by_id) - found  # Deleted since the run was planned
+
+def run_enrichment(run_id, owner):
+    """Work through a run's plan a batch at a time from its cursor, checkpointing after each batch while we hold the lease"""
+    try:
+        while True:
+            connection = _open_enrichment_db()
+            try:
+                row = connection.execute("SELECT username, status, cursor, progress, pause_requested FROM enrichment_runs "
+                                         "WHERE run_id = ? AND owner = ?", (run_id, owner)).fetchone()
+                if not row or row[1] != 'running':
+                    return  # Lost the lease or the run was replaced
+                username, _, position, progress, pause_requested = row
+                counts = json.loads(progress or '{}')
+                if pause_requested:
+                    with connection:
+                        connection.execute("UPDATE enrichment_runs SET status = 'paused', pause_requested = 0, owner = NULL, "
+                                           "lease_until = 0, updated_at = ? WHERE run_id = ? AND owner = ?",
+                                           (time.time(), run_id, owner))
+                    print(f"⏸️ Enrichment run {run_id} paused at {position}")
+                    return
+                plan_rows = connection.execute("SELECT lead_id, name, website, validators FROM enrichment_plan "
+                                               "WHERE run_id = ? AND position >= ? ORDER BY position LIMIT ?",
+                                               (run_id, position, ENRICHMENT_RUN_BATCH_SIZE)).fetchall()
+                if not plan_rows:
+                    now = time.time()
+                    with connection:
+                        connection.execute("UPDATE enrichment_runs SET status = 'done', owner = NULL, lease_until = 0, "
+                                           "updated_at = ?, finished_at = ? WHERE run_id = ? AND owner = ?",
+                                           (now, now, run_id, owner))
+                        connection.execute("DELETE FROM enrichment_plan WHERE run_id = ?", (run_id,))
+                    print(f"✅ Enrichment run {run_id} done: {counts.get('processed', 0)} leads re-crawled, "
+                          f"{counts.get('improved', 0)} new emails")
+                    return
+            finally:
+                connection.close()
+
+            for field in ('processed', 'improved', 'updated', 'unchanged', 'skipped', 'missing', 'batches'):
+                counts.setdefault(field, 0)
+            batch_started = time.time()
+            _run_enrichment_batch(username, plan_rows, counts)
+            counts['batches'] += 1
+            counts['active_seconds'] = round(counts.get('active_seconds', 0) + time.time() - batch_started, 1)
+
+            # Checkpoint: the cursor moves past the batch only once its leads are saved
+            now = time.time()
+            connection = _open_enrichment_db()
+            try:
+                with connection:
+                    cursor = connection.execute("UPDATE enrichment_runs SET cursor = ?, progress = ?, lease_until = ?, "
+                                                "updated_at = ? WHERE run_id = ? AND owner = ?",
+                                                (position + len(plan_rows), json.dumps(counts),
+                                                 now + ENRICHMENT_RUN_LEASE_SECONDS, now, run_id, owner))
+            finally:
+                connection.close()
+            if cursor.rowcount != 1:
+                return
     except Exception as e:
-        print(f"Enhancement error: {e}")
-        return {'success': False, 'message': str(e)}
+        print(f"❌ Enrichment run {run_id} failed: {e}")
+        connection = _open_enrichment_db()
+        try:
+            with connection:
+                connection.execute("UPDATE enrichment_runs SET status = 'failed', owner = NULL, lease_until = 0, "
+                                   "progress = json_set(progress, '$.error', ?), updated_at = ?, finished_at = ? "
+                                   "WHERE run_id = ? AND owner = ?", (str(e), time.time(), time.time(), run_id, owner))
+        finally:
+            connection.close()
 
 @app.route('/lead-finder')
 @login_required
 def lead_finder():
     """Lead finder search interface"""
-    return render_template('lead_finder.html')
+    return render_page('lead_finder.html')
 
 @app.route('/search', methods=['POST'])
 @login_required
@@ -2389,63 +5258,190 @@ def search():
     num_results = min(int(request.form.get('num_results', 10)), 50)
     
     if not business_type or not location:
-        return render_template('lead_finder.html', error="Please enter both business type and location")
+        return render_page('lead_finder.html', error="Please enter both business type and location")
     
     try:
-        # Search business listings for structured data
-        leads = scraper.search_business_listings(business_type, location, num_results)
-        
+        # Repeat searches are answered from the query cache; ?refresh=1 (or a form field) forces the sources
+        leads, cached = find_businesses(business_type, location, num_results, refresh=request.values.get('refresh') == '1')
+
         if not leads:
-            return render_template('lead_finder.html', error="No business listings found. Try different search terms.")
-        
+            return render_page('lead_finder.html', error="No business listings found. Try different search terms.")
+
         # Store leads with deduplication based on business name and phone number
-        current_leads = get_leads_storage()
-        new_leads_list = deduplicate_leads(current_leads, leads)
-        save_leads_storage(new_leads_list)
-        
+        store_new_leads(session['username'], leads)
+
         # Sort leads by priority score
         leads.sort(key=lambda x: x.get('priority_score', 0), reverse=True)
-        
-        return render_template('search_results.html', leads=leads, query=business_type, location=location)
+
+        cached_at = datetime.fromtimestamp(cached['created_at']) if cached else None
+        return render_page('search_results.html', leads=leads, query=business_type, location=location,
+                           num_results=num_results, cached_at=cached_at)
         
     except Exception as e:
-        return render_template('lead_finder.html', error=f"Search error: {str(e)}")
+        return render_page('lead_finder.html', error=f"Search error: {str(e)}")
+
+@app.route('/api/batch-search', methods=['GET', 'POST'])
+@login_required
+def api_batch_search():
+    """API endpoint to start a batch search (business types x locations) or list the user's recent batches"""
+    username = session['username']
+    if request.method == 'GET':
+        return jsonify({'jobs': list_batch_jobs(username)})
+
+    data = request.get_json(silent=True) or request.form
+    business_types = parse_batch_terms(data.get('business_types') or data.get('query'))
+    locations = parse_batch_terms(data.get('locations') or data.get('location'))
+    try:
+        num_results = max(1, min(int(data.get('num_results', 10)), 50))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'num_results must be a number'}), 400
+    try:
+        job_id = start_batch_search(username, business_types, locations, num_results)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(get_batch_job(username, job_id)), 202
+
+@app.route('/api/batch-search/<job_id>')
+@login_required
+def api_batch_search_status(job_id):
+    """API endpoint for a batch search's progress and per-search results"""
+    job = get_batch_job(session['username'], job_id)
+    if not job:
+        return jsonify({'error': 'Batch not found'}), 404
+    response = jsonify(job)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/batch-search/<job_id>/cancel', methods=['POST'])
+@login_required
+def api_batch_search_cancel(job_id):
+    """API endpoint to stop a batch search after the sub-searches already running"""
+    if not cancel_batch_job(session['username'], job_id):
+        return jsonify({'error': 'Batch not found or already finished'}), 404
+    return jsonify(get_batch_job(session['username'], job_id))
+
+@app.route('/api/saved-searches', methods=['GET', 'POST'])
+@login_required
+def api_saved_searches():
+    """API endpoint to list saved searches (with their latest run) or save one to repeat every interval_hours"""
+    username = session['username']
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or request.form
+        try:
+            num_results = max(1, min(int(data.get('num_results', 20)), 50))
+            interval_hours = float(data.get('interval_hours', SAVED_SEARCH_DEFAULT_INTERVAL_HOURS))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'num_results and interval_hours must be numbers'}), 400
+        try:
+            create_saved_search(username, str(data.get('business_type') or data.get('query') or '').strip(),
+                                str(data.get('location') or '').strip(), num_results, interval_hours)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    response = jsonify({'searches': list_saved_searches(username)})
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response, 201 if request.method == 'POST' else 200
+
+@app.route('/api/saved-searches/<search_id>', methods=['DELETE'])
+@login_required
+def api_delete_saved_search(search_id):
+    """API endpoint to stop repeating a saved search"""
+    if not delete_saved_search(session['username'], search_id):
+        return jsonify({'error': 'Saved search not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/saved-searches/<search_id>/run', methods=['POST'])
+@login_required
+def api_run_saved_search(search_id):
+    """API endpoint to run a saved search now instead of waiting for its schedule"""
+    if not run_saved_search_now(session['username'], search_id):
+        return jsonify({'error': 'Saved search not found'}), 404
+    return jsonify({'success': True}), 202
+
+@app.route('/api/saved-searches/<search_id>/runs')
+@login_required
+def api_saved_search_runs(search_id):
+    """API endpoint for a saved search's run history: listings found, already known and new per run"""
+    runs = list_search_runs(session['username'], search_id)
+    if runs is None:
+        return jsonify({'error': 'Saved search not found'}), 404
+    return jsonify({'runs': runs})
+
+@app.route('/api/enrichment-runs', methods=['GET', 'POST'])
+@login_required
+def api_enrichment_runs():
+    """API endpoint to start a bulk re-enrichment of every stale lead or list the user's recent runs"""
+    username = session['username']
+    if request.method == 'GET':
+        return jsonify({'runs': list_enrichment_runs(username)})
+    try:
+        run_id = start_enrichment_run(username)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'run': get_enrichment_run(username)}), 409
+    return jsonify(get_enrichment_run(username, run_id)), 202
+
+@app.route('/api/enrichment-runs/<run_id>')
+@login_required
+def api_enrichment_run_status(run_id):
+    """API endpoint for a run's cursor, counts and leads/minute throughput"""
+    run = get_enrichment_run(session['username'], run_id)
+    if not run:
+        return jsonify({'error': 'Enrichment run not found'}), 404
+    response = jsonify(run)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/enrichment-runs/<run_id>/pause', methods=['POST'])
+@login_required
+def api_pause_enrichment_run(run_id):
+    """API endpoint to pause a run after its current batch"""
+    if not pause_enrichment_run(session['username'], run_id):
+        return jsonify({'error': 'Enrichment run not found or not running'}), 404
+    return jsonify(get_enrichment_run(session['username'], run_id))
+
+@app.route('/api/enrichment-runs/<run_id>/resume', methods=['POST'])
+@login_required
+def api_resume_enrichment_run(run_id):
+    """API endpoint to continue a paused run from its last checkpoint"""
+    if not resume_enrichment_run(session['username'], run_id):
+        return jsonify({'error': 'Enrichment run not found or already finished'}), 404
+    return jsonify(get_enrichment_run(session['username'], run_id)), 202
 
 @app.route('/lead-classifier')
 @login_required
+@leads_etag
 def lead_classifier():
     """Lead classification and filtering"""
     # Get filter parameters
     lead_type_filter = request.args.get('type', 'all')
     
-    leads_storage = get_leads_storage()
-    # Sort leads by creation time (latest first)
-    sorted_leads = sorted(leads_storage, key=lambda x: x.get('created_at', ''), reverse=True)
-    
-    filtered_leads = sorted_leads
-    if lead_type_filter != 'all':
-        filtered_leads = [lead for lead in sorted_leads if lead.get('lead_type') == lead_type_filter]
-    
-    # Classify leads by type (also sorted by creation time)
-    classified_leads = {
-        'sales_ready': sorted([lead for lead in leads_storage if lead.get('lead_type') == 'Sales-Ready Lead'], 
-                             key=lambda x: x.get('created_at', ''), reverse=True),
-        'prospects': sorted([lead for lead in leads_storage if lead.get('lead_type') == 'Prospect Lead'], 
-                           key=lambda x: x.get('created_at', ''), reverse=True),
-        'website_leads': sorted([lead for lead in leads_storage if lead.get('lead_type') == 'Website Lead'], 
-                               key=lambda x: x.get('created_at', ''), reverse=True),
-        'social_leads': sorted([lead for lead in leads_storage if any([lead.get('facebook'), lead.get('linkedin'), lead.get('twitter'), lead.get('instagram')])], 
-                              key=lambda x: x.get('created_at', ''), reverse=True)
+    username = session['username']
+    args = request.args.to_dict()
+    args['lead_type'] = lead_type_filter
+    try:
+        page = query_leads(username, **parse_lead_query(args))
+    except ValueError:
+        return redirect(url_for('lead_classifier', type=lead_type_filter))
+    
+    # Card counts come from the cached lead view - no per-request sorting or filtering of the whole list
+    counts = get_lead_view(username)['counts']
+    classified_counts = {
+        'sales_ready': counts['by_type'].get('Sales-Ready Lead', 0),
+        'prospects': counts['by_type'].get('Prospect Lead', 0),
+        'website_leads': counts['by_type'].get('Website Lead', 0),
+        'social_leads': counts['social']
     }
     
-    return render_template('lead_classifier.html', leads=filtered_leads, classified=classified_leads)
+    return render_page('lead_classifier.html', leads=page['leads'], classified=classified_counts,
+                           lead_type_filter=lead_type_filter, total=page['total'], next_cursor=page['next_cursor'],
+                           sort=request.args.get('sort', '-created_at'))
 
 @app.route('/outreach-hub')
 @login_required
+@leads_etag
 def outreach_hub():
     """Outreach hub with one-click actions and templates"""
-    leads_storage = get_leads_storage()
-    return render_template('outreach_hub.html', leads=leads_storage)
+    page = query_leads(session['username'], limit=10)
+    return render_page('outreach_hub.html', leads=page['leads'], total_leads=page['total'])
 
 @app.route('/funnels-library')
 @login_required
@@ -2454,108 +5450,355 @@ def funnels_library():
     # Get list of available funnel templates
     funnel_templates = get_available_templates('funnels')
     campaign_templates = get_available_templates('campaigns')
-    return render_template('funnels_library.html', funnels=funnel_templates, campaigns=campaign_templates)
+    return render_page('funnels_library.html', funnels=funnel_templates, campaigns=campaign_templates)
+
+
+# Lead exports - rows are streamed from the lead store, never built up in memory
+CSV_EXPORT_FIELDS = ['name', 'phone', 'website', 'email', 'address', 'lead_type', 'priority_score', 'facebook', 'linkedin', 'twitter', 'instagram', 'source']
+RECENT_LEADS_EXPORT_COLUMNS = [
+    ('Business Name', 'name'), ('Domain', 'domain'), ('Address', 'address'), ('Phone', 'phone'),
+    ('Email', 'email'), ('Industry', 'industry'), ('Lead Type', 'lead_type'), ('Priority Score', 'priority_score'),
+    ('Facebook', 'facebook'), ('LinkedIn', 'linkedin'), ('Twitter', 'twitter'), ('Instagram', 'instagram'),
+    ('YouTube', 'youtube'), ('Created At', 'created_at')
+]
+EXPORT_CHUNK_BYTES = 65536
+
+def sanitize_csv_field(value):
+    """Sanitize CSV fields to prevent formula injection"""
+    if not value:
+        return ''
+    value = str(value)
+    # Prevent formula injection by prepending space to fields starting with dangerous characters
+    if value.startswith(('=', '+', '-', '@')):
+        value = ' ' + value
+    return value
+
+def iter_csv_chunks(leads, columns):
+    """Yield CSV text in ~64 KB chunks for an iterable of leads; columns are (header, field) pairs"""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in columns])
+    for lead in leads:
+        writer.writerow([sanitize_csv_field(lead.get(field, '')) for _, field in columns])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
 
+def gzip_chunks(chunks):
+    """Gzip a stream of text chunks on the fly"""
+    import zlib
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
 
-@app.route('/export_csv', methods=['POST'])
+def csv_export_response(chunks, filename):
+    """Streaming CSV download; ?gzip=1 sends a .csv.gz file, otherwise gzip is used as the transfer encoding when accepted"""
+    if request.args.get('gzip') == '1':
+        return Response(gzip_chunks(chunks), mimetype='application/gzip',
+                        headers={'Content-Disposition': f'attachment; filename={filename}.gz'})
+    
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    if 'gzip' in request.headers.get('Accept-Encoding', '').lower():
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+        chunks = gzip_chunks(chunks)
+    return Response(chunks, mimetype='text/csv', headers=headers)
+
+def iter_export_leads(username, filters=None, ids=None):
+    """Stream a user's stored leads that match the classifier filters and, optionally, a set of lead ids"""
+    for lead in iter_user_leads(username):
+        if not isinstance(lead, dict):
+            continue
+        if ids is not None and (lead.get('id') or lead_id(lead)) not in ids:
+            continue
+        if filters and not _lead_matches(lead, filters):
+            continue
+        yield lead
+
+@app.route('/export_csv', methods=['GET', 'POST'])
 @login_required
 def export_csv():
+    """Export stored leads as CSV, filtered like the classifier (?lead_type=, ?type=, ?industry=, ...) or by posted lead ids"""
+    columns = [(field, field) for field in CSV_EXPORT_FIELDS]
+    
+    # Legacy clients post the rows themselves (search results that may not all be stored)
     leads_data = request.form.get('data', '')
-    if not leads_data:
-        return "No data to export", 400
+    if request.method == 'POST' and leads_data:
+        try:
+            leads = json.loads(leads_data)
+        except ValueError as e:
+            return f"Export error: {str(e)}", 400
+        return csv_export_response(iter_csv_chunks(leads, columns), 'leads.csv')
     
-    try:
-        leads = json.loads(leads_data)
-        
-        # Function to sanitize CSV fields to prevent formula injection
-        def sanitize_csv_field(value):
-            if not value:
-                return ''
-            value = str(value)
-            # Prevent formula injection by prepending space to fields starting with dangerous characters
-            if value.startswith(('=', '+', '-', '@')):
-                value = ' ' + value
-            return value
-        
-        # Create CSV content in memory
-        output = StringIO()
-        fieldnames = ['name', 'phone', 'website', 'email', 'address', 'lead_type', 'priority_score', 'facebook', 'linkedin', 'twitter', 'instagram', 'source']
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for lead in leads:
-            sanitized_lead = {k: sanitize_csv_field(lead.get(k, '')) for k in fieldnames}
-            writer.writerow(sanitized_lead)
-        
-        # Convert to bytes for proper file response
-        csv_content = output.getvalue()
-        output.close()
-        
-        # Create response with CSV content
-        response = Response(
-            csv_content,
-            mimetype='text/csv',
-            headers={'Content-Disposition': 'attachment; filename=leads.csv'}
-        )
-        return response
-        
-    except Exception as e:
-        return f"Export error: {str(e)}", 500
+    args = request.args.to_dict()
+    if 'type' in args and 'lead_type' not in args:
+        args['lead_type'] = args['type']
+    filters = parse_lead_query(args)['filters']
+    
+    ids = None
+    posted_ids = request.form.get('ids', '')
+    if request.method == 'POST':
+        ids = {value.strip() for value in posted_ids.split(',') if value.strip()}
+        if not ids:
+            return "No data to export", 400
+    
+    username = session['username']
+    return csv_export_response(iter_csv_chunks(iter_export_leads(username, filters, ids), columns), 'leads.csv')
 
 @app.route('/api/export_recent_leads')
 @login_required
 def export_recent_leads():
     """Export recent leads as CSV"""
-    username = session.get('username', 'guest')
-    leads = get_leads_storage()
-    recent_leads = leads[-10:] if leads else []  # Get last 10 leads
+    # Last 10 leads in store order, kept in a bounded deque while streaming the file
+    recent_leads = list(deque(iter_user_leads(session['username']), maxlen=10))
     
     if not recent_leads:
         return jsonify({'error': 'No leads found'}), 404
     
-    # Create CSV content
-    import csv
-    import io
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['Business Name', 'Domain', 'Address', 'Phone', 'Email', 'Industry', 'Lead Type', 'Priority Score', 'Facebook', 'LinkedIn', 'Twitter', 'Instagram', 'YouTube', 'Created At'])
-    
-    # Write data
-    for lead in recent_leads:
-        writer.writerow([
-            lead.get('name', ''),
-            lead.get('domain', ''),
-            lead.get('address', ''),
-            lead.get('phone', ''),
-            lead.get('email', ''),
-            lead.get('industry', ''),
-            lead.get('lead_type', ''),
-            lead.get('priority_score', ''),
-            lead.get('facebook', ''),
-            lead.get('linkedin', ''),
-            lead.get('twitter', ''),
-            lead.get('instagram', ''),
-            lead.get('youtube', ''),
-            lead.get('created_at', '')
-        ])
+    return csv_export_response(iter_csv_chunks(recent_leads, RECENT_LEADS_EXPORT_COLUMNS),
+                               f"recent_leads_{datetime.now().strftime('%Y%m%d')}.csv")
+
+# Columnar exports (optional pyarrow) - low-cardinality columns are dictionary-encoded
+COLUMNAR_EXPORT_FIELDS = ['id', 'name', 'phone', 'website', 'domain', 'email', 'address', 'lead_type', 'industry',
+                          'location_tier', 'contact_level', 'priority_score', 'facebook', 'linkedin', 'twitter',
+                          'instagram', 'youtube', 'tiktok', 'pinterest', 'source', 'created_at']
+COLUMNAR_DICTIONARY_FIELDS = ('lead_type', 'industry', 'source', 'location_tier', 'contact_level')
+COLUMNAR_BATCH_ROWS = 20000
+
+def _load_pyarrow():
+    """Import pyarrow on first use; None when it isn't installed"""
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+def _columnar_export_schema(pa):
+    columns = []
+    for field in COLUMNAR_EXPORT_FIELDS:
+        if field == 'priority_score':
+            columns.append(pa.field(field, pa.int16()))
+        elif field in COLUMNAR_DICTIONARY_FIELDS:
+            columns.append(pa.field(field, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            columns.append(pa.field(field, pa.string()))
+    return pa.schema(columns)
+
+def iter_columnar_batches(pa, leads, schema):
+    """Group streamed leads into Arrow record batches of COLUMNAR_BATCH_ROWS rows"""
+    def build(rows):
+        arrays = []
+        for column in schema:
+            values = [lead.get(column.name) for lead in rows]
+            if column.name == 'priority_score':
+                arrays.append(pa.array([int(_numeric_sort_value(value)) if value not in (None, '') else None for value in values], type=pa.int16()))
+            elif column.name in COLUMNAR_DICTIONARY_FIELDS:
+                arrays.append(pa.array([str(value) if value else None for value in values], type=pa.string()).dictionary_encode())
+            else:
+                # Empty social/contact fields become nulls rather than repeated empty strings
+                arrays.append(pa.array([str(value) if value else None for value in values], type=pa.string()))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+    
+    rows = []
+    for lead in leads:
+        if not lead.get('id'):
+            lead = dict(lead, id=lead_id(lead))
+        rows.append(lead)
+        if len(rows) >= COLUMNAR_BATCH_ROWS:
+            yield build(rows)
+            rows = []
+    if rows:
+        yield build(rows)
+
+@app.route('/export_columnar')
+@login_required
+def export_columnar():
+    """Export stored leads as Parquet (?format=parquet, default) or an Arrow IPC stream (?format=arrow), with the CSV export filters"""
+    pa = _load_pyarrow()
+    if pa is None:
+        return jsonify({'error': 'Columnar export needs pyarrow - pip install pyarrow'}), 501
     
-    output.seek(0)
+    output_format = request.args.get('format', 'parquet').lower()
+    if output_format not in ('parquet', 'arrow'):
+        return jsonify({'error': f"Unsupported format: {output_format}"}), 400
+    args = request.args.to_dict()
+    if 'type' in args and 'lead_type' not in args:
+        args['lead_type'] = args['type']
+    filters = parse_lead_query(args)['filters']
     
-    return app.response_class(
-        output.getvalue(),
-        mimetype='text/csv',
-        headers={"Content-disposition": f"attachment; filename=recent_leads_{datetime.now().strftime('%Y%m%d')}.csv"}
-    )
+    import tempfile
+    from flask import send_file
+    schema = _columnar_export_schema(pa)
+    batches = iter_columnar_batches(pa, iter_export_leads(session['username'], filters), schema)
+    # Batches are written as they're built, so only one batch is ever in memory; the file is deleted once sent
+    export_file = tempfile.TemporaryFile()
+    if output_format == 'parquet':
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(export_file, schema, compression='zstd') as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        filename, mimetype = 'leads.parquet', 'application/vnd.apache.parquet'
+    else:
+        from pyarrow import ipc
+        # Stream format, because each batch carries its own dictionaries (the file format can't replace them)
+        with ipc.new_stream(export_file, schema, options=ipc.IpcWriteOptions(compression='zstd')) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        filename, mimetype = 'leads.arrows', 'application/vnd.apache.arrow.stream'
+    export_file.seek(0)
+    return send_file(export_file, mimetype=mimetype, as_attachment=True, download_name=filename)
 
 @app.route('/api/leads')
 @login_required
+@leads_etag
 def api_leads():
-    """API endpoint for leads data"""
-    leads_storage = get_leads_storage()
-    return jsonify(leads_storage)
+    """API endpoint for leads data, streamed as a JSON array or NDJSON (?format=ndjson, ?fields=name,email)"""
+    username = session['username']
+    output_format = request.args.get('format', 'json').lower()
+    if output_format not in ('json', 'ndjson'):
+        return jsonify({'error': f"Unsupported format: {output_format}"}), 400
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    # The body streams after the ETag is set, so both come from one snapshot taken now
+    g.lead_view_version, snapshot = take_lead_view_snapshot(username)
+    
+    def generate():
+        # Leads are read and serialized one by one and flushed in ~32 KB chunks
+        parts, size, first = [] if output_format == 'ndjson' else ['['], 0, True
+        for lead in iter_user_leads(username, snapshot=snapshot):
+            if fields:
+                lead = {field: lead[field] for field in fields if field in lead}
+            encoded = json.dumps(lead, separators=(',', ':'))
+            if output_format == 'ndjson':
+                parts.append(encoded + '\n')
+            else:
+                parts.append(encoded if first else ',' + encoded)
+            first = False
+            size += len(encoded)
+            if size >= 32768:
+                yield ''.join(parts)
+                parts, size = [], 0
+        if output_format == 'json':
+            parts.append(']')
+        if parts:
+            yield ''.join(parts)
+    
+    mimetype = 'application/x-ndjson' if output_format == 'ndjson' else 'application/json'
+    return Response(generate(), mimetype=mimetype)
+
+@app.route('/api/leads/query')
+@login_required
+@leads_etag
+def api_leads_query():
+    """API endpoint for filtered, sorted, keyset-paginated lead pages (?cursor= from next_cursor, ?encoding=columns)"""
+    try:
+        page = query_leads(session['username'], **parse_lead_query(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    if request.args.get('encoding') == 'columns':
+        leads = page.pop('leads')
+        page['count'] = len(leads)
+        page['columns'] = encode_lead_columns(leads, fields)
+    elif fields:
+        page['leads'] = [{field: lead[field] for field in fields if field in lead} for lead in page['leads']]
+    return jsonify(page)
+
+@app.route('/api/leads/suggest')
+@login_required
+@leads_etag
+def api_suggest_leads():
+    """API endpoint for lead name autocomplete (?q=prefix), column-encoded"""
+    try:
+        limit = max(1, min(int(request.args.get('limit', LEAD_SUGGEST_LIMIT)), LEAD_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    leads = suggest_leads(session['username'], request.args.get('q', ''), limit)
+    return jsonify({'count': len(leads), 'columns': encode_lead_columns(leads, LEAD_SUGGEST_FIELDS)})
+
+@app.route('/api/leads/search')
+@login_required
+@leads_etag
+def api_search_leads():
+    """API endpoint for ranked full-text lead search (?q=words, same filters as /api/leads/query, ?offset= to page)"""
+    try:
+        query = parse_lead_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error': 'offset must be a number'}), 400
+    limit = max(1, min(query['limit'], LEAD_MAX_PAGE_SIZE))
+    try:
+        result = search_leads(session['username'], request.args.get('q', ''), query['filters'], limit, offset)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Lead search failed: {e}")
+        return jsonify({'error': 'Full-text search needs SQLite with FTS5'}), 501
+    result['offset'] = offset
+    return jsonify(result)
+
+@app.route('/api/stats')
+@login_required
+def api_stats():
+    """API endpoint for lead stats: ?since=<version> returns only what changed, &wait=<seconds> long-polls"""
+    username = session['username']
+    since = request.args.get('since') or None
+    try:
+        wait = max(0.0, min(float(request.args.get('wait', 0)), LEAD_STATS_MAX_WAIT))
+    except ValueError:
+        return jsonify({'error': 'wait must be a number of seconds'}), 400
+
+    long_poll = True
+    if since and wait and since == lead_view_version(username):
+        long_poll = wait_for_leads_change(username, since, wait)
+    result = lead_stats_delta(username, since)
+    if not long_poll:
+        result['long_poll'] = False  # No wait slot free: the client falls back to its polling interval
+    response = jsonify(result)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/leads/lookup')
+@login_required
+def api_lookup_leads():
+    """API endpoint: do we already have this business? (?phone=, ?domain= or website URL, ?email=)"""
+    username = session['username']
+    matches = find_lead_ids(username, phone=request.args.get('phone'),
+                            domain=request.args.get('domain') or request.args.get('website'),
+                            email=request.args.get('email'))
+    if not matches:
+        return jsonify({'error': 'Give at least one of phone, domain/website or email'}), 400
+    
+    ids = {lead_ref for match in matches.values() for lead_ref in match['ids']}
+    by_id = get_lead_view(username)['by_id']
+    return jsonify({'matches': matches, 'leads': [by_id[lead_ref] for lead_ref in ids if lead_ref in by_id]})
+
+@app.route('/api/leads/delete', methods=['POST'])
+@login_required
+def api_delete_leads():
+    """API endpoint to delete leads by id"""
+    data = request.get_json(silent=True) or {}
+    ids = [str(value) for value in data.get('ids', []) if value]
+    if not ids:
+        return jsonify({'success': False, 'error': 'No lead ids given'}), 400
+    deleted = delete_user_leads(session['username'], ids)
+    return jsonify({'success': True, 'deleted': deleted})
+
+@app.route('/api/metrics')
+@login_required
+def api_metrics():
+    """API endpoint for scraper runtime metrics"""
+    scraper = get_scraper()
+    return jsonify({
+        'enrichment_concurrency': scraper.enrichment_limiter.snapshot(),
+        'contact_pages': scraper.contact_page_metrics()
+    })
 
 @app.route('/clear-leads', methods=['POST'])
 @login_required
@@ -2565,8 +5808,8 @@ def clear_leads():
     return jsonify({'success': True})
 
 # Template System Routes
-def load_template_manifest():
-    """Load template manifest with metadata"""
+def _read_template_manifest():
+    """Read the template manifest from disk"""
     try:
         manifest_path = os.path.join(app.template_folder, 'manifest.json')
         with open(manifest_path, 'r') as f:
@@ -2575,6 +5818,13 @@ def load_template_manifest():
         print(f"Error loading template manifest: {e}")
         return {'campaigns': {}, 'funnels': {}}
 
+# Templates ship with the code, so the manifest is read once (in the gunicorn master when preloading)
+TEMPLATE_MANIFEST = _read_template_manifest()
+
+def load_template_manifest():
+    """Load template manifest with metadata"""
+    return TEMPLATE_MANIFEST
+
 def safe_template_resolver(template_kind, template_slug):
     """Safely resolve template paths to prevent path traversal attacks"""
     # Whitelist allowed template kinds
@@ -2726,68 +5976,70 @@ def api_templates():
     return jsonify(manifest)
 
 # TXT Resource Routes for Campaign and Funnel Templates
-def get_resource_mapping():
-    """Get mapping of resource names to txt files"""
-    return {
-        'campaigns': {
-            'healthcare_nurture': {
-                'title': 'Healthcare Lead Nurture Sequence',
-                'file': 'healthcare_nurture.txt',
-                'description': 'Complete email nurture sequence for healthcare professionals',
-                'niche': 'healthcare'
-            },
-            'fitness_outreach': {
-                'title': 'Fitness Business Outreach Sequence', 
-                'file': 'fitness_outreach.txt',
-                'description': 'B2B outreach sequence for fitness industry services',
-                'niche': 'fitness'
-            },
-            'realestate_agent': {
-                'title': 'Real Estate Agent Outreach Sequence',
-                'file': 'realestate_agent.txt', 
-                'description': 'Lead generation sequence for real estate marketing services',
-                'niche': 'realestate'
-            },
-            'cold_email_sequence': {
-                'title': 'Universal Cold Email Sequence',
-                'file': 'cold_email_sequence.txt',
-                'description': 'Universal B2B cold email outreach across all industries', 
-                'niche': 'general'
-            },
-            'legal_outreach': {
-                'title': 'Legal Services Outreach Sequence',
-                'file': 'legal_outreach.txt',
-                'description': 'Compliant marketing sequence for law firms and legal services',
-                'niche': 'legal'
-            }
+RESOURCE_MAPPING = {
+    'campaigns': {
+        'healthcare_nurture': {
+            'title': 'Healthcare Lead Nurture Sequence',
+            'file': 'healthcare_nurture.txt',
+            'description': 'Complete email nurture sequence for healthcare professionals',
+            'niche': 'healthcare'
         },
-        'funnels': {
-            'dental_consultation': {
-                'title': 'Dental Consultation Funnel System',
-                'file': 'dental_consultation.txt',
-                'description': 'Complete funnel for converting dental consultation leads',
-                'niche': 'healthcare'
-            },
-            'fitness_trial': {
-                'title': 'Fitness Trial Membership Funnel',
-                'file': 'fitness_trial.txt',
-                'description': 'Free trial to paid membership conversion funnel for gyms',
-                'niche': 'fitness'
-            },
-            'legal_consultation': {
-                'title': 'Legal Consultation Funnel System', 
-                'file': 'legal_consultation.txt',
-                'description': 'Consultation booking to legal service retainer funnel',
-                'niche': 'legal'
-            },
-            'restaurant_catering': {
-                'title': 'Restaurant Catering Funnel System',
-                'file': 'restaurant_catering.txt', 
-                'description': 'Website visitors to booked catering events conversion funnel',
-                'niche': 'restaurant'
-            }
+        'fitness_outreach': {
+            'title': 'Fitness Business Outreach Sequence', 
+            'file': 'fitness_outreach.txt',
+            'description': 'B2B outreach sequence for fitness industry services',
+            'niche': 'fitness'
+        },
+        'realestate_agent': {
+            'title': 'Real Estate Agent Outreach Sequence',
+            'file': 'realestate_agent.txt', 
+            'description': 'Lead generation sequence for real estate marketing services',
+            'niche': 'realestate'
+        },
+        'cold_email_sequence': {
+            'title': 'Universal Cold Email Sequence',
+            'file': 'cold_email_sequence.txt',
+            'description': 'Universal B2B cold email outreach across all industries', 
+            'niche': 'general'
+        },
+        'legal_outreach': {
+            'title': 'Legal Services Outreach Sequence',
+            'file': 'legal_outreach.txt',
+            'description': 'Compliant marketing sequence for law firms and legal services',
+            'niche': 'legal'
+        }
+    },
+    'funnels': {
+        'dental_consultation': {
+            'title': 'Dental Consultation Funnel System',
+            'file': 'dental_consultation.txt',
+            'description': 'Complete funnel for converting dental consultation leads',
+            'niche': 'healthcare'
+        },
+        'fitness_trial': {
+            'title': 'Fitness Trial Membership Funnel',
+            'file': 'fitness_trial.txt',
+            'description': 'Free trial to paid membership conversion funnel for gyms',
+            'niche': 'fitness'
+        },
+        'legal_consultation': {
+            'title': 'Legal Consultation Funnel System', 
+            'file': 'legal_consultation.txt',
+            'description': 'Consultation booking to legal service retainer funnel',
+            'niche': 'legal'
+        },
+        'restaurant_catering': {
+            'title': 'Restaurant Catering Funnel System',
+            'file': 'restaurant_catering.txt', 
+            'description': 'Website visitors to booked catering events conversion funnel',
+            'niche': 'restaurant'
         }
     }
+}
+
+def get_resource_mapping():
+    """Get mapping of resource names to txt files"""
+    return RESOURCE_MAPPING
 
 def safe_resource_resolver(resource_type, resource_name):
     """Safely resolve resource paths to prevent path traversal attacks"""
@@ -2948,24 +6200,10 @@ def api_resources():
 # Analytics & Reports Routes
 @app.route('/analytics')
 @login_required
+@leads_etag
 def analytics():
     """Advanced analytics dashboard"""
-    leads_storage = get_leads_storage()
-    
-    # Calculate advanced metrics
-    total_leads = len(leads_storage)
-    sales_ready = sum(1 for lead in leads_storage if lead.get('lead_type') == 'Sales-Ready Lead')
-    prospects = sum(1 for lead in leads_storage if lead.get('lead_type') == 'Prospect Lead')
-    social_leads = sum(1 for lead in leads_storage if any([lead.get('facebook'), lead.get('linkedin'), lead.get('twitter'), lead.get('instagram')]))
-    
-    # Conversion rates
-    conversion_rate = (sales_ready / total_leads * 100) if total_leads > 0 else 0
-    
-    # Source breakdown
-    sources = {}
-    for lead in leads_storage:
-        source = lead.get('source', 'unknown')
-        sources[source] = sources.get(source, 0) + 1
+    version, stats = get_lead_stats(session['username'])
     
     # Recent activity (last 7 days simulation)
     recent_activity = [
@@ -2979,23 +6217,24 @@ def analytics():
     ]
     
     analytics_data = {
-        'total_leads': total_leads,
-        'sales_ready': sales_ready,
-        'prospects': prospects,
-        'social_leads': social_leads,
-        'conversion_rate': round(conversion_rate, 1),
-        'sources': sources,
+        'total_leads': stats['total_leads'],
+        'sales_ready': stats['sales_ready'],
+        'prospects': stats['prospects'],
+        'social_leads': stats['social_leads'],
+        'conversion_rate': stats['conversion_rate'],
+        'sources': stats['by_source'],
         'recent_activity': recent_activity
     }
     
-    return render_template('analytics.html', data=analytics_data)
+    return render_page('analytics.html', data=analytics_data, stats_version=version)
 
 @app.route('/reports')
 @login_required
+@leads_etag
 def reports():
     """Reports and exports"""
-    leads_storage = get_leads_storage()
-    return render_template('reports.html', leads=leads_storage)
+    view = get_lead_view(session['username'])
+    return render_page('reports.html', counts=view['counts'], stats_version=view['version'])
 
 @app.route('/campaigns')
 @login_required
@@ -3056,23 +6295,24 @@ def campaigns():
         'campaigns': campaigns_data
     }
     
-    return render_template('campaigns.html', leads=leads_storage, stats=campaign_stats)
+    return render_page('campaigns.html', leads=leads_storage, stats=campaign_stats)
 
 @app.route('/lead-sources')
 @login_required
+@leads_etag
 def lead_sources():
     """Lead source management"""
-    leads_storage = get_leads_storage()
+    view = get_lead_view(session['username'])
     
     # Group leads by source
     sources = {}
-    for lead in leads_storage:
+    for lead in view['leads']:
         source = lead.get('source', 'unknown')
         if source not in sources:
             sources[source] = []
         sources[source].append(lead)
     
-    return render_template('lead_sources.html', sources=sources)
+    return render_page('lead_sources.html', sources=sources, stats_version=view['version'])
 
 # Bonus Tools Routes
 @app.route('/email-validator', methods=['GET', 'POST'])
@@ -3104,12 +6344,13 @@ def email_validator():
                 'score': 85 if is_valid and is_business else 60 if is_valid else 20
             }
     
-    return render_template('email_validator.html', result=result)
+    return render_page('email_validator.html', result=result)
 
 @app.route('/domain-checker', methods=['GET', 'POST'])
 @login_required
 def domain_checker():
     """Domain information checker"""
+    import requests
     result = None
     
     if request.method == 'POST':
@@ -3142,44 +6383,51 @@ def domain_checker():
                     'response_time': 'Timeout'
                 }
     
-    return render_template('domain_checker.html', result=result)
+    return render_page('domain_checker.html', result=result)
 
 @app.route('/lead-enrichment', methods=['GET', 'POST'])
 @login_required
 def lead_enrichment():
-    """Lead enrichment tool"""
+    """Lead enrichment tool - the stored profile of the closest matching lead"""
     result = None
+    matches = []
+    company_name = ''
     
     if request.method == 'POST':
         company_name = request.form.get('company_name', '').strip()
         if company_name:
-            # Simulate lead enrichment
-            result = {
-                'company_name': company_name,
-                'industry': 'Technology',
-                'employee_count': '50-100',
-                'revenue': '$5M - $10M',
-                'location': 'New York, NY',
-                'founded': '2015',
-                'website': f"https://{company_name.lower().replace(' ', '')}.com",
-                'social_media': {
-                    'linkedin': f"https://linkedin.com/company/{company_name.lower().replace(' ', '-')}",
-                    'twitter': f"https://twitter.com/{company_name.lower().replace(' ', '')}",
-                    'facebook': f"https://facebook.com/{company_name.lower().replace(' ', '')}"
+            username = session['username']
+            matches = suggest_leads(username, company_name)
+            lead = get_lead_view(username)['by_id'].get(matches[0]['id']) if matches else None
+            if lead:
+                result = {
+                    'id': lead['id'],
+                    'company_name': lead.get('name'),
+                    'exact_match': normalize_name(lead.get('name')) == normalize_name(company_name),
+                    'industry': lead.get('industry') or 'General',
+                    'lead_type': lead.get('lead_type') or 'Unknown',
+                    'contact_level': lead.get('contact_level') or 'Unknown',
+                    'priority_score': lead.get('priority_score') or 0,
+                    'location': lead.get('address') or lead.get('location_tier') or '',
+                    'phone': lead.get('phone'),
+                    'email': lead.get('email'),
+                    'website': lead.get('website'),
+                    'source': lead.get('source'),
+                    'created_at': lead.get('created_at'),
+                    'social_media': {field: lead[field] for field in LEAD_PROFILE_SOCIAL_FIELDS if lead.get(field)}
                 }
-            }
     
-    return render_template('lead_enrichment.html', result=result)
+    return render_page('lead_enrichment.html', result=result, matches=matches[1:], company_name=company_name)
 
 @app.route('/settings')
 @login_required
 def settings():
     """User settings"""
     user = get_current_user()
-    return render_template('settings.html', user=user)
+    return render_page('settings.html', user=user)
 
-def get_available_templates(template_type):
-    """Get list of available templates from the templates directory"""
+def _scan_available_templates(template_type):
+    """Scan the templates directory for available templates of one type"""
     try:
         base_dir = os.path.dirname(os.path.abspath(__file__))
         templates_dir = os.path.join(base_dir, 'templates', template_type)
@@ -3226,19 +6474,25 @@ def get_available_templates(template_type):
         print(f"Error loading templates: {e}")
         return []
 
-def get_funnel_templates():
-    """Legacy function - kept for backward compatibility"""
-    return {
-        'dental': {
-            'title': 'Dental Practice Lead Magnet',
-            'description': 'Free consultation funnel for dental practices',
-            'conversion_rate': '18%',
-            'variables': {
-                'practice_name': '[Your Practice Name]',
-                'phone_number': '[Your Phone Number]',
-                'address': '[Your Address]'
-            },
-            'html': '''<!DOCTYPE html>
+AVAILABLE_TEMPLATES = {template_type: _scan_available_templates(template_type) for template_type in ('funnels', 'campaigns')}
+
+def get_available_templates(template_type):
+    """Get list of available templates from the templates directory"""
+    if template_type not in AVAILABLE_TEMPLATES:
+        return _scan_available_templates(template_type)
+    return AVAILABLE_TEMPLATES[template_type]
+
+FUNNEL_TEMPLATES = {
+    'dental': {
+        'title': 'Dental Practice Lead Magnet',
+        'description': 'Free consultation funnel for dental practices',
+        'conversion_rate': '18%',
+        'variables': {
+            'practice_name': '[Your Practice Name]',
+            'phone_number': '[Your Phone Number]',
+            'address': '[Your Address]'
+        },
+        'html': '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -3377,17 +6631,17 @@ def get_funnel_templates():
     </script>
 </body>
 </html>''',
+    },
+    'medical': {
+        'title': 'Medical Clinic Webinar Funnel',
+        'description': 'Educational webinar for medical clinics',
+        'conversion_rate': '22%',
+        'variables': {
+            'clinic_name': '[Your Clinic Name]',
+            'doctor_name': '[Doctor Name]',
+            'webinar_topic': '[Webinar Topic]'
         },
-        'medical': {
-            'title': 'Medical Clinic Webinar Funnel',
-            'description': 'Educational webinar for medical clinics',
-            'conversion_rate': '22%',
-            'variables': {
-                'clinic_name': '[Your Clinic Name]',
-                'doctor_name': '[Doctor Name]',
-                'webinar_topic': '[Webinar Topic]'
-            },
-            'html': '''<!DOCTYPE html>
+        'html': '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -3497,17 +6751,17 @@ def get_funnel_templates():
     </script>
 </body>
 </html>''',
+    },
+    'gym': {
+        'title': 'Gym Membership Funnel',
+        'description': 'Free trial membership for fitness centers',
+        'conversion_rate': '25%',
+        'variables': {
+            'gym_name': '[Your Gym Name]',
+            'trial_days': '7',
+            'membership_price': '$29.99'
         },
-        'gym': {
-            'title': 'Gym Membership Funnel',
-            'description': 'Free trial membership for fitness centers',
-            'conversion_rate': '25%',
-            'variables': {
-                'gym_name': '[Your Gym Name]',
-                'trial_days': '7',
-                'membership_price': '$29.99'
-            },
-            'html': '''<!DOCTYPE html>
+        'html': '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -3673,14 +6927,23 @@ def get_funnel_templates():
     </script>
 </body>
 </html>''',
-        }
     }
+}
+
+def get_funnel_templates():
+    """Legacy function - kept for backward compatibility"""
+    return FUNNEL_TEMPLATES
 
 @app.route('/help-center')
 @login_required
 def help_center():
     """Help Center page with guide and support email"""
-    return render_template('help_center.html')
+    return render_page('help_center.html')
+
+# Move everything built at import into the permanent generation so the GC never touches those pages
+# and they stay shared copy-on-write between preloaded workers
+if hasattr(gc, 'freeze'):
+    gc.freeze()
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
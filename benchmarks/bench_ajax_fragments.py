@@ -0,0 +1,86 @@
+"""Bytes and server render time per sidebar navigation: full page vs ?ajax=1 fragment.
+
+Saves N synthetic leads to a throwaway user and requests every sidebar page both
+ways through the Flask test client, after a warm-up round so template compilation
+is not counted. The fragment is what base.html's AJAX navigation now receives.
+
+    python benchmarks/bench_ajax_fragments.py [leads]
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'bench_ajax_fragments'
+# Synthetic businesses go to a throwaway registry, not the shared one
+app.BUSINESS_REGISTRY_FILE = os.path.join(app.USER_DATA_DIR, f'businesses_{USERNAME}.db')
+ROUNDS = 10
+PAGES = ['/', '/lead-finder', '/lead-classifier', '/outreach-hub', '/funnels-library', '/analytics', '/reports',
+         '/campaigns', '/lead-sources', '/email-validator', '/domain-checker', '/lead-enrichment', '/settings',
+         '/help-center']
+
+
+def synthetic_lead(i):
+    return {
+        'name': f'Business {i}',
+        'phone': f'(617) 555-{i % 10000:04d}',
+        'website': f'https://business{i}.com',
+        'email': f'info@business{i}.com' if i % 3 else '',
+        'lead_type': ('Sales-Ready Lead', 'Prospect Lead', 'Website Lead')[i % 3],
+        'source': ('bing_search', 'yellowpages')[i % 2],
+        'priority_score': i % 8,
+        'created_at': f'2025-06-{i % 28 + 1:02d}T10:{i % 60:02d}:00'
+    }
+
+
+def measure(client, url):
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        # A changed If-None-Match keeps leads_etag from answering 304, so every round renders
+        size = len(client.get(url, headers={'If-None-Match': '"bench"'}).data)
+        timings.append(time.perf_counter() - started)
+    return size, statistics.median(timings) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    app.save_user_leads(USERNAME, [synthetic_lead(i) for i in range(count)])
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['username'] = USERNAME
+
+    try:
+        totals = [0, 0, 0, 0]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for url in PAGES:
+                client.get(url)
+                client.get(url + '?ajax=1')
+        print(f"{count} leads, median of {ROUNDS} renders")
+        for url in PAGES:
+            with contextlib.redirect_stdout(io.StringIO()):
+                full_size, full_ms = measure(client, url)
+                fragment_size, fragment_ms = measure(client, url + '?ajax=1')
+            for index, value in enumerate((full_size, full_ms, fragment_size, fragment_ms)):
+                totals[index] += value
+            print(f"  {url:>17}: full {full_size / 1024:6.1f} KB {full_ms:6.1f} ms | "
+                  f"fragment {fragment_size / 1024:6.1f} KB {fragment_ms:6.1f} ms")
+        print(f"  {'all pages':>17}: full {totals[0] / 1024:6.1f} KB {totals[1]:6.1f} ms | "
+              f"fragment {totals[2] / 1024:6.1f} KB {totals[3]:6.1f} ms")
+    finally:
+        for filename in (f'leads_{USERNAME}.json', f'meta_{USERNAME}.json', f'.lock_{USERNAME}', f'index_{USERNAME}.jsonl',
+                         f'businesses_{USERNAME}.db'):
+            path = os.path.join(app.USER_DATA_DIR, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
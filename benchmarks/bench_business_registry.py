@@ -0,0 +1,127 @@
+"""Shared business registry: storage and crawl counts when several users find the same businesses.
+
+Simulates USERS users who each run overlapping searches over a pool of businesses whose
+sites are served by a local HTTP server. Each search goes through search_business_listings
+with discovery stubbed to return the user's share of the pool as bare listings, and the
+results are stored. Reports the site fetches the server actually saw with the registry and
+with lookups disabled, per-user file sizes against the same leads stored whole, and the cost
+of hydrating a user's leads on load.
+
+    python benchmarks/bench_business_registry.py [businesses] [users]
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+PREFIX = 'bench_business_registry'
+app.BUSINESS_REGISTRY_FILE = os.path.join(app.USER_DATA_DIR, f'businesses_{PREFIX}.db')
+KINDS = ['Bakery', 'Dental', 'Fitness', 'Cafe', 'Law Group', 'Auto Repair', 'Plumbing']
+fetches = {'count': 0}
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        fetches['count'] += 1
+        site = self.path.strip('/').split('/')[0]
+        body = (f'<html><body><a href="mailto:info@{site}.com">Email us</a>'
+                f'<a href="https://facebook.com/{site}">Facebook</a></body></html>').encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SiteServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def listing(i, base_url):
+    """A bare discovery listing, as _search_bing_business_listings returns it"""
+    kind = KINDS[i % len(KINDS)]
+    return {
+        'name': f'{["Acme", "Summit", "Harbor", "Oak"][i % 4]} {kind} {i}',
+        'phone': f'(617) {555 + i // 10000:03d}-{i % 10000:04d}',
+        'website': f'{base_url}business{i}', 'domain': f'business{i}.com',
+        'address': f'{i % 900 + 100} Main St, Boston, MA', 'industry': 'Food & Beverage',
+        'description': f'Family owned {kind.lower()} serving Boston since {1950 + i % 70}',
+        'rating': round(random.uniform(3, 5), 1), 'source': 'bing_enhanced'
+    }
+
+
+def search(scraper, listings):
+    """One user's search; returns the leads and how many site fetches it made"""
+    scraper._search_bing_business_listings = lambda *args: [dict(item) for item in listings]
+    before = fetches['count']
+    with contextlib.redirect_stdout(io.StringIO()):
+        leads = scraper.search_business_listings('business', 'Boston, MA', num_results=len(listings))
+    return leads, fetches['count'] - before
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    users = [f'{PREFIX}_{n}' for n in range(int(sys.argv[2]) if len(sys.argv) > 2 else 5)]
+    random.seed(46)
+    server = SiteServer(('127.0.0.1', 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/'
+    pool = [listing(i, base_url) for i in range(count)]
+    # Each user searches a random 60% of the local businesses
+    searches = [random.sample(pool, int(count * 0.6)) for _ in users]
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = app.LeadScraper()
+    lookup_businesses = app.lookup_businesses
+    try:
+        app.lookup_businesses = lambda leads: [None] * len(leads)
+        without = sum(search(scraper, listings)[1] for listings in searches)
+        app.lookup_businesses = lookup_businesses
+        with_registry = 0
+        for username, listings in zip(users, searches):
+            leads, fetched = search(scraper, listings)
+            with_registry += fetched
+            with contextlib.redirect_stdout(io.StringIO()):
+                app.store_new_leads(username, leads)
+
+        print(f"{len(users)} users x {int(count * 0.6)} leads over {count} businesses")
+        print(f"  site fetches: {with_registry} with the registry vs {without} without")
+        stored = sum(os.path.getsize(path) for username in users
+                     for path in (app._leads_file(username), app._leads_log_file(username)) if os.path.exists(path))
+        whole = sum(len(json.dumps(lead)) + 4 for username in users for lead in app.load_user_leads(username))
+        registry = os.path.getsize(app.BUSINESS_REGISTRY_FILE)
+        print(f"  storage: {(stored + registry) / 1e6:.2f} MB (lead files {stored / 1e6:.2f} MB + registry "
+              f"{registry / 1e6:.2f} MB) vs {whole / 1e6:.2f} MB with whole leads per user")
+
+        started = time.perf_counter()
+        for _ in range(5):
+            app.load_user_leads(users[0])
+        print(f"  load + hydrate {int(count * 0.6)} leads: {(time.perf_counter() - started) / 5 * 1e3:.1f} ms")
+    finally:
+        app.lookup_businesses = lookup_businesses
+        server.shutdown()
+        for username in users:
+            for filename in (f'leads_{username}.json', f'leads_{username}.log', f'meta_{username}.json', f'.lock_{username}',
+                             f'index_{username}.jsonl'):
+                path = os.path.join(app.USER_DATA_DIR, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+        if os.path.exists(app.BUSINESS_REGISTRY_FILE):
+            os.remove(app.BUSINESS_REGISTRY_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Per-page CPU time and contact recall: trafilatura.extract vs extract_contact_text.
+
+Uses synthetic small-business pages where the email and phone sit in the footer,
+the header, or the main content. Pass a directory of saved .html pages to also time
+real pages. Recall there is measured against regexes run over the raw markup.
+
+    python benchmarks/bench_contact_text.py [saved_pages_dir]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+import trafilatura
+
+PARAGRAPH = ('<p>Our family-owned team has served the community for over twenty years, '
+             'offering friendly service, transparent pricing and same-day appointments.</p>')
+
+
+def synthetic_page(i):
+    email = f'office{i}@business{i}.com'
+    phone = f'(617) 555-{1000 + i:04d}'
+    placement = ('footer', 'header', 'main')[i % 3]
+    contact = f'<p>Email {email} or call {phone}</p>'
+    nav = '<nav>' + ''.join(f'<a href="/p{n}">Page {n}</a>' for n in range(25)) + '</nav>'
+    main = ('<article><h1>Welcome</h1>' + PARAGRAPH * random.randint(8, 30)
+            + (contact if placement == 'main' else '') + '</article>')
+    html = (f'<html><head><title>Business {i}</title><script>var tracking = {{"id": {i}}};</script></head><body>'
+            f'<header>{nav}{contact if placement == "header" else ""}</header><main>{main}</main>'
+            f'<footer><p>&copy; 2025 Business {i}</p>{contact if placement == "footer" else ""}</footer>'
+            '</body></html>')
+    return html.encode('utf-8'), email, phone
+
+
+def recall(text, email, phone):
+    text = text or ''
+    found_email = email in text
+    digits = ''.join(ch for ch in phone if ch.isdigit())
+    found_phone = any(''.join(match) == digits for match in app.CONTACT_PHONE_PATTERN.findall(text))
+    return found_email, found_phone
+
+
+def run(pages, label):
+    extractors = {
+        'trafilatura': lambda html: trafilatura.extract(html, include_comments=False),
+        'contact_text': app.extract_contact_text,
+    }
+    print(f"\n{label}: {len(pages)} pages")
+    for name, extract in extractors.items():
+        emails = phones = 0
+        started = time.process_time()
+        for html, email, phone in pages:
+            text = extract(html)
+            if email:
+                found_email, found_phone = recall(text, email, phone)
+                emails += found_email
+                phones += found_phone
+        cpu_ms = (time.process_time() - started) * 1000 / len(pages)
+        line = f"  {name:>12}: {cpu_ms:6.2f} ms CPU/page"
+        if pages[0][1]:
+            line += f" | email recall {emails / len(pages):5.1%} | phone recall {phones / len(pages):5.1%}"
+        print(line)
+
+
+def main():
+    random.seed(7)
+    run([synthetic_page(i) for i in range(300)], 'Synthetic pages (contact in footer/header/main)')
+
+    if len(sys.argv) > 1:
+        saved = []
+        for filename in sorted(os.listdir(sys.argv[1])):
+            if filename.endswith(('.html', '.htm')):
+                with open(os.path.join(sys.argv[1], filename), 'rb') as f:
+                    saved.append((f.read(), '', ''))
+        if saved:
+            run(saved, f'Saved pages from {sys.argv[1]}')
+
+
+if __name__ == '__main__':
+    main()
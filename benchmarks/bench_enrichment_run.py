@@ -0,0 +1,118 @@
+"""Bulk enrichment: a checkpointed run against the dashboard calling /enhance-existing-leads in a loop.
+
+Stores LEADS leads for a throwaway user, STALE of them with websites on a local HTTP server
+that haven't been crawled for months (the rest were crawled this week). The old way re-reads
+the whole store, re-plans and saves everything for every batch of 25; the bulk run plans
+once, crawls each batch from its stored plan and checkpoints a cursor. Reports wall time,
+leads/minute and how much of each run went to store work rather than crawling.
+
+    python benchmarks/bench_enrichment_run.py [leads] [stale]
+"""
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'bench_enrichment_run'
+app.BUSINESS_REGISTRY_FILE = os.path.join(app.USER_DATA_DIR, f'businesses_{USERNAME}.db')
+app.JOBS_FILE = os.path.join(app.USER_DATA_DIR, f'jobs_{USERNAME}.db')
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        site = self.path.strip('/')
+        body = f'<html><body><a href="mailto:info@site{site}.com">Email us</a></body></html>'.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SiteServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def synthetic_leads(count, stale, base_url):
+    recent = (datetime.now() - timedelta(days=2)).isoformat()
+    old = (datetime.now() - timedelta(days=90)).isoformat()
+    return [{
+        'name': f'Business {i}', 'phone': f'(617) {555 + i // 10000:03d}-{i % 10000:04d}',
+        'website': f'{base_url}{i}', 'address': f'{i % 900 + 100} Main St, Boston, MA',
+        'industry': 'Food & Beverage', 'priority_score': i % 10, 'created_at': '2026-01-01T00:00:00',
+        'enriched_at': old if i < stale else recent
+    } for i in range(count)]
+
+
+def old_loop():
+    """What the dashboard did: call the route until nothing remains, each call reloading and re-planning everything"""
+    crawl_seconds = 0.0
+    while True:
+        leads = app.load_user_leads(USERNAME)
+        planned, eligible = app.plan_recrawl(leads)
+        if not planned:
+            return crawl_seconds
+        started = time.perf_counter()
+        app.recrawl_leads(planned)
+        crawl_seconds += time.perf_counter() - started
+        app.save_user_leads(USERNAME, leads)
+
+
+def bulk_run():
+    run_id = app.start_enrichment_run(USERNAME)
+    while True:
+        run = app.get_enrichment_run(USERNAME, run_id)
+        if run['status'] not in ('running', 'interrupted'):
+            return run
+        time.sleep(0.05)
+
+
+def main():
+    lead_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    stale = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    server = SiteServer(('127.0.0.1', 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/'
+    try:
+        print(f"{lead_count} stored leads, {stale} stale")
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.save_user_leads(USERNAME, synthetic_leads(lead_count, stale, base_url))
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            crawl_seconds = old_loop()
+        elapsed = time.perf_counter() - started
+        print(f"  /enhance-existing-leads loop: {elapsed:.1f} s, {stale / elapsed * 60:.0f} leads/min, "
+              f"{elapsed - crawl_seconds:.1f} s outside crawling")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.save_user_leads(USERNAME, synthetic_leads(lead_count, stale, base_url))
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = bulk_run()
+        elapsed = time.perf_counter() - started
+        print(f"  Bulk enrichment run: {elapsed:.1f} s, {run['leads_per_minute']:.0f} leads/min reported "
+              f"({run['processed']} processed in {run['batches']} batches, status {run['status']})")
+    finally:
+        server.shutdown()
+        for name in (f'leads_{USERNAME}.json', f'meta_{USERNAME}.json', f'.lock_{USERNAME}', f'index_{USERNAME}.jsonl',
+                     f'search_{USERNAME}.db', f'businesses_{USERNAME}.db', f'jobs_{USERNAME}.db'):
+            path = os.path.join(app.USER_DATA_DIR, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
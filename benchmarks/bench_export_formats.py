@@ -0,0 +1,102 @@
+"""Export size and load time: streamed CSV vs Parquet vs Arrow IPC for a large lead store.
+
+Writes N synthetic leads (sparse socials, few distinct lead types, industries,
+sources and tiers, like real searches) to a throwaway user, downloads each export
+format through the Flask test client and times reading it back, the way a CRM
+ingest job would. CSV is read with the csv module, columnar formats with pyarrow.
+Needs pyarrow.
+
+    python benchmarks/bench_export_formats.py [leads]
+"""
+import contextlib
+import csv
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+USERNAME = 'bench_export_formats'
+# Synthetic businesses go to a throwaway registry, not the shared one
+app.BUSINESS_REGISTRY_FILE = os.path.join(app.USER_DATA_DIR, f'businesses_{USERNAME}.db')
+LEAD_TYPES = ['Sales-Ready Lead', 'Prospect Lead', 'Website Lead', 'Social-Connected Lead', 'Premium Lead']
+INDUSTRIES = [industry for industry, _ in app.INDUSTRY_KEYWORDS] + ['General']
+TIERS = ['Tier 1 - Major Metro', 'Tier 2 - Mid-Size City', 'Tier 3 - Small City/Town']
+
+
+def synthetic_lead(i):
+    has_site = random.random() < 0.7
+    return {
+        'name': f'Business {i} {random.choice(["Dental", "Fitness", "Cafe", "Law Group", "Auto Repair"])}',
+        'phone': f'(617) 555-{i % 10000:04d}' if random.random() < 0.8 else '',
+        'website': f'https://business{i}.com' if has_site else '',
+        'domain': f'business{i}.com' if has_site else '',
+        'email': f'info@business{i}.com' if has_site and random.random() < 0.4 else '',
+        'address': f'{i % 900 + 100} Main St, Boston, MA',
+        'lead_type': random.choice(LEAD_TYPES),
+        'industry': random.choice(INDUSTRIES),
+        'location_tier': random.choice(TIERS),
+        'contact_level': random.choice(['Premium', 'High', 'Medium', 'Basic']),
+        'priority_score': random.randint(0, 8),
+        'facebook': f'https://facebook.com/business{i}' if random.random() < 0.3 else '',
+        'linkedin': f'https://linkedin.com/company/business{i}' if random.random() < 0.1 else '',
+        'twitter': '', 'instagram': f'https://instagram.com/business{i}' if random.random() < 0.2 else '',
+        'youtube': '', 'tiktok': '', 'pinterest': '',
+        'source': random.choice(['bing_search', 'bing_places', 'yellowpages']),
+        'created_at': f'2025-06-{i % 28 + 1:02d}T10:{i % 60:02d}:00'
+    }
+
+
+def load_csv(data):
+    return sum(1 for _ in csv.DictReader(io.StringIO(data.decode('utf-8'))))
+
+
+def load_parquet(data):
+    return pq.read_table(pa.BufferReader(data)).num_rows
+
+
+def load_arrow(data):
+    return pa.ipc.open_stream(pa.BufferReader(data)).read_all().num_rows
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(5)
+    app.save_user_leads(USERNAME, [synthetic_lead(i) for i in range(count)])
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['username'] = USERNAME
+
+    try:
+        print(f"{count} leads")
+        for label, url, loader in (('CSV', '/export_csv', load_csv),
+                                   ('CSV gzip', '/export_csv?gzip=1', None),
+                                   ('Parquet', '/export_columnar?format=parquet', load_parquet),
+                                   ('Arrow IPC', '/export_columnar?format=arrow', load_arrow)):
+            started = time.perf_counter()
+            data = client.get(url).data
+            export_s = time.perf_counter() - started
+            line = f"  {label:>10}: {len(data) / 1e6:7.2f} MB | export {export_s:5.2f}s"
+            if loader:
+                started = time.perf_counter()
+                rows = loader(data)
+                line += f" | load {time.perf_counter() - started:6.3f}s ({rows} rows)"
+            print(line)
+    finally:
+        for filename in (f'leads_{USERNAME}.json', f'meta_{USERNAME}.json', f'.lock_{USERNAME}',
+                         f'index_{USERNAME}.jsonl', f'businesses_{USERNAME}.db'):
+            path = os.path.join(app.USER_DATA_DIR, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
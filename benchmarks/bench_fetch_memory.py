@@ -0,0 +1,92 @@
+"""Peak RSS of concurrent contact enrichment with and without capped streaming reads.
+
+Serves a mix of normal pages, multi-MB pages and PDFs from a local server and runs
+_extract_enhanced_contact_info_fast over them on 6 threads, once with the byte cap
+and once reading whole bodies. Each mode runs in its own process because ru_maxrss
+is a high-water mark.
+
+    python benchmarks/bench_fetch_memory.py
+"""
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SMALL_PAGE = (b'<html><body><a href="/contact-us">Contact</a>'
+              b'<footer><a href="mailto:info@benchbiz.com">info@benchbiz.com</a>'
+              b'<a href="https://facebook.com/benchbiz">fb</a></footer></body></html>')
+# ~6 MB of markup with the contact details at the very end (past the cap on purpose)
+BIG_PAGE = (b'<html><body>' + b'<div class="row"><p>Lorem ipsum dolor sit amet</p></div>' * 120000
+            + b'<a href="mailto:sales@benchbiz.com">mail</a></body></html>')
+PDF_BODY = b'%PDF-1.4\n' + os.urandom(8 * 1024 * 1024)
+
+
+class BenchHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith('/big'):
+            body, content_type = BIG_PAGE, 'text/html; charset=utf-8'
+        elif self.path.startswith('/pdf'):
+            body, content_type = PDF_BODY, 'application/pdf'
+        else:
+            body, content_type = SMALL_PAGE, 'text/html; charset=utf-8'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def run_mode(mode, port, rounds):
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        scraper = app.LeadScraper()
+    if mode == 'uncapped':
+        scraper.max_page_bytes = None
+
+    urls = []
+    for i in range(rounds):
+        urls += [f'http://127.0.0.1:{port}/big/{i}', f'http://127.0.0.1:{port}/pdf/{i}',
+                 f'http://127.0.0.1:{port}/small/{i}']
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(scraper._extract_enhanced_contact_info_fast, urls))
+    elapsed = time.perf_counter() - started
+
+    emails = sum(1 for r in results if r.get('email'))
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>9}: peak RSS {peak_mb:7.1f} MB | {len(urls)} sites in {elapsed:5.2f}s | emails found {emails}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('capped', 'uncapped'):
+        run_mode(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
+        return
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BenchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    rounds = 2
+
+    for mode in ('uncapped', 'capped'):
+        subprocess.run([sys.executable, os.path.abspath(__file__), mode, str(port), str(rounds)], check=True)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
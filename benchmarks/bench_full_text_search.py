@@ -0,0 +1,95 @@
+"""Full-text lead search: SQLite FTS5 index vs a substring scan over the lead view.
+
+Writes N synthetic leads with descriptions and addresses to a throwaway user, builds
+the search index once, then times ranked queries (selective, multi-word, prefix and
+broad) against the naive approach of lower-casing and scanning every lead's text.
+Also times one incremental store so the per-save index cost is visible.
+
+    python benchmarks/bench_full_text_search.py [leads]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'bench_full_text_search'
+# Synthetic businesses go to a throwaway registry, not the shared one
+app.BUSINESS_REGISTRY_FILE = os.path.join(app.USER_DATA_DIR, f'businesses_{USERNAME}.db')
+KINDS = ['Dental', 'Fitness', 'Cafe', 'Law Group', 'Auto Repair', 'Plumbing', 'Bakery']
+CITIES = ['Boston', 'Cambridge', 'Somerville', 'Quincy', 'Newton']
+QUERIES = ['calzones', 'bakery somerville', 'business4242', 'plumb', 'family owned']
+REPEATS = 20
+
+
+def synthetic_lead(i):
+    kind = KINDS[i % len(KINDS)]
+    return {
+        'name': f'{random.choice(["Acme", "Summit", "Harbor", "Oak", "Blue"])} {kind} {i}',
+        'phone': f'(617) 555-{i % 10000:04d}',
+        'website': f'https://business{i}.com', 'domain': f'business{i}.com',
+        'email': f'info@business{i}.com' if random.random() < 0.4 else '',
+        'address': f'{i % 900 + 100} Main St, {random.choice(CITIES)}, MA',
+        'description': f'Family owned {kind.lower()} serving the area since {1950 + i % 70}',
+        'lead_type': random.choice(['Sales-Ready Lead', 'Prospect Lead', 'Website Lead']),
+        'industry': random.choice(['Healthcare', 'Food & Beverage', 'Professional Services']),
+        'source': 'bing_search', 'priority_score': random.randint(0, 8),
+        'created_at': f'2025-06-{i % 28 + 1:02d}T10:{i % 60:02d}:00.{i}'
+    }
+
+
+def scan(leads, query):
+    words = query.lower().split()
+    return [lead for lead in leads
+            if all(any(word in str(lead.get(field) or '').lower() for field in app.LEAD_SEARCH_TEXT_FIELDS) for word in words)]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - started) / REPEATS * 1e3, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(44)
+    leads = [synthetic_lead(i) for i in range(count)]
+    leads.append(dict(synthetic_lead(count), name="Joe's Pizza", description='Wood-fired pizza and calzones'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, leads)
+
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.search_leads(USERNAME, 'warmup')
+        print(f"{count} leads | index build {time.perf_counter() - started:.2f}s")
+        view_leads = app.get_lead_view(USERNAME)['leads']
+        for query in QUERIES:
+            fts_ms, result = timed(lambda: app.search_leads(USERNAME, query))
+            scan_ms, matches = timed(lambda: scan(view_leads, query))
+            print(f"  {query!r:20} fts {fts_ms:7.2f} ms ({result['total']:6} hits) | scan {scan_ms:7.1f} ms ({len(matches):6} hits)")
+
+        app.load_lead_index(USERNAME)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.store_new_leads(USERNAME, [dict(synthetic_lead(count + 1), description='Specialty espresso bar')])
+        store_ms = (time.perf_counter() - started) * 1e3
+        found = app.search_leads(USERNAME, 'espresso')['total']
+        print(f"  incremental store {store_ms:.1f} ms, searchable immediately: {bool(found)}")
+    finally:
+        for filename in (f'leads_{USERNAME}.json', f'leads_{USERNAME}.log', f'meta_{USERNAME}.json', f'.lock_{USERNAME}',
+                         f'index_{USERNAME}.jsonl', f'search_{USERNAME}.db', f'businesses_{USERNAME}.db'):
+            path = os.path.join(app.USER_DATA_DIR, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Cold-start cost of a gunicorn worker: `python -X importtime` breakdown for `import app`.
+
+Runs a fresh interpreter several times, reports the median cumulative import time of
+app.py with the heaviest modules, and then times the first-use costs that are now
+deferred (scraper construction, first HTML parse).
+
+    python benchmarks/bench_import_time.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_USE_SNIPPET = '''
+import time, contextlib, io
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    scraper = app.get_scraper()
+    scraper.session
+    scraper.advanced_libs_available
+t2 = time.perf_counter()
+app.make_soup(b"<html><body><a href='/contact'>Contact</a></body></html>")
+t3 = time.perf_counter()
+print(f"{(t1 - t0) * 1000:.1f} {(t2 - t1) * 1000:.1f} {(t3 - t2) * 1000:.1f}")
+'''
+
+
+def importtime_run():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    # Children are printed before their parent, so app's subtree is everything since the last top-level line
+    modules, subtree = {}, []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name[1:].rstrip()  # The remaining indentation encodes import nesting
+        if name == 'app':
+            modules = {child.strip(): timing for child, timing in subtree if child.startswith('  ') and not child.startswith('   ')}
+            modules['app'] = (int(self_us), int(cumulative_us))
+        elif not name.startswith(' '):
+            subtree = []
+        else:
+            subtree.append((name, (int(self_us), int(cumulative_us))))
+    return modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    samples = [importtime_run() for _ in range(runs)]
+
+    app_times = [sample['app'][1] / 1000 for sample in samples if 'app' in sample]
+    print(f"import app (cumulative, median of {runs}): {statistics.median(app_times):.1f} ms")
+
+    last = samples[-1]
+    top_level = sorted(((cumulative, name) for name, (_, cumulative) in last.items() if name != 'app'), reverse=True)[:12]
+    print(f"\nHeaviest direct imports of app.py (last run, app.py itself {last['app'][0] / 1000:.1f} ms):")
+    for cumulative, name in top_level:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    heavy = ['bs4', 'lxml', 'trafilatura', 'requests', 'cloudscraper', 'fake_useragent', 'undetected_chromedriver']
+    result = subprocess.run([sys.executable, '-c', 'import sys, app; print(" ".join(sys.modules))'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = [name for name in heavy if name in result.stdout.split()]
+    print(f"\nHeavy scraping deps imported at boot: {', '.join(loaded) if loaded else 'none'}")
+
+    result = subprocess.run([sys.executable, '-c', FIRST_USE_SNIPPET], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    import_ms, scraper_ms, soup_ms = result.stdout.split()[-3:]
+    print(f"\nWall time: import app {import_ms} ms | first get_scraper() {scraper_ms} ms | first make_soup() {soup_ms} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Lead name autocomplete: the per-user name index vs filtering every stored name.
+
+Saves N synthetic leads to a throwaway user and times /api/leads/suggest-style
+lookups (name prefix, word prefix, typo via trigrams) against the substring
+filter lead_enrichment.html used to run over every name shipped to the browser.
+Also times keeping the index current when a search stores a batch of leads.
+
+    python benchmarks/bench_name_suggest.py [leads]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'bench_name_suggest'
+# Synthetic businesses go to a throwaway registry, not the shared one
+app.BUSINESS_REGISTRY_FILE = os.path.join(app.USER_DATA_DIR, f'businesses_{USERNAME}.db')
+ROUNDS = 200
+WORDS = ['Acme', 'Summit', 'Blue', 'Harbor', 'Oak', 'Metro', 'Golden', 'Riverside', 'Family', 'Prime']
+KINDS = ['Dental', 'Fitness', 'Cafe', 'Law Group', 'Auto Repair', 'Plumbing', 'Bakery', 'Pizza', 'Salon']
+QUERIES = ['harb', 'golden baker', 'plumbing', 'goldn bakry', 'xyzzy']
+
+
+def synthetic_lead(i):
+    return {
+        'name': f'{random.choice(WORDS)} {random.choice(KINDS)} {i}',
+        'phone': f'(617) 555-{i % 10000:04d}',
+        'website': f'https://business{i}.com',
+        'address': f'{i % 900 + 100} Main St, Boston, MA',
+        'lead_type': 'Prospect Lead',
+        'created_at': f'2025-06-{i % 28 + 1:02d}T10:{i % 60:02d}:00.{i}'
+    }
+
+
+def per_call_us(function, rounds=ROUNDS):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = function()
+    return (time.perf_counter() - started) / rounds * 1e6, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(3)
+    app.save_user_leads(USERNAME, [synthetic_lead(i) for i in range(count)])
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            view = app.get_lead_view(USERNAME)
+            app.load_lead_index(USERNAME)  # The dedup index is loaded once per process; keep that out of the timings
+            started = time.perf_counter()
+            app.get_lead_name_index(USERNAME)
+        print(f"{count} leads | index build {time.perf_counter() - started:.2f}s")
+        names = [lead['name'] for lead in view['leads']]
+
+        for query in QUERIES:
+            indexed_us, result = per_call_us(lambda: app.suggest_leads(USERNAME, query))
+            scan_us, _ = per_call_us(lambda: [name for name in names if query in name.lower()][:8], rounds=5)
+            print(f"  {query!r:>16}: index {indexed_us:7.0f} us | full scan {scan_us:9.0f} us | "
+                  f"{[lead['name'] for lead in result[:2]]}")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            batch = [synthetic_lead(count + i) for i in range(50)]
+            started = time.perf_counter()
+            app.store_new_leads(USERNAME, batch)
+            stored_s = time.perf_counter() - started
+            started = time.perf_counter()
+            app.suggest_leads(USERNAME, 'harb')
+        print(f"  store 50 leads {stored_s * 1000:.1f} ms, next suggest {(time.perf_counter() - started) * 1000:.2f} ms "
+              "(index updated in place, no rebuild)")
+    finally:
+        for filename in (f'leads_{USERNAME}.json', f'leads_{USERNAME}.log', f'meta_{USERNAME}.json', f'.lock_{USERNAME}',
+                         f'index_{USERNAME}.jsonl', f'businesses_{USERNAME}.db'):
+            path = os.path.join(app.USER_DATA_DIR, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
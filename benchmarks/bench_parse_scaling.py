@@ -0,0 +1,105 @@
+"""Contact page parsing throughput: enrichment threads vs the parse process pool.
+
+Parses a batch of 200 pages (synthetic small-business homepages, or the .html files
+in a saved-pages directory) the way _extract_enhanced_contact_info_fast does. It
+first uses 6 threads parsing inline, as before, and then hands the raw bytes to
+ProcessPoolExecutors of increasing size. Threads stay flat because of the GIL;
+the process pool should scale with the number of cores.
+
+    python benchmarks/bench_parse_scaling.py [saved_pages_dir]
+"""
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+BATCH_SIZE = 200
+THREADS = 6
+
+PARAGRAPH = ('<p>Our family-owned team has served the community for over twenty years, '
+             'offering friendly service, transparent pricing and same-day appointments.</p>')
+
+
+def synthetic_page(i):
+    nav = '<nav>' + ''.join(f'<a href="/services/s{n}">Service {n}</a>' for n in range(60)) + '</nav>'
+    cards = ''.join(f'<div class="card"><h3>Offer {n}</h3>{PARAGRAPH}<span>Call us today</span></div>'
+                    for n in range(random.randint(40, 120)))
+    html = (f'<html><head><title>Business {i}</title><script>var cfg = {{"id": {i}}};</script></head><body>'
+            f'<header>{nav}<a href="/contact-us">Contact</a></header><main>{cards}</main>'
+            f'<footer><p>Email office{i}@business{i}.com or call (617) 555-{1000 + i:04d}</p>'
+            f'<a href="https://facebook.com/business{i}">Facebook</a>'
+            f'<a href="https://instagram.com/business{i}">Instagram</a></footer></body></html>')
+    return html.encode('utf-8')
+
+
+def load_pages():
+    if len(sys.argv) > 1:
+        pages = []
+        for filename in sorted(os.listdir(sys.argv[1])):
+            if filename.endswith(('.html', '.htm')):
+                with open(os.path.join(sys.argv[1], filename), 'rb') as f:
+                    pages.append(f.read())
+        if pages:
+            return (pages * (BATCH_SIZE // len(pages) + 1))[:BATCH_SIZE]
+    random.seed(11)
+    return [synthetic_page(i) for i in range(BATCH_SIZE)]
+
+
+def silence_stdout():
+    sys.stdout = open(os.devnull, 'w')
+
+
+def parse(content):
+    """Parse one page and report the CPU time this thread spent on it"""
+    cpu_started = time.thread_time()
+    result = app._parse_contact_page_worker(content, 'https://business.example/', 'https://business.example/', True)
+    return result, time.thread_time() - cpu_started
+
+
+def timed(label, run, pages, baseline=None):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(pages)
+    elapsed = time.perf_counter() - started
+    cpu = sum(cpu for _, cpu in results)
+    emails = sum(1 for result, _ in results if result['emails'])
+    speedup = f" | {baseline / elapsed:4.2f}x" if baseline else ''
+    print(f"  {label:>22}: {elapsed:6.2f}s wall | {len(pages) / elapsed:6.1f} pages/s | "
+          f"parse CPU {cpu / elapsed:4.2f} cores | emails {emails}/{len(pages)}{speedup}")
+    return elapsed
+
+
+def main():
+    pages = load_pages()
+    cores = os.cpu_count() or 1
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.0f} KB average, {cores} CPU cores")
+
+    def threaded(batch):
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            return list(executor.map(parse, batch))
+    baseline = timed(f'{THREADS} threads, inline', threaded, pages)
+
+    context = multiprocessing.get_context('forkserver')
+    for processes in sorted({1, 2, 4, cores}):
+        pool = ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=silence_stdout)
+        list(pool.map(parse, pages[:processes * 2]))  # Start and warm the processes outside the timing
+
+        def pooled(batch):
+            # Same shape as production: fetch threads submit bytes and wait for the small result dicts
+            with ThreadPoolExecutor(max_workers=THREADS) as executor:
+                return list(executor.map(lambda content: pool.submit(parse, content).result(), batch))
+        timed(f'{processes} parse processes', pooled, pages, baseline)
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Per-worker memory of gunicorn with and without --preload.
+
+Starts the render.yaml command line (gthread, 4 threads) on a free local port, warms
+every worker with a few requests and reads /proc/<pid>/smaps_rollup for the master
+and each worker. RSS counts shared pages in every process; PSS splits them between
+the processes that share them, so PSS is the figure that drops with --preload.
+Linux only; needs gunicorn installed.
+
+    python benchmarks/bench_preload_memory.py [workers]
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                    children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            pass
+    return children
+
+
+def run(preload, workers):
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+               '--worker-class', 'gthread', '--threads', '4', '--max-requests', '100', 'app:app']
+    if preload:
+        command.insert(-1, '--preload')
+    master = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/login', timeout=2).read()
+                break
+            except OSError:
+                if time.time() > deadline:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.2)
+        # Enough requests that every worker has served a few pages
+        for _ in range(workers * 10):
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/login', timeout=5).read()
+        time.sleep(0.5)
+
+        worker_stats = [memory_kb(pid) for pid in child_pids(master.pid)]
+        master_stats = memory_kb(master.pid)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+    label = 'preload' if preload else 'no preload'
+    rss = sum(w['Rss'] for w in worker_stats) / len(worker_stats) / 1024
+    pss = sum(w['Pss'] for w in worker_stats) / len(worker_stats) / 1024
+    private = sum(w['Private_Clean'] + w['Private_Dirty'] for w in worker_stats) / len(worker_stats) / 1024
+    total_pss = (master_stats['Pss'] + sum(w['Pss'] for w in worker_stats)) / 1024
+    print(f"{label:>10}: {len(worker_stats)} workers | per worker RSS {rss:6.1f} MB, PSS {pss:6.1f} MB, "
+          f"private {private:6.1f} MB | master+workers PSS {total_pss:6.1f} MB")
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    for preload in (False, True):
+        run(preload, workers)
+
+
+if __name__ == '__main__':
+    main()
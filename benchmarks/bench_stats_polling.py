@@ -0,0 +1,78 @@
+"""Cost of one dashboard refresh poll: full /api/leads vs /api/stats?since=<version>.
+
+Saves N synthetic leads to a throwaway user and times the request each open
+dashboard tab used to send every 30 seconds (the whole lead list, counted in the
+browser) against the stats poll that replaces it, both when nothing changed and
+right after a search added leads.
+
+    python benchmarks/bench_stats_polling.py [leads]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'bench_stats_polling'
+# Synthetic businesses go to a throwaway registry, not the shared one
+app.BUSINESS_REGISTRY_FILE = os.path.join(app.USER_DATA_DIR, f'businesses_{USERNAME}.db')
+ROUNDS = 20
+
+
+def synthetic_lead(i):
+    return {
+        'name': f'Business {i}',
+        'phone': f'(617) 555-{i % 10000:04d}',
+        'website': f'https://business{i}.com',
+        'email': f'info@business{i}.com' if i % 3 else '',
+        'lead_type': ('Sales-Ready Lead', 'Prospect Lead', 'Website Lead')[i % 3],
+        'industry': 'Healthcare' if i % 2 else 'Food & Restaurant',
+        'source': 'bing_search',
+        'priority_score': i % 8,
+        'created_at': f'2025-06-{i % 28 + 1:02d}T10:{i % 60:02d}:00'
+    }
+
+
+def timed(client, url):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        size = len(client.get(url).data)
+    return (time.perf_counter() - started) / ROUNDS * 1000, size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app.save_user_leads(USERNAME, [synthetic_lead(i) for i in range(count)])
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['username'] = USERNAME
+
+    try:
+        print(f"{count} leads, mean of {ROUNDS} requests")
+        version = client.get('/api/stats').get_json()['version']
+        for label, url in (('/api/leads', '/api/leads'),
+                           ('stats, unchanged', f'/api/stats?since={version}')):
+            ms, size = timed(client, url)
+            print(f"  {label:>18}: {ms:8.2f} ms | {size / 1024:9.1f} KB")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.store_new_leads(USERNAME, [synthetic_lead(count + 1)])
+        started = time.perf_counter()
+        size = len(client.get(f'/api/stats?since={version}').data)
+        print(f"  {'stats, after save':>18}: {(time.perf_counter() - started) * 1000:8.2f} ms | {size / 1024:9.1f} KB"
+              " (first request rebuilds the cached view)")
+    finally:
+        for filename in (f'leads_{USERNAME}.json', f'leads_{USERNAME}.log', f'meta_{USERNAME}.json', f'.lock_{USERNAME}',
+                         f'index_{USERNAME}.jsonl', f'businesses_{USERNAME}.db'):
+            path = os.path.join(app.USER_DATA_DIR, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
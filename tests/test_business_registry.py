@@ -0,0 +1,92 @@
+"""Leads share one registry record per business: users store only the values they changed, '' tombstones what they
+cleared, and everyone else's reads pick up the shared record's enrichment."""
+import contextlib
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+ALICE, BOB = 'test_registry_alice', 'test_registry_bob'
+
+
+@pytest.fixture(autouse=True)
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, '_business_registry', {'epoch': None, 'seq': 0, 'records': {}, 'keys': {}})
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def stored(username):
+    with open(app._leads_file(username)) as f:
+        return json.load(f)
+
+
+def acme(**fields):
+    return dict({'name': 'Acme Bakery', 'phone': '(617) 555-0100', 'website': 'https://acmebakery.com/'}, **fields)
+
+
+def test_one_record_serves_every_user():
+    app.save_user_leads(ALICE, [acme(lead_type='Website Lead')])
+    app.store_new_leads(BOB, [acme(name='Acme Bakery Boston', email='hello@acmebakery.com',
+                                   facebook='https://facebook.com/acmebakery', enriched_at='2026-10-01T00:00:00')])
+
+    alice, = app.load_user_leads(ALICE)
+    bob, = app.load_user_leads(BOB)
+    assert alice['business_id'] == bob['business_id']
+    assert alice['email'] == 'hello@acmebakery.com' and alice['facebook'] == 'https://facebook.com/acmebakery'
+    assert alice['name'] == 'Acme Bakery' and bob['name'] == 'Acme Bakery Boston'  # Identity fields are kept per user
+    assert set(stored(ALICE)[0]) == {'id', 'business_id', 'lead_type'}
+    assert app.lead_view_version(ALICE) == f"{app.get_leads_version(ALICE)}.{app.business_registry_version()}"
+
+
+def test_changed_and_cleared_values_stay_with_the_user():
+    app.store_new_leads(BOB, [acme(email='hello@acmebakery.com', facebook='https://facebook.com/acmebakery',
+                                   enriched_at='2026-10-01T00:00:00')])
+    app.save_user_leads(ALICE, [acme()])
+    lead_ref = app.load_user_leads(ALICE)[0]['id']
+
+    def edit(lead):
+        lead['email'] = ''  # Cleared
+        del lead['facebook']  # Removed
+        lead['industry'] = 'Food & Beverage'  # Not in the shared record yet - fills it
+
+    app.update_user_leads(ALICE, [lead_ref], edit)
+    ref, = stored(ALICE)
+    assert ref['email'] == '' and ref['facebook'] == ''  # Tombstones, not unknowns
+    assert 'industry' not in ref and 'phone' not in ref
+
+    alice, = app.load_user_leads(ALICE)
+    assert alice['email'] == '' and alice['facebook'] == '' and alice['industry'] == 'Food & Beverage'
+    bob, = app.load_user_leads(BOB)
+    assert bob['email'] == 'hello@acmebakery.com' and bob['industry'] == 'Food & Beverage'
+
+    assert app.find_lead_ids(BOB, email='hello@acmebakery.com')['email']['ids'] == [bob['id']]
+    assert app.search_leads(BOB, '7am')['total'] == 0
+
+    # A newer crawl refreshes the shared record; Alice's cleared values stay cleared, and a re-save stores no more
+    app.store_new_leads('test_registry_carol', [acme(email='orders@acmebakery.com', hours='7am-3pm',
+                                                     enriched_at='2026-10-15T00:00:00')])
+    alice, = app.load_user_leads(ALICE)
+    assert alice['email'] == '' and alice['hours'] == '7am-3pm'
+    assert app.load_user_leads(BOB)[0]['email'] == 'orders@acmebakery.com'
+    # Bob's lookup and search indexes catch up with the shared record without a write of his own
+    assert app.find_lead_ids(BOB, email='hello@acmebakery.com')['email']['ids'] == []
+    assert app.find_lead_ids(BOB, email='orders@acmebakery.com')['email']['ids'] == [bob['id']]
+    assert app.search_leads(BOB, '7am')['total'] == 1
+    app.save_user_leads(ALICE, app.load_user_leads(ALICE))
+    assert stored(ALICE) == [ref]
+
+
+def test_leads_without_keys_are_stored_whole():
+    app.save_user_leads(ALICE, [{'name': 'Corner Shop', 'email': 'corner@example.com'}])
+    ref, = stored(ALICE)
+    assert 'business_id' not in ref and ref['email'] == 'corner@example.com'
@@ -0,0 +1,55 @@
+"""/export_columnar writes Parquet and Arrow streams with typed, dictionary-encoded columns and nulls for empty fields."""
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+pa = pytest.importorskip('pyarrow')
+
+USERNAME = 'test_columnar_export'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'start_search_scheduler', lambda: None)
+    monkeypatch.setattr(app, 'COLUMNAR_BATCH_ROWS', 4)  # Several batches, each with its own dictionaries
+    leads = [{'name': f'Business {i}', 'phone': f'(617) 555-{i:04d}', 'email': f'info@business{i}.com' if i % 2 else '',
+              'lead_type': 'Website Lead' if i % 3 else 'Sales-Ready Lead', 'priority_score': str(i)}
+             for i in range(10)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, leads)
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = USERNAME
+    return client
+
+
+def test_parquet_export(client):
+    import pyarrow.parquet as pq
+    response = client.get('/export_columnar')
+    assert response.mimetype == 'application/vnd.apache.parquet'
+    table = pq.read_table(io.BytesIO(response.data))
+    assert table.schema.names == app.COLUMNAR_EXPORT_FIELDS
+    assert table.schema.field('priority_score').type == pa.int16()
+    assert pa.types.is_dictionary(table.schema.field('lead_type').type)
+    assert table.column('priority_score').to_pylist() == list(range(10))
+    assert table.column('email').to_pylist()[:3] == [None, 'info@business1.com', None]
+    assert len(set(table.column('id').to_pylist())) == 10
+
+
+def test_arrow_stream_export_with_filters(client):
+    response = client.get('/export_columnar?format=arrow&type=Sales-Ready%20Lead')
+    assert response.mimetype == 'application/vnd.apache.arrow.stream'
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert table.column('name').to_pylist() == ['Business 0', 'Business 3', 'Business 6', 'Business 9']
+    assert set(table.column('lead_type').to_pylist()) == {'Sales-Ready Lead'}
+    assert client.get('/export_columnar?format=orc').status_code == 400
@@ -0,0 +1,57 @@
+"""AdaptiveConcurrencyLimiter grows by one while saturated and healthy, and halves (once per cooldown) on overload."""
+import contextlib
+import io
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+
+def test_additive_increase_multiplicative_decrease():
+    limiter = app.AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=5, min_samples=2,
+                                             decrease_cooldown=60)
+    with limiter.slot(), limiter.slot(), limiter.slot(), limiter.slot():
+        for _ in range(4):
+            limiter.record(0.2, status_code=200)
+        assert limiter.limit == 5  # One round of healthy completions at the limit
+        for _ in range(10):
+            limiter.record(0.2, status_code=200)
+        assert limiter.limit == 5  # Capped at max_limit
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        limiter.record(0.2, status_code=429)
+        limiter.record(8.0, timed_out=True)  # Same burst of failures - inside the cooldown, so no second cut
+    assert limiter.limit == 2
+    assert limiter.totals == {'requests': 16, 'errors': 2, 'timeouts': 1, 'server_errors': 0, 'increases': 1, 'decreases': 1}
+    assert [entry['reason'] for entry in limiter.snapshot()['history']] == ['initial', 'increase', 'http_429']
+
+
+def test_idle_or_slow_traffic_never_grows_the_limit():
+    limiter = app.AdaptiveConcurrencyLimiter(initial_limit=3, min_samples=2, target_p95=1.0)
+    for _ in range(10):
+        limiter.record(0.1, status_code=200)
+    assert limiter.limit == 3  # Nothing in flight - the limit isn't what holds throughput back
+    with limiter.slot(), limiter.slot(), limiter.slot():
+        for _ in range(10):
+            limiter.record(3.0, status_code=200)
+    assert limiter.limit == 3  # Saturated, but p95 is over target
+
+
+def test_slots_block_at_the_limit():
+    limiter = app.AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1)
+    entered = threading.Event()
+
+    def worker():
+        with limiter.slot():
+            entered.set()
+
+    with limiter.slot():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not entered.wait(0.2)
+    assert entered.wait(2)
+    thread.join()
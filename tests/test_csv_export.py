@@ -0,0 +1,60 @@
+"""/export_csv streams the stored leads as CSV: filtered, by posted ids, gzipped, and safe against formula injection."""
+import contextlib
+import csv
+import gzip
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_csv_export'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'start_search_scheduler', lambda: None)
+    monkeypatch.setattr(app, 'EXPORT_CHUNK_BYTES', 256)  # Several chunks even for a handful of rows
+    leads = [{'name': f'Business {i}', 'phone': f'(617) 555-{i:04d}', 'email': f'info@business{i}.com' if i % 2 else '',
+              'lead_type': 'Website Lead' if i % 3 else 'Sales-Ready Lead', 'priority_score': i}
+             for i in range(12)]
+    leads.append({'name': '=HYPERLINK("http://evil.example")', 'phone': '+1 617 555 9999', 'lead_type': 'Website Lead'})
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, leads)
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = USERNAME
+    return client
+
+
+def rows(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8'))))
+
+
+def test_streams_every_stored_lead(client):
+    response = client.get('/export_csv', buffered=False)
+    assert response.is_streamed and response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=leads.csv'
+    exported = rows(response.get_data())
+    assert exported[0] == app.CSV_EXPORT_FIELDS
+    assert [row[0] for row in exported[1:]] == [f'Business {i}' for i in range(12)] + [' =HYPERLINK("http://evil.example")']
+    assert exported[-1][1] == ' +1 617 555 9999'  # Cells starting with = + - @ can't run as formulas
+
+
+def test_filters_ids_and_gzip(client):
+    exported = rows(gzip.decompress(client.get('/export_csv?type=Sales-Ready%20Lead&has_email=1&gzip=1').data))
+    assert [row[0] for row in exported[1:]] == ['Business 3', 'Business 9']
+
+    response = client.get('/export_csv', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip' and len(rows(gzip.decompress(response.data))) == 14
+
+    ids = [lead['id'] for lead in app.load_user_leads(USERNAME)[:2]]
+    assert [row[0] for row in rows(client.post('/export_csv', data={'ids': ','.join(ids)}).data)[1:]] == ['Business 0', 'Business 1']
+    assert client.post('/export_csv', data={}).status_code == 400
@@ -0,0 +1,113 @@
+"""Enrichment runs keep an email found on a page when a re-crawl only comes up with a guessed one."""
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_enrichment_run'
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    """Answers every proxied request with a page that has a contact form but no address, so the crawl guesses info@"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = (b'<html><body><form class="contact-form"><input name="message"></form>'
+                b'<a href="https://facebook.com/acmebakery">Facebook</a></body></html>')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_run_never_downgrades_an_email(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'JOBS_FILE', str(tmp_path / 'jobs.db'))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ProxyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('HTTP_PROXY', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.delenv('NO_PROXY', raising=False)
+    monkeypatch.delenv('no_proxy', raising=False)
+    stale = (datetime.now() - timedelta(days=90)).isoformat()
+    leads = [
+        {'name': 'Acme Bakery', 'website': 'http://acmebakery.com/', 'email': 'owner@acmebakery.com',
+         'enriched_at': stale, 'created_at': '2026-01-01T00:00:00'},
+        {'name': 'Summit Cafe', 'website': 'http://summitcafe.com/', 'enriched_at': stale, 'created_at': '2026-01-01T00:00:00'},
+    ]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.save_user_leads(USERNAME, leads)
+            run_id = app.start_enrichment_run(USERNAME)
+            for _ in range(300):
+                run = app.get_enrichment_run(USERNAME, run_id)
+                if run['status'] not in ('running', 'interrupted'):
+                    break
+                time.sleep(0.05)
+    finally:
+        server.shutdown()
+
+    assert run['status'] == 'done' and run['processed'] == 2
+    acme, summit = app.load_user_leads(USERNAME)
+    assert acme['email'] == 'owner@acmebakery.com'
+    assert acme['facebook'] == 'https://facebook.com/acmebakery'
+    assert summit['email'] == 'info@summitcafe.com'
+
+
+def test_recrawl_keeps_an_email_the_page_still_lists():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = app.LeadScraper()
+        page = app.make_soup(b'<html><body><a href="mailto:sales@acmebakery.com">Sales</a>'
+                             b'<p>Write to owner@acmebakery.com or hello@acmebakery.com</p></body></html>')
+        emails = [scraper._extract_emails_from_page(page) for _ in range(5)]
+    assert all(found == emails[0] for found in emails)
+    assert emails[0][0] == 'sales@acmebakery.com'
+
+    lead = {'name': 'Acme Bakery', 'email': 'owner@acmebakery.com'}
+    info = {'email': emails[0][0], 'emails': emails[0]}
+    assert app.apply_contact_info(lead, info, '2026-10-01T00:00:00', overwrite=True) == []
+    assert lead['email'] == 'owner@acmebakery.com' and lead['extracted_at']['email'] == '2026-10-01T00:00:00'
+
+    lead = {'name': 'Acme Bakery', 'email': 'old@acmebakery.com'}
+    assert app.apply_contact_info(lead, info, '2026-10-01T00:00:00', overwrite=True) == ['email']
+    assert lead['email'] == 'sales@acmebakery.com'
+
+
+def test_start_resumes_a_run_whose_worker_died(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'JOBS_FILE', str(tmp_path / 'jobs.db'))
+    stale = (datetime.now() - timedelta(days=90)).isoformat()
+    launch = app._launch_enrichment_run
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, [{'name': 'Acme Bakery', 'website': 'http://acmebakery.com/', 'enriched_at': stale}])
+        monkeypatch.setattr(app, '_launch_enrichment_run', lambda run_id, owner: None)  # The worker dies before its first batch
+        run_id = app.start_enrichment_run(USERNAME)
+    connection = app._open_enrichment_db()
+    with connection:
+        connection.execute("UPDATE enrichment_runs SET lease_until = ?", (time.time() - 1,))
+    connection.close()
+    assert app.get_enrichment_run(USERNAME, run_id)['status'] == 'interrupted'
+
+    monkeypatch.setattr(app, '_launch_enrichment_run', launch)
+    monkeypatch.setattr(app, 'crawl_leads', lambda leads, timeout=None: {})
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert app.start_enrichment_run(USERNAME) == run_id
+        for _ in range(100):
+            run = app.get_enrichment_run(USERNAME, run_id)
+            if run['status'] != 'running':
+                break
+            time.sleep(0.05)
+    assert run['status'] == 'done' and run['skipped'] == 1
@@ -0,0 +1,40 @@
+"""A worker forked while a master thread holds a module lock still gets working locks of its own."""
+import contextlib
+import io
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+LOCKS = ('_business_registry_lock', '_lead_indexes_lock', '_lead_views_lock', '_lead_name_indexes_lock',
+         '_lead_stats_lock', '_leads_changed', '_scraper_lock', '_parse_pool_lock', '_search_scheduler_lock')
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_locks_held_at_fork_are_recreated():
+    held, release = threading.Event(), threading.Event()
+
+    def hold_locks():
+        with contextlib.ExitStack() as stack:
+            for name in LOCKS:
+                stack.enter_context(getattr(app, name))
+            held.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_locks)
+    holder.start()
+    held.wait()
+    pid = os.fork()
+    if pid == 0:
+        acquired = all(getattr(app, name).acquire(timeout=1) for name in LOCKS)
+        os._exit(0 if acquired and app._lead_stats_waiters == 0 else 1)
+    release.set()
+    holder.join()
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,43 @@
+"""Lead-backed pages and APIs answer 304 until the user's leads change, and never short-circuit pending flashes."""
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_lead_etag'
+
+
+def test_not_modified_until_the_leads_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'start_search_scheduler', lambda: None)
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = USERNAME
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, [{'name': 'Acme Bakery', 'phone': '(617) 555-0001', 'created_at': '2026-01-01T00:00:00'}])
+        for path in ('/api/leads', '/api/leads?format=ndjson', '/reports', '/analytics'):
+            first = client.get(path)
+            assert first.status_code == 200 and first.headers['Cache-Control'] == 'private, no-cache'
+            again = client.get(path, headers={'If-None-Match': first.headers['ETag']})
+            assert again.status_code == 304 and again.data == b''
+
+        etag = client.get('/api/leads').headers['ETag']
+        assert client.get('/api/leads?format=ndjson').headers['ETag'] != etag  # Tags are per URL
+
+        with client.session_transaction() as session:
+            session['_flashes'] = [('message', 'Saved')]
+        assert client.get('/api/leads', headers={'If-None-Match': etag}).status_code == 200
+        with client.session_transaction() as session:
+            session.pop('_flashes')
+
+        app.store_new_leads(USERNAME, [{'name': 'Summit Cafe', 'phone': '(617) 555-0002'}])
+        changed = client.get('/api/leads', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and len(changed.get_json()) == 2
+    assert changed.headers['ETag'] != etag
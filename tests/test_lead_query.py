@@ -0,0 +1,79 @@
+"""query_leads pages with keyset cursors: every lead once, in order, stable under inserts and bound to one sort."""
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_lead_query'
+
+
+@pytest.fixture
+def leads(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'start_search_scheduler', lambda: None)
+    leads = [{'name': f'Business {i:02d}', 'phone': f'(617) 555-{i:04d}', 'priority_score': i % 4,
+              'lead_type': 'Website Lead' if i % 3 else 'Sales-Ready Lead', 'email': f'info@business{i}.com' if i % 2 else '',
+              'created_at': f'2026-01-{i + 1:02d}T00:00:00'} for i in range(25)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, leads)
+    return leads
+
+
+def pages(sort, filters=None, limit=7):
+    cursor, seen = None, []
+    while True:
+        page = app.query_leads(USERNAME, filters=filters, sort=sort, cursor=cursor, limit=limit)
+        seen.extend(page['leads'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return seen, page['total']
+
+
+def test_cursors_visit_every_lead_once_in_order(leads):
+    for sort in ('priority_score', '-priority_score', 'name', '-created_at'):
+        seen, total = pages(sort)
+        assert total == 25 and len({lead['id'] for lead in seen}) == 25
+        values = [lead.get(sort.lstrip('-')) for lead in seen]
+        assert values == sorted(values, reverse=sort.startswith('-'))
+
+    seen, total = pages('name', {'lead_type': 'Sales-Ready Lead', 'has_email': True})
+    assert total == len(seen) == 4
+    assert [lead['name'] for lead in seen] == ['Business 03', 'Business 09', 'Business 15', 'Business 21']
+
+
+def test_cursor_is_stable_under_inserts(leads):
+    first = app.query_leads(USERNAME, sort='-created_at', limit=10)
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.store_new_leads(USERNAME, [{'name': 'Newest', 'phone': '(617) 555-9999', 'created_at': '2026-02-01T00:00:00'}])
+    second = app.query_leads(USERNAME, sort='-created_at', cursor=first['next_cursor'], limit=10)
+    assert [lead['name'] for lead in second['leads']] == [f'Business {i:02d}' for i in range(14, 4, -1)]
+    assert second['total'] == 26 and second['version'] != first['version']
+
+
+def test_cursor_is_bound_to_its_sort(leads):
+    cursor = app.query_leads(USERNAME, sort='priority_score', limit=5)['next_cursor']
+    for sort in ('name', '-priority_score'):
+        with pytest.raises(ValueError):
+            app.query_leads(USERNAME, sort=sort, cursor=cursor)
+    with pytest.raises(ValueError):
+        app.query_leads(USERNAME, cursor='garbage')
+    with pytest.raises(ValueError):
+        app.query_leads(USERNAME, sort='bogus')
+
+
+def test_api_pages_in_columns(leads):
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = USERNAME
+    page = client.get('/api/leads/query?sort=name&limit=3&encoding=columns&fields=name,priority_score').get_json()
+    assert page['count'] == 3 and page['total'] == 25 and page['next_cursor']
+    assert page['columns'] == {'name': ['Business 00', 'Business 01', 'Business 02'], 'priority_score': [0, 1, 2]}
+    assert client.get(f"/api/leads/query?sort=-name&cursor={page['next_cursor']}").status_code == 400
@@ -0,0 +1,34 @@
+"""search_leads ranks every match by weighted bm25, pages through the same ordering it counts, and filters."""
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_lead_search'
+
+
+def test_ranks_every_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    # The best match is the oldest lead; the newer ones only mention pizza in their description
+    leads = [{'name': 'Pizza Palace', 'phone': '(617) 555-0000', 'email': 'hi@pizzapalace.com', 'created_at': '2025-01-01T00:00:00'}]
+    leads += [{'name': f'Corner Deli {i}', 'phone': f'(617) 555-{i:04d}', 'description': 'Sandwiches, salads and pizza',
+               'created_at': f'2025-02-01T00:00:{i:02d}'} for i in range(1, 31)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, leads)
+        first = app.search_leads(USERNAME, 'pizza', limit=10)
+        pages = [app.search_leads(USERNAME, 'pizza', limit=10, offset=offset)['leads'] for offset in (0, 10, 20, 30)]
+        with_email = app.search_leads(USERNAME, 'pizza', filters={'has_email': True})
+        prefix = app.search_leads(USERNAME, 'sandw')
+
+    assert first['total'] == 31
+    assert first['leads'][0]['name'] == 'Pizza Palace'
+    assert [lead['score'] for lead in first['leads']] == sorted((lead['score'] for lead in first['leads']), reverse=True)
+    assert len({lead['id'] for page in pages for lead in page}) == 31
+    assert [lead['name'] for lead in with_email['leads']] == ['Pizza Palace'] and with_email['total'] == 1
+    assert prefix['total'] == 30
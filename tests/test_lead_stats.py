@@ -0,0 +1,73 @@
+"""/api/stats sends full stats once, then only the keys that changed since a version the client holds, and long-polls."""
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_lead_stats'
+
+
+def lead(i, lead_type='Sales-Ready Lead'):
+    return {'name': f'Business {i}', 'phone': f'(617) 555-{i:04d}', 'email': f'info@business{i}.com' if i % 2 else '',
+            'lead_type': lead_type, 'source': 'bing_search', 'priority_score': i % 8}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'start_search_scheduler', lambda: None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, [lead(i) for i in range(10)])
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = USERNAME
+    return client
+
+
+def test_deltas_against_a_known_version(client):
+    first = client.get('/api/stats').get_json()
+    assert first['full'] and first['stats']['total_leads'] == 10 and first['stats']['sales_ready'] == 10
+    version = first['version']
+    assert client.get(f'/api/stats?since={version}').get_json() == {'version': version, 'changed': False}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.store_new_leads(USERNAME, [lead(100, 'Prospect Lead')])
+    delta = client.get(f'/api/stats?since={version}').get_json()
+    assert delta['changed'] and not delta['full'] and delta['version'] != version
+    assert delta['stats']['total_leads'] == 11 and delta['stats']['prospects'] == 1
+    assert 'sales_ready' not in delta['stats'] and 'by_source' in delta['stats']
+
+    unknown = client.get('/api/stats?since=deadbeef.1.0.0').get_json()
+    assert unknown['full'] and unknown['stats'] == {**first['stats'], **delta['stats']}
+
+
+def test_long_poll_wakes_on_a_save(client):
+    version = client.get('/api/stats').get_json()['version']
+    with contextlib.redirect_stdout(io.StringIO()):
+        threading.Timer(0.3, lambda: app.store_new_leads(USERNAME, [lead(101)])).start()
+        started = time.time()
+        woken = client.get(f'/api/stats?since={version}&wait=5').get_json()
+    assert woken['changed'] and woken['stats']['total_leads'] == 11 and time.time() - started < 2
+
+    started = time.time()
+    quiet = client.get(f"/api/stats?since={woken['version']}&wait=0.3").get_json()
+    assert quiet == {'version': woken['version'], 'changed': False} and time.time() - started >= 0.3
+    assert client.get('/api/stats?wait=soon').status_code == 400
+
+
+def test_long_poll_falls_back_when_no_slot_is_free(client, monkeypatch):
+    version = client.get('/api/stats').get_json()['version']
+    monkeypatch.setattr(app, '_lead_stats_waiters', app.LEAD_STATS_MAX_WAITERS)
+    started = time.time()
+    result = client.get(f'/api/stats?since={version}&wait=5').get_json()
+    assert result['long_poll'] is False and not result['changed'] and time.time() - started < 1
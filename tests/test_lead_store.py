@@ -0,0 +1,100 @@
+"""New leads go to an append log that readers fold into the lead array, deduplicated against the persistent index."""
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_lead_store'
+
+
+def shop(i):
+    return {'name': f'Shop {i}', 'phone': f'(617) 555-{i:04d}', 'created_at': '2026-01-01T00:00:00'}
+
+
+@pytest.fixture(autouse=True)
+def user_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def names(leads):
+    return [lead['name'] for lead in leads]
+
+
+def stored_ids(path):
+    """Lead ids in a raw store file - lines hold registry references, not the business fields"""
+    with open(path) as f:
+        leads = json.load(f) if path.endswith('.json') else [json.loads(line) for line in f]
+    return [lead['id'] for lead in leads]
+
+
+def test_appends_go_to_the_log_and_are_deduplicated():
+    app.save_user_leads(USERNAME, [shop(i) for i in range(3)])
+    array = app._leads_file(USERNAME)
+    inode, before = os.stat(array).st_ino, open(array).read()
+
+    duplicate = shop(1)
+    stored = app.store_new_leads(USERNAME, [shop(3), duplicate, shop(3), {'name': ''}])
+    assert names(stored) == ['Shop 3']
+    assert duplicate['id'] == app.load_user_leads(USERNAME)[1]['id']  # Duplicates take the stored lead's id
+    assert os.stat(array).st_ino == inode and open(array).read() == before
+    assert stored_ids(app._leads_log_file(USERNAME)) == [app.lead_id(shop(3))]
+    assert names(app.load_user_leads(USERNAME)) == names(app.iter_user_leads(USERNAME)) == [f'Shop {i}' for i in range(4)]
+
+    app._lead_indexes.clear()  # Another worker replays the index from its log
+    assert app.store_new_leads(USERNAME, [shop(3), shop(0)]) == []
+
+
+def test_torn_tail_and_crashed_fold():
+    app.save_user_leads(USERNAME, [shop(0)])
+    app.store_new_leads(USERNAME, [shop(1)])
+    with open(app._leads_log_file(USERNAME), 'ab') as f:
+        f.write(b'{"name": "Sho')  # An append that died mid-line
+    assert names(app.load_user_leads(USERNAME)) == ['Shop 0', 'Shop 1']
+    app.store_new_leads(USERNAME, [shop(2)])
+    assert stored_ids(app._leads_log_file(USERNAME)) == [app.lead_id(shop(1)), app.lead_id(shop(2))]
+
+    # A rewrite that crashed before removing the log leaves its leads in both files
+    leads, log = app.load_user_leads(USERNAME), open(app._leads_log_file(USERNAME)).read()
+    with app.user_store_lock(USERNAME):
+        app._write_leads_file(USERNAME, leads)
+    open(app._leads_log_file(USERNAME), 'w').write(log)
+    assert names(app.load_user_leads(USERNAME)) == names(app.iter_user_leads(USERNAME)) == ['Shop 0', 'Shop 1', 'Shop 2']
+
+
+def test_log_is_folded_into_the_array(monkeypatch):
+    app.save_user_leads(USERNAME, [shop(0)])
+    app.store_new_leads(USERNAME, [shop(1)])
+    compact_bytes = app.LEADS_LOG_COMPACT_BYTES
+    monkeypatch.setattr(app, 'LEADS_LOG_COMPACT_BYTES', 10)
+    app.store_new_leads(USERNAME, [shop(2)])
+    assert not os.path.exists(app._leads_log_file(USERNAME))
+    assert stored_ids(app._leads_file(USERNAME)) == [app.lead_id(shop(i)) for i in range(3)]
+
+    monkeypatch.setattr(app, 'LEADS_LOG_COMPACT_BYTES', compact_bytes)
+    app.store_new_leads(USERNAME, [shop(3)])
+    assert stored_ids(app._leads_log_file(USERNAME)) == [app.lead_id(shop(3))]
+    app.delete_user_leads(USERNAME, [app.lead_id(shop(1))])  # A rewrite folds the log in as well
+    assert not os.path.exists(app._leads_log_file(USERNAME))
+    assert names(app.load_user_leads(USERNAME)) == ['Shop 0', 'Shop 2', 'Shop 3']
+
+
+def test_corrupt_array_is_quarantined_not_overwritten():
+    app.save_user_leads(USERNAME, [shop(0)])
+    array = app._leads_file(USERNAME)
+    open(array, 'w').write('[\n  {"name": "Shop 0", "pho')
+    app.store_new_leads(USERNAME, [shop(1)])
+    assert names(app.load_user_leads(USERNAME)) == ['Shop 1']
+    quarantined, = glob.glob(array + '.corrupt-*')
+    assert 'Shop 0' in open(quarantined).read()
@@ -0,0 +1,41 @@
+"""/api/leads is tagged with the version of the leads it streams, even when a write lands while it starts."""
+import contextlib
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_leads_stream'
+
+
+def test_body_matches_its_etag(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'start_search_scheduler', lambda: None)
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = USERNAME
+    lead_view_version = app.lead_view_version
+    writes = [{'name': 'Summit Cafe', 'phone': '(617) 555-0002'}]
+
+    def version_then_write(username):
+        # A write lands right after leads_etag reads the version, before the view reads any leads
+        version = lead_view_version(username)
+        if writes:
+            app.store_new_leads(username, [writes.pop()])
+        return version
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.save_user_leads(USERNAME, [{'name': 'Acme Bakery', 'phone': '(617) 555-0001'}])
+        monkeypatch.setattr(app, 'lead_view_version', version_then_write)
+        response = client.get('/api/leads?format=ndjson')
+        names = [json.loads(line)['name'] for line in response.get_data(as_text=True).splitlines()]
+        revalidated = client.get('/api/leads?format=ndjson', headers={'If-None-Match': response.headers['ETag']})
+
+    assert names == ['Acme Bakery', 'Summit Cafe']
+    assert revalidated.status_code == 304  # The tag names the leads that were streamed
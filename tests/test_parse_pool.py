@@ -0,0 +1,37 @@
+"""A parse that outlives PARSE_TIMEOUT gets its pool replaced and its stuck process killed."""
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+
+def stuck_parse(content, page_url, site_url, want_fallback):
+    time.sleep(60)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_timed_out_parse_recycles_the_pool(monkeypatch):
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork'))
+    pool.submit(int).result()
+    process, = pool._processes.values()
+    monkeypatch.setattr(app, 'PARSE_PROCESSES', 1)
+    monkeypatch.setattr(app, 'PARSE_TIMEOUT', 0.5)
+    monkeypatch.setattr(app, '_parse_pool', pool)
+    monkeypatch.setattr(app, '_parse_contact_page_worker', stuck_parse)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        page = app.parse_contact_page(b'<html></html>', 'http://example.com/', 'http://example.com/')
+        assert page == app.EMPTY_CONTACT_PAGE
+        assert app._parse_pool is None  # The next parse starts a fresh pool
+        process.join(timeout=5)
+    assert not process.is_alive()
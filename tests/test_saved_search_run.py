@@ -0,0 +1,50 @@
+"""A saved-search run whose worker died is marked interrupted and run again, and only a finished run schedules the next."""
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+USERNAME = 'test_saved_search_run'
+
+
+def test_dead_run_is_recovered(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'USER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    monkeypatch.setattr(app, 'JOBS_FILE', str(tmp_path / 'jobs.db'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = app.get_scraper()
+    monkeypatch.setattr(scraper, 'search_business_listings', lambda business_type, location, num_results, exclude=None: [
+        lead for lead in ({'name': f'Bakery {i}', 'phone': f'(617) 555-000{i}', 'source': 'bing_search'} for i in range(3))
+        if not exclude(lead)])
+
+    search_id = app.create_saved_search(USERNAME, 'bakery', 'Boston, MA', 10, 24)
+    claimed = app._claim_due_searches()
+    assert [claim[4] for claim in claimed] == [search_id]
+    assert app._claim_due_searches() == []  # Its lease is live, so no other worker starts it
+
+    # The worker dies mid-run: the run keeps its 'running' row and the search stays due
+    connection = sqlite3.connect(app.JOBS_FILE)
+    with connection:
+        connection.execute("UPDATE search_runs SET lease_until = ?", (time.time() - 1,))
+    connection.close()
+    assert app.list_search_runs(USERNAME, search_id)[0]['status'] == 'interrupted'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for claim in app._claim_due_searches():
+            app.run_saved_search(*claim)
+
+    runs = app.list_search_runs(USERNAME, search_id)
+    assert [run['status'] for run in runs] == ['done', 'interrupted']
+    assert runs[0]['new_leads'] == 3 and runs[1]['seconds'] is not None
+    search, = app.list_saved_searches(USERNAME)
+    assert search['next_run_at'] > (datetime.now() + timedelta(hours=23)).isoformat()
+    assert app._claim_due_searches() == []
+
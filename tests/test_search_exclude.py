@@ -0,0 +1,56 @@
+"""search_business_listings(exclude=...) drops known businesses before any of their sites are fetched."""
+import contextlib
+import io
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+fetched = []
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        fetched.append(self.path)
+        site = self.path.strip('/').split('/')[0]
+        body = f'<html><body><a href="mailto:hello@{site}.com">Email us</a></body></html>'.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+
+def test_excluded_listing_is_never_fetched(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'BUSINESS_REGISTRY_FILE', str(tmp_path / 'businesses.db'))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/'
+    listings = [{'name': f'Bakery {i}', 'website': f'{base_url}bakery{i}', 'domain': f'bakery{i}.com',
+                 'phone': f'(617) 555-000{i}', 'description': 'Fresh bread daily', 'source': 'bing_enhanced'}
+                for i in range(4)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = app.LeadScraper()
+    monkeypatch.setattr(scraper, '_search_bing_business_listings', lambda *args: [dict(listing) for listing in listings])
+    fetched.clear()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = scraper.search_business_listings('bakery', 'Boston, MA', num_results=len(listings),
+                                                       exclude=lambda lead: lead['name'] in ('Bakery 1', 'Bakery 3'))
+    finally:
+        server.shutdown()
+
+    assert [lead['name'] for lead in results] == ['Bakery 0', 'Bakery 2']
+    assert results[0]['email'] == 'hello@bakery0.com'
+    assert not [path for path in fetched if path.startswith(('/bakery1', '/bakery3'))]
+    assert {'bakery0', 'bakery2'} <= {path.split('/')[1] for path in fetched}
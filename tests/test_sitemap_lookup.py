@@ -0,0 +1,50 @@
+"""The sitemap fallback reads at most SITEMAP_MAX_BYTES of sitemap.xml and reports the fetch to the adaptive limiter."""
+import contextlib
+import io
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+
+
+class SitemapHandler(BaseHTTPRequestHandler):
+    """A sitemap whose contact page is listed only after several megabytes of other URLs"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        origin = f'http://127.0.0.1:{self.server.server_port}'
+        filler = ''.join(f'<url><loc>{origin}/products/item-{i}</loc></url>' for i in range(1000)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.end_headers()
+        try:
+            self.wfile.write(f'<urlset><url><loc>{origin}/about-us</loc></url>'.encode())
+            for _ in range(100):
+                self.wfile.write(filler)
+            self.wfile.write(f'<url><loc>{origin}/contact</loc></url></urlset>'.encode())
+        except OSError:
+            pass  # The client stopped reading at its cap
+
+
+def test_sitemap_is_capped_and_counted():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SitemapHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    origin = f'http://127.0.0.1:{server.server_port}'
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = app.LeadScraper()
+    requests_before = scraper.enrichment_limiter.totals['requests']
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            best_url = scraper._lookup_sitemap_contact_page(origin)
+    finally:
+        server.shutdown()
+
+    assert best_url == f'{origin}/about-us'  # The /contact entry lies past the byte cap
+    assert scraper.enrichment_limiter.totals['requests'] == requests_before + 1